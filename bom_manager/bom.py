@@ -230,32 +230,66 @@
 # Import some libraries (alphabetical order):
 
 from argparse import ArgumentParser
+import bisect                       # Binary search over quantity sorted price breaks
 # from bs4 import BeautifulSoup     # HTML/XML data structucure searching
 # import bs4
 # import copy                       # Used for the old pickle code...
+import concurrent.futures           # Thread pool used for concurrent *Panda* lookups
+import contextlib                   # Deferred report file writes for *OrderManifest*
 import csv
 # from currency_converter import CurrencyConverter         # Currency converter
 # import fnmatch                    # File Name Matching
 # import glob                         # Unix/Linux style command line file name pattern matching
-# import io                           # I/O stuff
+import functools                    # Memoized vendor name clean up
+import gzip                         # Compression for *Cassette* files
+import hashlib                      # Stable content fingerprints
+import heapq                        # Lazy priority queue of vendor removal penalties
+import http.client                  # Keep-alive HTTP connections used by *Fetcher*
+import json                         # Machine readable *ReportWriter* outputs
+import io                           # In memory report files for *OrderManifest*
 import lxml.etree as etree  # type: ignore
+import math                         # *math.inf* marks unavailable costs and prices
+import multiprocessing              # Start method for the *Scenario* process pool
 # import pickle                     # Python data structure pickle/unpickle
 import pkg_resources                # Used to find plug-ins.
 # import pkgutil
 from bom_manager.tracing import trace, trace_level_get, trace_level_set, tracing_get
 import os
+import queue                        # Work queue for the *PandaPool* worker threads
 import re                           # Regular expressions
+import sqlite3                      # Embedded database used for the vendor parts cache
 # import requests                   # HTML Requests
 # import sexpdata                   # (LISP) S_EXpresson Data
 # from sexpdata import Symbol       # (LISP) S-EXpression Symbol
 # import subprocess
 import sys
+import threading                    # Locks and semaphores for limiting *Panda* lookups
 import time                         # Time package
-from typing import Any, Callable, Dict, IO, List, Optional, Tuple, Union
+import urllib.parse                 # URL splitting used by *Fetcher*
+from typing import (Any, Callable, ContextManager, Dict, IO, Iterator, List, Optional, Tuple,
+                    Union)
 Number = Union[int, float]
 PreCompiled = Any
 Quad = Tuple[int, float, int, str]
 Quint = Tuple[float, int, int, int, int, int]
+Refresh = Tuple["ActualPart", Optional["ActualPart"], str, List[str]]
+Selection = Tuple["ChoicePart", Optional["ActualPart"], Optional["VendorPart"],
+                  str, int, int, float, str]
+# *Refresh* is an *ActualPart* that needs a vendor lookup:
+# * Actual Part (ActualPart): The *ActualPart* to fill in with fresh *VendorPart*'s.
+# * Previous Actual Part (Optional[ActualPart]): The cached version (if any).
+# * Part Name (str): The *ChoicePart* name to pass along to each *Panda*.
+# * Stale Vendor Names (List[str]): The vendors whose *VendorPart*'s are stale.  An empty list
+#   means that all *VendorPart*'s must be looked up.
+# *Selection* is the frozen vendor selection of one *ChoicePart* in an *OrderResult*:
+# * Choice Part (ChoicePart):
+# * Selected Actual Part (Optional[ActualPart]): *None* when no vendor can supply the part.
+# * Selected Vendor Part (Optional[VendorPart]): *None* when no vendor can supply the part.
+# * Selected Vendor Name (str): Empty when no vendor can supply the part.
+# * Selected Price Break Index (int):
+# * Selected Order Quantity (int):
+# * Selected Total Cost (float):
+# * References Text (str): From *ChoicePart.references_text_get*().
 # *Quint* is misnamed, it currently has 6 fields:
 # * Total Cost (float):
 # * Order Quantity (int):
@@ -421,9 +455,30 @@ def main() -> int:
     partial_load: bool = True
     collections: Collections = Collections("Collections", collections_directories,
                                            searches_root, partial_load, gui)
+    collections.cassette = order.cassette
+    collections.fetcher = order.fetcher
 
     order.process(collections)
 
+    # Write out the cost versus build quantity curve when asked to:
+    if order.sweep_quantities:
+        order.cost_curve_write(os.path.join(order.order_root, "cost_curve.csv"))
+
+    # Compare any what if vendor *scenarios*:
+    if order.scenarios:
+        order.scenarios_write(os.path.join(order.order_root, "scenarios.csv"))
+
+    # Remember the input and output content hashes for the next incremental run:
+    if order.manifest is not None:
+        order.manifest.save()
+
+    # Write out any recorded web traffic and summarize the web traffic:
+    if order.cassette is not None:
+        order.cassette.save()
+        order.cassette.misses_print()
+    if order.fetcher.metrics_table:
+        order.fetcher.metrics_print()
+
     return 0
 
 
@@ -435,10 +490,38 @@ def command_line_arguments_process() -> Tuple[List[str], str, "Order"]:
     parser: ArgumentParser = ArgumentParser(description="Bill of Materials (BOM) Manager.")
     parser.add_argument("-b", "--bom", action="append", default=[],
                         help="Bom file (.csv, .net). Preceed with 'NUMBER:' to increase count. ")
+    parser.add_argument("--deadline", type=float, default=0.0,
+                        help="Seconds allowed for all vendor lookups (0 means no limit).")
+    parser.add_argument("--scenarios", default="",
+                        help="Compare the vendor sets in a .csv file of 'name,exclude|select,"
+                        "vendor,...' rows.")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="Reuse the last vendor reduction when no part count, vendor offer, "
+                        "or vendor setting changed (any such change redoes all of it) and only "
+                        "rewrite report files whose contents changed (see 'order_manifest.json').")
     parser.add_argument("-s", "--search", default="searches",
                         help="BOM Manager Searches Directory.")
+    parser.add_argument("-j", "--jobs", type=int, default=8,
+                        help="Maximum number of concurrent vendor lookups.")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated seconds per request when replaying a cassette.")
+    parser.add_argument("--optimize", type=float, default=0.0,
+                        help="Seconds allowed for finding the lowest cost vendor set including "
+                        "shipping (0 means use the quicker heuristic).  The result is exact "
+                        "only when no vendor in 'vendor_costs.csv' has a minimum order; "
+                        "otherwise it is also a heuristic.")
     parser.add_argument("-o", "--order", default=os.path.join(os.getcwd(), "order"),
                         help="Order Information Directory")
+    parser.add_argument("-r", "--revalidate", action="store_true",
+                        help="Price stale parts from the cache and refresh them in the "
+                        "background.")
+    parser.add_argument("--record", default="",
+                        help="Record all vendor lookups and .csv fetches into a cassette file.")
+    parser.add_argument("--replay", default="",
+                        help="Replay vendor lookups and .csv fetches from a cassette file.")
+    parser.add_argument("--sweep", type=quantities_parse, default=[],
+                        help="Write the total cost for each build quantity "
+                        "(e.g. '1,10,100-500:100') into a cost_curve.csv file.")
     parser.add_argument("-v", "--verbose", action="count",
                         help="Set tracing level (defaults to 0 which is off).")
 
@@ -463,6 +546,18 @@ def command_line_arguments_process() -> Tuple[List[str], str, "Order"]:
         panda: Panda = panda_get()
         pandas.append(panda)
 
+    # When recording or replaying, route all of the *pandas* lookups through a *cassette*:
+    record_file_name: str = parsed_arguments["record"]
+    replay_file_name: str = parsed_arguments["replay"]
+    assert not (record_file_name and replay_file_name), "Can not both --record and --replay"
+    cassette: Optional[Cassette] = None
+    if record_file_name:
+        cassette = Cassette(record_file_name, False)
+    elif replay_file_name:
+        cassette = Cassette(replay_file_name, True, parsed_arguments["latency"])
+    if cassette is not None:
+        pandas = [CassettePanda(panda, cassette) for panda in pandas]
+
     # Fill in the *cads* list with *CAD* objects for reading in :
     cads: List[Cad] = list()
     entry_point_key = "bom_manager_cad_get"
@@ -479,7 +574,31 @@ def command_line_arguments_process() -> Tuple[List[str], str, "Order"]:
     # Now create the *order* object.  It is created here because we need *order*
     # for dealing with *bom_file_names* immediately below:
     order_root: str = parsed_arguments["order"]
-    order: Order = Order(order_root, cads, pandas)
+    lookups_maximum: int = parsed_arguments["jobs"]
+    order: Order = Order(order_root, cads, pandas, lookups_maximum)
+    order.cassette = cassette
+    order.lookups_deadline = parsed_arguments["deadline"]
+    order.optimize_time_limit = parsed_arguments["optimize"]
+    order.stale_while_revalidate = parsed_arguments["revalidate"]
+    order.sweep_quantities = parsed_arguments["sweep"]
+    if parsed_arguments["incremental"]:
+        order.manifest = OrderManifest(os.path.join(order.order_root, "order_manifest.json"))
+
+    # Append any additional *ReportWriter*'s from plug-ins to the *order*:
+    entry_point_key = "bom_manager_report_writer_get"
+    for index, entry_point in enumerate(pkg_resources.iter_entry_points(entry_point_key)):
+        entry_point_name = entry_point.name
+        if tracing:
+            print(f"{tracing}Report_Writer_Entry_Point[{index}]: '{entry_point_name}'")
+        assert entry_point_name == "report_writer_get"
+        report_writer_get: Callable = entry_point.load()
+        assert callable(report_writer_get)
+        report_writer: ReportWriter = report_writer_get()
+        order.report_writers.append(report_writer)
+    scenarios_file_name: str = parsed_arguments["scenarios"]
+    if scenarios_file_name:
+        assert os.path.isfile(scenarios_file_name), f"'{scenarios_file_name}' does not exist."
+        order.scenarios = Scenario.scenarios_read(scenarios_file_name)
     if tracing:
         print(f"{tracing}order_created")
 
@@ -574,17 +693,74 @@ def command_line_arguments_process() -> Tuple[List[str], str, "Order"]:
 #     return safe_attribute
 
 
+# quantities_parse():
+def quantities_parse(quantities_text: str) -> List[int]:
+    """ Return the sorted list of quantities in *quantities_text*, which is a comma separated
+        list of quantities (e.g. "10") and quantity ranges (e.g. "100-500" or "100-500:100"
+        where the number after the colon is the step.)
+    """
+    quantities_table: Dict[int, None] = {}
+    quantity_text: str
+    for quantity_text in quantities_text.split(","):
+        quantity_text = quantity_text.strip()
+        if quantity_text:
+            step: int = 1
+            if ":" in quantity_text:
+                quantity_text, step_text = quantity_text.split(":", 1)
+                step = int(step_text)
+            if "-" in quantity_text:
+                first_text, last_text = quantity_text.split("-", 1)
+                first: int = int(first_text)
+                last: int = int(last_text)
+                if first < 1 or first > last or step < 1:
+                    raise ValueError(f"Bad quantity range '{quantity_text}'")
+                for quantity in range(first, last + 1, step):
+                    quantities_table[quantity] = None
+            else:
+                quantity = int(quantity_text)
+                if quantity < 1:
+                    raise ValueError(f"Bad quantity '{quantity_text}'")
+                quantities_table[quantity] = None
+    return sorted(quantities_table.keys())
+
+
 # text_filter():
 def text_filter(text: str, function: Callable) -> str:
     return "".join([character for character in text if function(character)])
 
 
+# vendor_name_clean():
+@functools.lru_cache(maxsize=256)
+def vendor_name_clean(vendor_name: str) -> str:
+    """ Return *vendor_name* with the line breaks and the vendor membership decorations removed.
+        Every *VendorPart* cleans up its vendor name, but there are only a handful of distinct
+        vendor names, so the results are memoized (in a bounded cache.)
+    """
+    vendor_name = vendor_name.replace('\n', "")
+    if vendor_name.endswith(" •"):
+        vendor_name = vendor_name[:-2]
+    if vendor_name.endswith(" ECIA (NEDA) Member"):
+        vendor_name = vendor_name[:-19]
+    if vendor_name.endswith(" CEDA member"):
+        vendor_name = vendor_name[:-12]
+    vendor_name = vendor_name.strip(" \t")
+    return vendor_name
+
+
 # ActualPart:
 class ActualPart:
     # An *ActualPart* represents a single manufacturer part.
     # A list of vendor parts specifies where the part can be ordered from.
 
-    ACTUAL_PART_EXCHANGE_RATES: Dict[str, float] = dict()
+    # All prices are normalized into *ACTUAL_PART_BASE_CURRENCY* when each *PriceBreak* is
+    # created.  *ACTUAL_PART_EXCHANGE_RATES* is the cached rate table that maps a currency code
+    # to the value of one unit of that currency in the base currency.  A currency that is not
+    # in the rate table is only warned about once and is remembered in
+    # *ACTUAL_PART_MISSING_CURRENCIES*:
+    ACTUAL_PART_BASE_CURRENCY: str = "USD"
+    ACTUAL_PART_EXCHANGE_RATES: Dict[str, float] = {"USD": 1.0}
+    ACTUAL_PART_MISSING_CURRENCIES: Dict[str, None] = dict()  # Used as an ordered set
+    ACTUAL_PART_MISSING_CURRENCIES_LOCK: threading.Lock = threading.Lock()
 
     # ActualPart.__init__():
     def __init__(self, manufacturer_name: str, manufacturer_part_name: str) -> None:
@@ -599,6 +775,8 @@ class ActualPart:
         self.manufacturer_name: str = manufacturer_name
         self.manufacturer_part_name: str = manufacturer_part_name
         self.key: Tuple[str, str] = key
+        self.timestamp: int = 0  # Time of the last vendor parts lookup
+        self.fallback: bool = False  # *True* when priced from cached data after a failed lookup
         # Fields used by algorithm:
         self.quantity_needed: int = 0
         self.vendor_parts: List[VendorPart] = []
@@ -633,6 +811,61 @@ class ActualPart:
             manufacturer_part_name = actual_part.manufacturer_part_name
         return (f"ActualPart('{manufacturer_part_name}')")
 
+    # ActualPart.exchange_rate_get():
+    @staticmethod
+    def exchange_rate_get(currency: str) -> Optional[float]:
+        """ *ActualPart*: Return the value of one unit of *currency* in the base currency or
+            *None* if there is no exchange rate for *currency* (which is warned about once.)
+        """
+        exchange_rates: Dict[str, float] = ActualPart.ACTUAL_PART_EXCHANGE_RATES
+        if currency in exchange_rates:
+            return exchange_rates[currency]
+        missing_currencies: Dict[str, None] = ActualPart.ACTUAL_PART_MISSING_CURRENCIES
+        with ActualPart.ACTUAL_PART_MISSING_CURRENCIES_LOCK:
+            if currency not in missing_currencies:
+                missing_currencies[currency] = None
+                print(f"No exchange rate for currency '{currency}'; its price breaks are "
+                      "ignored (add it to the 'exchange_rates.csv' order file)")
+        return None
+
+    # ActualPart.exchange_rates_load():
+    @staticmethod
+    def exchange_rates_load(exchange_rates_file_name: str) -> int:
+        """ *ActualPart*: Load the exchange rate table from *exchange_rates_file_name* (a `.csv`
+            file of "currency,rate" rows where rate is the value of one unit of currency in
+            the base currency) and return the number of rates loaded.
+        """
+        exchange_rates: Dict[str, float] = ActualPart.ACTUAL_PART_EXCHANGE_RATES
+        rates_count: int = 0
+        exchange_rates_file: IO[str]
+        with open(exchange_rates_file_name) as exchange_rates_file:
+            row: List[str]
+            for row in csv.reader(exchange_rates_file):
+                if len(row) >= 2 and not row[0].startswith("#"):
+                    try:
+                        exchange_rates[row[0].strip().upper()] = float(row[1])
+                        rates_count += 1
+                    except ValueError:
+                        pass  # Ignore the header row (and any other junk)
+        exchange_rates[ActualPart.ACTUAL_PART_BASE_CURRENCY] = 1.0
+        return rates_count
+
+    # ActualPart.fingerprint_get():
+    def fingerprint_get(self) -> int:
+        """ *ActualPart*: Return a stable fingerprint of the contents of the *ActualPart* object
+            (i.e. *self*).  The cached *VendorPart* fingerprints are combined in a way that does
+            not depend on the order of the *VendorPart*'s, so no sorting is needed.  It is not
+            cached itself because a *VendorPart* can be changed (or shared) behind the back of
+            its *ActualPart*.
+        """
+        actual_part: ActualPart = self
+        vendor_parts_fingerprint: int = sum([vendor_part.fingerprint_get()
+                                             for vendor_part in actual_part.vendor_parts])
+        fingerprint_text: str = repr((actual_part.key, actual_part.timestamp,
+                                      vendor_parts_fingerprint & 0xffffffffffffffff))
+        return int.from_bytes(hashlib.blake2b(fingerprint_text.encode(),
+                                              digest_size=8).digest(), "big")
+
     # ActualPart.sorted_vendor_parts_get():
     def sorted_vendor_parts_get(self) -> "List[VendorPart]":
         actual_part: ActualPart = self
@@ -662,6 +895,47 @@ class ActualPart:
         actual_part: ActualPart = self
         actual_part.vendor_parts.append(vendor_part)
 
+    # ActualPart.vendor_parts_merge():
+    def vendor_parts_merge(self, new_vendor_parts: "List[VendorPart]",
+                           previous_actual_part: "Optional[ActualPart]",
+                           stale_vendor_names: List[str]) -> None:
+        """ *ActualPart*: Merge freshly looked up *new_vendor_parts* into the *ActualPart*
+            object (i.e. *self*).  When *stale_vendor_names* is empty, *new_vendor_parts*
+            replaces all of the *VendorPart*'s; otherwise, only the *VendorPart*'s for the
+            vendors in *stale_vendor_names* are replaced.  A new *VendorPart* with no
+            *PriceBreak*'s only refreshed the available quantity, so it keeps the
+            *PriceBreak*'s from *previous_actual_part*.
+        """
+        # Build *previous_vendor_parts_table* from *previous_actual_part*:
+        actual_part: ActualPart = self
+        previous_vendor_parts_table: Dict[Tuple[str, str], VendorPart] = dict()
+        previous_vendor_part: VendorPart
+        if previous_actual_part is not None:
+            for previous_vendor_part in previous_actual_part.vendor_parts:
+                previous_vendor_parts_table[previous_vendor_part.vendor_key] = previous_vendor_part
+
+        # Keep the fresh *previous_vendor_parts* when only some vendors were looked up:
+        merged_vendor_parts: List[VendorPart] = list()
+        if stale_vendor_names and previous_actual_part is not None:
+            previous_vendor_parts: List[VendorPart] = previous_actual_part.vendor_parts
+            merged_vendor_parts.extend([previous_vendor_part
+                                        for previous_vendor_part in previous_vendor_parts
+                                        if previous_vendor_part.vendor_name not in
+                                        stale_vendor_names])
+
+        # Now merge in *new_vendor_parts*, filling in any missing *price_breaks*:
+        new_vendor_part: VendorPart
+        for new_vendor_part in new_vendor_parts:
+            if stale_vendor_names and new_vendor_part.vendor_name not in stale_vendor_names:
+                continue
+            vendor_key: Tuple[str, str] = new_vendor_part.vendor_key
+            if not new_vendor_part.price_breaks and vendor_key in previous_vendor_parts_table:
+                previous_vendor_part = previous_vendor_parts_table[vendor_key]
+                new_vendor_part.price_breaks_set(previous_vendor_part.price_breaks,
+                                                 previous_vendor_part.price_breaks_timestamp)
+            merged_vendor_parts.append(new_vendor_part)
+        actual_part.vendor_parts = merged_vendor_parts
+
     # ActualPart.vendor_parts_restore():
     def vendor_parts_restore(self, order: "Order") -> bool:
         # FIXME: What does this routine actually do?:
@@ -703,12 +977,11 @@ class ActualPart:
 
         # Create *actual_part* with empty *vendor_parts*:
         actual_part: ActualPart = ActualPart(manufacturer_name, manufacturer_part_name)
-        vendor_parts: List[VendorPart] = actual_part.vendor_parts
 
-        # Process all of the `<VendorPart ...>` tags:
+        # Process all of the `<VendorPart ...>` tags.  Note that each *VendorPart* appends
+        # itself to the *vendor_parts* of *actual_part*:
         for vendor_part_tree in vendor_part_trees:
-            vendor_part: VendorPart = VendorPart.xml_parse(vendor_part_tree, actual_part)
-            vendor_parts.append(vendor_part)
+            VendorPart.xml_parse(vendor_part_tree, actual_part)
         return actual_part
 
 
@@ -728,6 +1001,225 @@ class Cad:
         return False
 
 
+# Cassette:
+class Cassette:
+    # A *Cassette* records each *Panda* lookup and *Collection.csv_fetch*() request along with
+    # its response so that the same traffic can be played back later without going out to any
+    # web sites.  This allows *Order.process*() to be profiled repeatably.  A *Cassette* file
+    # is gzip compressed XML.  When replaying, each request is delayed by *latency* seconds to
+    # simulate the time that the web site would have taken to respond.
+
+    # Cassette.__init__():
+    def __init__(self, file_name: str, replay: bool, latency: float = 0.0) -> None:
+        """ *Cassette*: Initialize *self* to record into *file_name* or, when *replay* is
+            *True*, to play back the requests previously recorded in *file_name*.
+        """
+        # Load up *cassette* (i.e. *self*):
+        # cassette: Cassette = self
+        # *csv_texts* maps (collection name, search url) to the fetched `.csv` file contents and
+        # *lookups_table* maps (panda name, manufacturer name, manufacturer part name, part name)
+        # to the `<ActualPart ...>` XML lines that contain the returned *VendorPart*'s:
+        self.csv_texts: Dict[Tuple[str, str], str] = dict()
+        self.file_name: str = file_name
+        self.latency: float = latency
+        self.lock: threading.Lock = threading.Lock()
+        self.lookups_table: Dict[Tuple[str, str, str, str], List[str]] = dict()
+        # *missing_csv_keys* and *missing_keys* list the `.csv` fetches and the lookups that were
+        # not recorded (see *Cassette.misses_print*()):
+        self.missing_csv_keys: List[Tuple[str, str]] = list()
+        self.missing_keys: List[Tuple[str, str, str, str]] = list()
+        self.replay: bool = replay
+
+        # Read in the previously recorded requests when replaying:
+        if replay:
+            assert os.path.isfile(file_name), f"Cassette file '{file_name}' does not exist."
+            cassette_file: gzip.GzipFile
+            with gzip.open(file_name, "rb") as cassette_file:
+                cassette_tree: etree._Element = etree.fromstring(cassette_file.read())
+            assert cassette_tree.tag == "Cassette"
+            request_tree: etree._Element
+            for request_tree in list(cassette_tree):
+                attributes_table: Dict[str, str] = request_tree.attrib
+                if request_tree.tag == "CsvFetch":
+                    self.csv_texts[(attributes_table["collection_name"],
+                                    attributes_table["url"])] = attributes_table["text"]
+                elif request_tree.tag == "PandaLookup":
+                    actual_part_tree: etree._Element = list(request_tree)[0]
+                    self.lookups_table[(attributes_table["panda_name"],
+                                        actual_part_tree.attrib["manufacturer_name"],
+                                        actual_part_tree.attrib["manufacturer_part_name"],
+                                        attributes_table["part_name"])] = \
+                        [etree.tostring(actual_part_tree, encoding="unicode")]
+                else:
+                    assert False, f"Unrecognized cassette tag '{request_tree.tag}'"
+
+    # Cassette.__str__():
+    def __str__(self) -> str:
+        cassette: Cassette = self
+        file_name: str = "??"
+        if hasattr(cassette, "file_name"):
+            file_name = cassette.file_name
+        return f"Cassette('{file_name}')"
+
+    # Cassette.csv_fetch():
+    def csv_fetch(self, collection: "Collection", search_url: str, csv_file_name: str) -> None:
+        """ *Cassette*: Fetch the `.csv` file for *search_url* into *csv_file_name* using
+            *collection*.  When recording, the fetched contents are remembered by the *Cassette*
+            object (i.e. *self*); when replaying, the remembered contents are written instead.
+            A `.csv` file that was never recorded raises *LookupError* (just like a fetch that
+            went wrong) and is reported by *Cassette.misses_print*().
+        """
+        # Grab some values from *cassette* (i.e. *self*):
+        cassette: Cassette = self
+        key: Tuple[str, str] = (collection.name, search_url)
+        csv_file: IO[str]
+        if cassette.replay:
+            # Remember any *key* that was never recorded so the rest of the run can keep going:
+            if key not in cassette.csv_texts:
+                with cassette.lock:
+                    cassette.missing_csv_keys.append(key)
+                raise LookupError(f"{key} was not recorded in {cassette}")
+
+            # Write out the recorded contents after the simulated *latency*:
+            time.sleep(cassette.latency)
+            csv_directory: str = os.path.dirname(csv_file_name)
+            if csv_directory and not os.path.isdir(csv_directory):
+                os.makedirs(csv_directory)
+            with open(csv_file_name, "w") as csv_file:
+                csv_file.write(cassette.csv_texts[key])
+        else:
+            # Perform the real fetch and remember what came back:
+            collection.csv_fetch(search_url, csv_file_name)
+            with open(csv_file_name) as csv_file:
+                csv_text: str = csv_file.read()
+            with cassette.lock:
+                cassette.csv_texts[key] = csv_text
+
+    # Cassette.misses_print():
+    def misses_print(self) -> None:
+        """ *Cassette*: Print out each `.csv` fetch and *Panda* lookup that could not be
+            replayed from the *Cassette* object (i.e. *self*) because it was never recorded.
+        """
+        cassette: Cassette = self
+        missing_csv_keys: List[Tuple[str, str]] = sorted(cassette.missing_csv_keys)
+        if missing_csv_keys:
+            print(f"{len(missing_csv_keys)} csv fetches were not recorded in {cassette} "
+                  "and were treated as failed fetches:")
+            missing_csv_key: Tuple[str, str]
+            for missing_csv_key in missing_csv_keys:
+                print(f"  {missing_csv_key[0]}: {missing_csv_key[1]}")
+        missing_keys: List[Tuple[str, str, str, str]] = sorted(cassette.missing_keys)
+        if missing_keys:
+            print(f"{len(missing_keys)} panda lookups were not recorded in {cassette} "
+                  "and were treated as failed lookups:")
+            missing_key: Tuple[str, str, str, str]
+            for missing_key in missing_keys:
+                print(f"  {missing_key[0]}: {missing_key[1]} {missing_key[2]} "
+                      f"('{missing_key[3]}')")
+
+    # Cassette.save():
+    def save(self) -> None:
+        """ *Cassette*: Write the recorded requests of the *Cassette* object (i.e. *self*)
+            out to its compressed file.  Nothing is written when replaying.
+        """
+        # Grab some values from *cassette* (i.e. *self*):
+        cassette: Cassette = self
+        file_name: str = cassette.file_name
+        if cassette.replay:
+            return
+
+        # Construct the *xml_lines* in a sorted order so that the file contents are stable:
+        xml_lines: List[str] = list()
+        xml_lines.append('<?xml version="1.0"?>')
+        xml_lines.append("<Cassette>")
+        csv_key: Tuple[str, str]
+        for csv_key in sorted(cassette.csv_texts.keys()):
+            xml_lines.append(f' <CsvFetch '
+                             f'collection_name="{Encode.to_attribute(csv_key[0])}" '
+                             f'url="{Encode.to_attribute(csv_key[1])}" '
+                             f'text="{Encode.to_attribute(cassette.csv_texts[csv_key])}"/>')
+        lookup_key: Tuple[str, str, str, str]
+        for lookup_key in sorted(cassette.lookups_table.keys()):
+            xml_lines.append(f' <PandaLookup '
+                             f'panda_name="{Encode.to_attribute(lookup_key[0])}" '
+                             f'part_name="{Encode.to_attribute(lookup_key[3])}">')
+            xml_lines.extend(cassette.lookups_table[lookup_key])
+            xml_lines.append(" </PandaLookup>")
+        xml_lines.append("</Cassette>")
+        xml_lines.append("")
+        xml_text: str = "\n".join(xml_lines)
+
+        # Write *xml_text* out to *file_name*:
+        cassette_file: IO[str]
+        with gzip.open(file_name, "wt") as cassette_file:
+            cassette_file.write(xml_text)
+        print(f"Recorded {len(cassette.csv_texts)} csv fetches and "
+              f"{len(cassette.lookups_table)} panda lookups into '{file_name}'.")
+
+    # Cassette.vendor_parts_lookup():
+    def vendor_parts_lookup(self, panda: "Panda", actual_parts: List[ActualPart],
+                            part_names: List[str]) -> "List[List[VendorPart]]":
+        """ *Cassette*: Look up the *VendorPart*'s for each *ActualPart* in *actual_parts* using
+            *panda* and return one list of *VendorPart*'s per *ActualPart*.  When recording,
+            the *VendorPart*'s are remembered by the *Cassette* object (i.e. *self*); when
+            replaying, the remembered *VendorPart*'s are used instead and the whole request is
+            delayed by the simulated *latency*.
+        """
+        # Grab some values from *cassette* (i.e. *self*):
+        cassette: Cassette = self
+        assert len(actual_parts) == len(part_names)
+        keys: List[Tuple[str, str, str, str]] = [(panda.name, actual_part.manufacturer_name,
+                                                  actual_part.manufacturer_part_name,
+                                                  part_names[index])
+                                                 for index, actual_part in enumerate(actual_parts)]
+        index: int
+        actual_part: ActualPart
+        vendor_parts_lists: List[List[VendorPart]]
+        if cassette.replay:
+            # A request that was never recorded fails just like a real lookup that went wrong,
+            # so that the rest of the run can keep going.  The misses are reported at the end:
+            missing_keys: List[Tuple[str, str, str, str]] = [
+              key for key in keys if key not in cassette.lookups_table]
+            if missing_keys:
+                with cassette.lock:
+                    cassette.missing_keys.extend(missing_keys)
+                raise LookupError(f"{len(missing_keys)} of {len(keys)} lookups were not "
+                                  f"recorded in {cassette}")
+
+            # Append a fresh copy of the recorded *VendorPart*'s to each *actual_part*.  The
+            # *VendorPart*'s are stamped with the current time just like a real lookup:
+            time.sleep(cassette.latency)
+            now: int = int(time.time())
+            vendor_parts_lists = list()
+            for index, actual_part in enumerate(actual_parts):
+                key: Tuple[str, str, str, str] = keys[index]
+                actual_part_tree: etree._Element = \
+                    etree.fromstring("\n".join(cassette.lookups_table[key]))
+                vendor_parts: List[VendorPart] = list()
+                vendor_part_tree: etree._Element
+                for vendor_part_tree in list(actual_part_tree):
+                    vendor_part: VendorPart = VendorPart.xml_parse(vendor_part_tree, actual_part)
+                    vendor_part.timestamps_set(now, now)
+                    vendor_parts.append(vendor_part)
+                vendor_parts_lists.append(vendor_parts)
+        else:
+            # Perform the real lookup and remember the *VendorPart*'s that came back:
+            if len(actual_parts) == 1:
+                vendor_parts_lists = [panda.vendor_parts_lookup(actual_parts[0], part_names[0])]
+            else:
+                vendor_parts_lists = panda.vendor_parts_lookup_batch(actual_parts, part_names)
+            assert len(vendor_parts_lists) == len(actual_parts)
+            for index, actual_part in enumerate(actual_parts):
+                record_actual_part: ActualPart = ActualPart(actual_part.manufacturer_name,
+                                                            actual_part.manufacturer_part_name)
+                record_actual_part.vendor_parts = list(vendor_parts_lists[index])
+                xml_lines: List[str] = list()
+                record_actual_part.xml_lines_append(xml_lines, "  ")
+                with cassette.lock:
+                    cassette.lookups_table[keys[index]] = xml_lines
+        return vendor_parts_lists
+
+
 # Comment:
 class Comment:
 
@@ -937,6 +1429,154 @@ class TableComment(Comment):
         return table_comment
 
 
+# CostMatrix:
+class CostMatrix:
+    # A *CostMatrix* is a dense table of the best achievable cost of each *ChoicePart* (the
+    # rows) from each vendor (the columns) at the required quantity of the *ChoicePart*.  The
+    # cost is *math.inf* when a vendor can not supply a *ChoicePart*.  It is built once from
+    # the cached offers of each *ChoicePart* (see *ChoicePart.offers_get*()), and a set of
+    # excluded vendors is just a column mask.  Each row also remembers its columns in the same
+    # order that *ChoicePart.select*() would prefer them, so the row minimum under a mask is the
+    # first unmasked column and matches *ChoicePart.select*() exactly (ties included.)
+
+    # CostMatrix.__init__():
+    def __init__(self, choice_parts: "List[ChoicePart]") -> None:
+        """ *CostMatrix*: Initialize *self* to contain the costs of *choice_parts*. """
+        # Grab the sorted offers for each *choice_part* and find the first (i.e. best) offer
+        # from each vendor:
+        offers_lists: List[List[Quint]] = []
+        row_offers_tables: List[Dict[str, Quint]] = []
+        vendor_names_table: Dict[str, None] = {}
+        choice_part: ChoicePart
+        for choice_part in choice_parts:
+            offers: List[Quint] = choice_part.offers_get(choice_part.count_get())
+            actual_parts: List[ActualPart] = choice_part.actual_parts
+            row_offers_table: Dict[str, Quint] = {}
+            offer: Quint
+            for offer in offers:
+                vendor_name: str = actual_parts[offer[2]].vendor_parts[offer[3]].vendor_name
+                if vendor_name not in row_offers_table:
+                    row_offers_table[vendor_name] = offer
+                    vendor_names_table[vendor_name] = None
+            offers_lists.append(offers)
+            row_offers_tables.append(row_offers_table)
+        vendor_names: List[str] = sorted(vendor_names_table.keys())
+        vendor_indices: Dict[str, int] = {vendor_name: column
+                                          for column, vendor_name in enumerate(vendor_names)}
+
+        # Fill in the dense *costs* and *cell_offers* rows, and the *row_columns* in preference
+        # order (*row_offers_table* was filled in sorted offer order):
+        costs: List[List[float]] = []
+        cell_offers: List[List[Optional[Quint]]] = []
+        rows_columns: List[List[int]] = []
+        for row_offers_table in row_offers_tables:
+            row_costs: List[float] = [math.inf] * len(vendor_names)
+            row_cell_offers: List[Optional[Quint]] = [None] * len(vendor_names)
+            row_columns: List[int] = []
+            for vendor_name, offer in row_offers_table.items():
+                column: int = vendor_indices[vendor_name]
+                row_costs[column] = offer[0]
+                row_cell_offers[column] = offer
+                row_columns.append(column)
+            costs.append(row_costs)
+            cell_offers.append(row_cell_offers)
+            rows_columns.append(row_columns)
+
+        # Load up *cost_matrix* (i.e. *self*):
+        # cost_matrix: CostMatrix = self
+        self.cell_offers: List[List[Optional[Quint]]] = cell_offers
+        self.choice_parts: List[ChoicePart] = choice_parts
+        self.costs: List[List[float]] = costs
+        self.offers_lists: List[List[Quint]] = offers_lists
+        self.rows_columns: List[List[int]] = rows_columns
+        self.vendor_indices: Dict[str, int] = vendor_indices
+        self.vendor_names: List[str] = vendor_names
+
+    # CostMatrix.__str__():
+    def __str__(self) -> str:
+        cost_matrix: CostMatrix = self
+        return (f"CostMatrix({len(cost_matrix.costs)}x{len(cost_matrix.vendor_names)})")
+
+    # CostMatrix.is_current():
+    def is_current(self, choice_parts: "List[ChoicePart]") -> bool:
+        """ *CostMatrix*: Return *True* if the *CostMatrix* object (i.e. *self*) was built
+            from *choice_parts* and none of their offers have changed since.
+        """
+        cost_matrix: CostMatrix = self
+        offers_lists: List[List[Quint]] = cost_matrix.offers_lists
+        is_current: bool = len(choice_parts) == len(offers_lists)
+        if is_current:
+            index: int
+            choice_part: ChoicePart
+            for index, choice_part in enumerate(choice_parts):
+                # *ChoicePart.offers_get*() returns the same list until something changes:
+                if (choice_part is not cost_matrix.choice_parts[index] or
+                   choice_part.offers_get(choice_part.count_get()) is not offers_lists[index]):
+                    is_current = False
+                    break
+        return is_current
+
+    # CostMatrix.mask_get():
+    def mask_get(self, excluded_vendor_names: Dict[str, None]) -> List[bool]:
+        """ *CostMatrix*: Return the column mask of the *CostMatrix* object (i.e. *self*)
+            where the columns of the vendors in *excluded_vendor_names* are *False*.
+        """
+        cost_matrix: CostMatrix = self
+        return [vendor_name not in excluded_vendor_names
+                for vendor_name in cost_matrix.vendor_names]
+
+    # CostMatrix.selections_apply():
+    def selections_apply(self, selections: List[int]) -> None:
+        """ *CostMatrix*: Store *selections* (from *CostMatrix.selections_get*()) into the
+            *ChoicePart*'s of the *CostMatrix* object (i.e. *self*).  Rows without a selection
+            are left alone, just like *ChoicePart.select*() does.
+        """
+        cost_matrix: CostMatrix = self
+        cell_offers: List[List[Optional[Quint]]] = cost_matrix.cell_offers
+        row: int
+        column: int
+        for row, column in enumerate(selections):
+            if column >= 0:
+                offer: Optional[Quint] = cell_offers[row][column]
+                assert offer is not None
+                cost_matrix.choice_parts[row].offer_select(offer)
+
+    # CostMatrix.selections_get():
+    def selections_get(self, mask: List[bool]) -> List[int]:
+        """ *CostMatrix*: Return the selected column of each row of the *CostMatrix*
+            object (i.e. *self*) using the columns allowed by *mask*.  -1 is returned
+            for a row that can not be supplied by any of the allowed columns.
+        """
+        cost_matrix: CostMatrix = self
+        selections: List[int] = []
+        row_columns: List[int]
+        for row_columns in cost_matrix.rows_columns:
+            selection: int = -1
+            column: int
+            for column in row_columns:
+                if mask[column]:
+                    selection = column
+                    break
+            selections.append(selection)
+        return selections
+
+    # CostMatrix.vendor_costs_get():
+    def vendor_costs_get(self, selections: List[int]) -> Dict[str, float]:
+        """ *CostMatrix*: Return a table of the total cost of *selections* for each vendor
+            of the *CostMatrix* object (i.e. *self*).
+        """
+        cost_matrix: CostMatrix = self
+        costs: List[List[float]] = cost_matrix.costs
+        vendor_names: List[str] = cost_matrix.vendor_names
+        vendor_costs: Dict[str, float] = {vendor_name: 0.0 for vendor_name in vendor_names}
+        row: int
+        column: int
+        for row, column in enumerate(selections):
+            if column >= 0:
+                vendor_costs[vendor_names[column]] += costs[row][column]
+        return vendor_costs
+
+
 # Encode:
 class Encode:
 
@@ -1246,6 +1886,240 @@ class Enumeration:
         return enumeration
 
 
+# Fetcher:
+class Fetcher:
+    # A *Fetcher* is the shared HTTP service that *Panda* and *Collection* plug-ins use to
+    # fetch web pages.  It keeps a pool of keep-alive connections for each host, caches
+    # successful responses on disk for *ttl* seconds, coalesces identical requests that are
+    # in flight at the same time into a single request, and keeps timing metrics per host.
+    # It is safe to use from multiple threads.
+
+    # Fetcher.__init__():
+    def __init__(self, cache_root: str, ttl: float = 24 * 60 * 60, timeout: float = 30.0) -> None:
+        """ *Fetcher*: Initialize *self* to cache responses in the *cache_root* directory
+            for *ttl* seconds by default and to time out requests after *timeout* seconds. """
+        # Ensure that *cache_root* exists:
+        if not os.path.isdir(cache_root):
+            os.makedirs(cache_root)
+
+        # Load up *fetcher* (i.e. *self*):
+        # fetcher: Fetcher = self
+        self.cache_root: str = cache_root
+        self.connections_table: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = dict()
+        self.in_flight_table: Dict[str, concurrent.futures.Future] = dict()
+        self.lock: threading.Lock = threading.Lock()
+        self.metrics_table: Dict[str, Dict[str, float]] = dict()  # Dict[host, Dict[name, value]]
+        self.timeout: float = timeout
+        self.ttl: float = ttl
+
+    # Fetcher.__str__():
+    def __str__(self) -> str:
+        fetcher: Fetcher = self
+        cache_root: str = "??"
+        if hasattr(fetcher, "cache_root"):
+            cache_root = fetcher.cache_root
+        return f"Fetcher('{cache_root}')"
+
+    # Fetcher.cache_file_name_get():
+    def cache_file_name_get(self, request_key: str) -> str:
+        """ *Fetcher*: Return the cache file name for *request_key*. """
+        fetcher: Fetcher = self
+        digest: str = hashlib.sha1(request_key.encode()).hexdigest()
+        return os.path.join(fetcher.cache_root, digest[:2], digest + ".body")
+
+    # Fetcher.connection_get():
+    def connection_get(self, scheme: str, host: str) -> "Tuple[http.client.HTTPConnection, bool]":
+        """ *Fetcher*: Return a connection to *host* using *scheme* ("http" or "https") along
+            with a flag that is *True* if the connection is being reused from the pool.
+        """
+        fetcher: Fetcher = self
+        connection_key: Tuple[str, str] = (scheme, host)
+        with fetcher.lock:
+            connections: List[http.client.HTTPConnection] = \
+                fetcher.connections_table.get(connection_key, [])
+            if connections:
+                return connections.pop(), True
+        fetcher.metric_add(host, "connections", 1.0)
+        connection: http.client.HTTPConnection
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(host, timeout=fetcher.timeout)
+        else:
+            connection = http.client.HTTPConnection(host, timeout=fetcher.timeout)
+        return connection, False
+
+    # Fetcher.connection_put():
+    def connection_put(self, scheme: str, host: str,
+                       connection: http.client.HTTPConnection) -> None:
+        """ *Fetcher*: Return *connection* to *host* back to the pool for reuse. """
+        fetcher: Fetcher = self
+        connection_key: Tuple[str, str] = (scheme, host)
+        with fetcher.lock:
+            if connection_key not in fetcher.connections_table:
+                fetcher.connections_table[connection_key] = list()
+            fetcher.connections_table[connection_key].append(connection)
+
+    # Fetcher.fetch():
+    def fetch(self, url: str, ttl: float = -1.0,
+              headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        """ *Fetcher*: Fetch *url* and return the (status, body) of the response.  A
+            successful response is cached for *ttl* seconds (where a negative *ttl* means
+            the default for the *Fetcher* object (i.e. *self*) and 0 means do not cache.)
+            *headers* specifies any additional request headers.  If an identical request is
+            already in flight, its response is shared rather than fetching *url* again.
+        """
+        # Grab some values from *fetcher* (i.e. *self*):
+        fetcher: Fetcher = self
+        if ttl < 0.0:
+            ttl = fetcher.ttl
+        if headers is None:
+            headers = dict()
+        host: str = urllib.parse.urlsplit(url).netloc
+        request_key: str = url if not headers else f"{url} {sorted(headers.items())}"
+
+        # Return the cached response if it is fresh enough:
+        cache_file_name: str = fetcher.cache_file_name_get(request_key)
+        cache_file: IO[bytes]
+        if ttl > 0.0 and os.path.isfile(cache_file_name):
+            if os.path.getmtime(cache_file_name) + ttl > time.time():
+                with open(cache_file_name, "rb") as cache_file:
+                    fetcher.metric_add(host, "cache_hits", 1.0)
+                    return 200, cache_file.read()
+
+        # Share the response of an identical request that is already in flight:
+        future: concurrent.futures.Future
+        with fetcher.lock:
+            in_flight_future: Optional[concurrent.futures.Future] = \
+                fetcher.in_flight_table.get(request_key)
+            if in_flight_future is None:
+                future = concurrent.futures.Future()
+                fetcher.in_flight_table[request_key] = future
+        if in_flight_future is not None:
+            fetcher.metric_add(host, "coalesced", 1.0)
+            return in_flight_future.result()
+
+        # Perform the request and hand the result to any requests that were coalesced into it:
+        try:
+            response: Tuple[int, bytes] = fetcher.request_perform(url, headers)
+            future.set_result(response)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with fetcher.lock:
+                del fetcher.in_flight_table[request_key]
+
+        # Cache successful responses, writing to a temporary file first so that other readers
+        # never see a partial file:
+        status: int
+        body: bytes
+        status, body = response
+        if status == 200 and ttl > 0.0:
+            cache_directory: str = os.path.dirname(cache_file_name)
+            if not os.path.isdir(cache_directory):
+                os.makedirs(cache_directory, exist_ok=True)
+            temporary_file_name: str = f"{cache_file_name}.{threading.get_ident()}"
+            with open(temporary_file_name, "wb") as cache_file:
+                cache_file.write(body)
+            os.replace(temporary_file_name, cache_file_name)
+        return response
+
+    # Fetcher.metric_add():
+    def metric_add(self, host: str, name: str, amount: float) -> None:
+        """ *Fetcher*: Add *amount* to the *name* metric for *host*. """
+        fetcher: Fetcher = self
+        with fetcher.lock:
+            if host not in fetcher.metrics_table:
+                fetcher.metrics_table[host] = dict()
+            metrics: Dict[str, float] = fetcher.metrics_table[host]
+            metrics[name] = metrics.get(name, 0.0) + amount
+
+    # Fetcher.metrics_print():
+    def metrics_print(self) -> None:
+        """ *Fetcher*: Print out the per host metrics of the *Fetcher* object (i.e. *self*). """
+        fetcher: Fetcher = self
+        host: str
+        for host in sorted(fetcher.metrics_table.keys()):
+            metrics: Dict[str, float] = fetcher.metrics_table[host]
+            requests: int = int(metrics.get("requests", 0.0))
+            seconds: float = metrics.get("seconds", 0.0)
+            average: float = seconds / requests if requests else 0.0
+            print(f"{host}: {requests} requests ({int(metrics.get('connections', 0.0))} "
+                  f"connections, {average:.3f} sec average), "
+                  f"{int(metrics.get('cache_hits', 0.0))} cache hits, "
+                  f"{int(metrics.get('coalesced', 0.0))} coalesced, "
+                  f"{int(metrics.get('bytes', 0.0))} bytes")
+
+    # Fetcher.request_perform():
+    def request_perform(self, url: str, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        """ *Fetcher*: Perform a GET request for *url* with *headers* using a pooled connection
+            and return the (status, body) of the response.  Redirects are followed.
+        """
+        fetcher: Fetcher = self
+        redirects_count: int
+        for redirects_count in range(6):
+            # Split *url* into the pieces needed by *http.client*:
+            split_url: urllib.parse.SplitResult = urllib.parse.urlsplit(url)
+            scheme: str = split_url.scheme
+            host: str = split_url.netloc
+            path: str = split_url.path if split_url.path else "/"
+            if split_url.query:
+                path += "?" + split_url.query
+            request_headers: Dict[str, str] = {"Accept-Encoding": "gzip",
+                                               "User-Agent": "bom_manager"}
+            request_headers.update(headers)
+
+            # Perform the request.  A pooled connection may have been closed by the server
+            # since it was last used, so a failure on a reused connection is tried again once
+            # with a new connection:
+            start_time: float = time.monotonic()
+            connection: http.client.HTTPConnection
+            reused: bool
+            connection, reused = fetcher.connection_get(scheme, host)
+            try:
+                connection.request("GET", path, headers=request_headers)
+                response: http.client.HTTPResponse = connection.getresponse()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if not reused:
+                    raise
+                connection, reused = fetcher.connection_get(scheme, host)
+                while reused:
+                    connection.close()
+                    connection, reused = fetcher.connection_get(scheme, host)
+                connection.request("GET", path, headers=request_headers)
+                response = connection.getresponse()
+
+            # Read the response body.  A connection that fails part way through a response
+            # (or returns a corrupt gzip body) is in an unknown state, so it is closed rather
+            # than returned to the pool:
+            status: int = response.status
+            body: bytes
+            try:
+                body = response.read()
+                if response.getheader("Content-Encoding", "") == "gzip":
+                    body = gzip.decompress(body)
+            except BaseException:
+                connection.close()
+                raise
+            location: str = response.getheader("Location", "")
+            if response.will_close:
+                connection.close()
+            else:
+                fetcher.connection_put(scheme, host, connection)
+
+            # Update the metrics for *host*:
+            fetcher.metric_add(host, "requests", 1.0)
+            fetcher.metric_add(host, "seconds", time.monotonic() - start_time)
+            fetcher.metric_add(host, "bytes", float(len(body)))
+
+            # Follow any redirect:
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            break
+        return status, body
+
+
 # Filter:
 class Filter:
 
@@ -1965,6 +2839,9 @@ class Directory(Node):
 # Collection:
 class Collection(Node):
 
+    # *fetcher_lock* ensures that only one shared *Fetcher* is created:
+    fetcher_lock: threading.Lock = threading.Lock()
+
     # Collection.__init__():
     @trace(1)
     def __init__(self, name: str, parent: Node,
@@ -2047,7 +2924,19 @@ class Collection(Node):
                                           if os.path.isfile(csv_file_name) else 0)
             if csv_modification_time + stale_time < now:
                 assert isinstance(collection, Collection)
-                collection.csv_fetch(search_url, csv_file_name)
+                collections: Node = collection.parent
+                assert isinstance(collections, Collections)
+                cassette: Optional[Cassette] = collections.cassette
+                if cassette is None:
+                    collection.csv_fetch(search_url, csv_file_name)
+                else:
+                    try:
+                        cassette.csv_fetch(collection, search_url, csv_file_name)
+                    except LookupError:
+                        # The miss is reported by *Cassette.misses_print*().  Fall back to any
+                        # stale `.csv` file; without one, there are no *actual_parts*:
+                        if not os.path.isfile(csv_file_name):
+                            return actual_parts
 
             # Read in the *csv_file_name*:
             assert os.path.isfile(csv_file_name)
@@ -2105,6 +2994,15 @@ class Collection(Node):
         collection: Collection = self
         gui.collection_clicked(collection)
 
+    # Collection.csv_fetch():
+    def csv_fetch(self, search_url: str, csv_file_name: str) -> None:
+        """ *Collection*: Fetch the `.csv` file for *search_url* into *csv_file_name*.  This
+            is provided by the plug-in sub-class of *Collection*.
+        """
+        collection: Collection = self
+        class_name: str = collection.__class__.__name__
+        assert False, f"{class_name}.csv_fetch() has not been implemented."
+
     # Collection.directories_get():
     def directories_get(self) -> List[Directory]:
         collection: Collection = self
@@ -2114,6 +3012,21 @@ class Collection(Node):
             directories.extend(node.directories_get())
         return directories
 
+    # Collection.fetcher_get():
+    def fetcher_get(self) -> Fetcher:
+        """ *Collection*: Return the shared *Fetcher* that the *Collection* object (i.e. *self*)
+            should use to fetch web pages.  When none has been provided, one that caches
+            under the searches root is created.
+        """
+        collection: Collection = self
+        collections: Node = collection.parent
+        assert isinstance(collections, Collections)
+        with Collection.fetcher_lock:
+            if collections.fetcher is None:
+                collections.fetcher = Fetcher(os.path.join(collections.searches_root,
+                                                           "fetch_cache"))
+        return collections.fetcher
+
     # Collection.key():
     @staticmethod
     def key(collection: "Collection") -> Any:
@@ -2269,9 +3182,12 @@ class Collections(Node):
         # Intialize the *Node* super class of *collections* (i.e. *self*):
         super().__init__(name, collections, bogus_collection, gui=gui)
 
-        # Now we can define the additional fields that we need
+        # Now we can define the additional fields that we need.  *cassette* is used to record
+        # or replay `.csv` fetches:
         self.searches_root: str = searches_root
         self.bogus_collection: Collection = bogus_collection
+        self.cassette: Optional[Cassette] = None
+        self.fetcher: Optional[Fetcher] = None  # Shared by all *Collection*'s
 
         # Construct the collections list:
         tracing: str = tracing_get()
@@ -2312,6 +3228,7 @@ class Collections(Node):
         # *ActualPart*'s that match *search_name*:
         collections: Collections = self
         actual_parts: List[ActualPart] = []
+        actual_parts_table: Dict[Tuple[str, str], ActualPart] = dict()
         tracing: str = tracing_get()
         index: int
         collection: Node
@@ -2320,10 +3237,19 @@ class Collections(Node):
             if tracing:
                 print(f"{tracing}Collection[{index}]:{collection.name}")
             collection_actual_parts: List[ActualPart] = collection.actual_parts_lookup(choice_part)
-            actual_parts.extend(collection_actual_parts)
 
-        # FIXME: Cull out duplicate acutal parts (i.e. for the same manufacturer.):
-        pass
+            # Cull out duplicate actual parts (i.e. the same manufacturer and manufacturer
+            # part name found via more than one collection) so that each one is only looked
+            # up and priced once.  The first one found wins so that the order is stable:
+            actual_part: ActualPart
+            for actual_part in collection_actual_parts:
+                key: Tuple[str, str] = actual_part.key
+                if key in actual_parts_table:
+                    if tracing:
+                        print(f"{tracing}Duplicate actual part {key} culled")
+                else:
+                    actual_parts_table[key] = actual_part
+                    actual_parts.append(actual_part)
 
         return actual_parts
 
@@ -3517,8 +4443,10 @@ class Order:
     # listed as well.
 
     # Order.__init__():
-    def __init__(self, order_root: str, cads: List[Cad], pandas: "List[Panda]") -> None:
-        """ *Order*: Initialize *self* for an order. """
+    def __init__(self, order_root: str, cads: List[Cad], pandas: "List[Panda]",
+                 lookups_maximum: int = 8) -> None:
+        """ *Order*: Initialize *self* for an order.  *lookups_maximum* is the maximum number
+            of *Panda* lookups that are performed concurrently. """
 
         # Ensure that *order_root* exists:
         if not os.path.isdir(order_root):
@@ -3538,6 +4466,29 @@ class Order:
             os.mkdir(vendor_searches_root)
         assert os.path.isdir(vendor_searches_root)
 
+        # Load the exchange rates used to normalize the prices of each *PriceBreak* into
+        # the base currency:
+        exchange_rates_file_name: str = os.path.join(order_root, "exchange_rates.csv")
+        if os.path.isfile(exchange_rates_file_name):
+            ActualPart.exchange_rates_load(exchange_rates_file_name)
+
+        # Open the *vendor_parts_cache*.  When it is first created, import any older
+        # per-*ChoicePart* `.xml` files from *vendor_searches_root* into it:
+        vendor_parts_cache_file_name: str = os.path.join(order_root, "vendor_parts.db")
+        vendor_parts_cache_is_new: bool = not os.path.isfile(vendor_parts_cache_file_name)
+        vendor_parts_cache: VendorPartsCache = VendorPartsCache(vendor_parts_cache_file_name)
+        if vendor_parts_cache_is_new:
+            imported_count: int = vendor_parts_cache.xml_caches_import(vendor_searches_root)
+            if imported_count:
+                print(f"Imported {imported_count} actual parts from '{vendor_searches_root}' "
+                      f"into '{vendor_parts_cache_file_name}'.")
+
+        # Create the shared *fetcher* and hand it to each *Panda* in *pandas*:
+        fetcher: Fetcher = Fetcher(os.path.join(order_root, "fetch_cache"))
+        panda: Panda
+        for panda in pandas:
+            panda.fetcher_set(fetcher)
+
         # Priorities 0-9 are for vendors with significant minimum
         # order amounts or trans-oceanic shipping costs:
         vendor_priorities: Dict[str, int] = {}
@@ -3561,21 +4512,57 @@ class Order:
 
         # Stuff values into *order* (i.e. *self*):
         # order: Order = self
+        # *actual_parts_table* contains each *ActualPart* that has been refreshed during the
+        # current run so that it is only looked up once, no matter how many *ChoicePart*'s use it:
+        self.actual_parts_table: Dict[Tuple[str, str], ActualPart] = {}
         self.cads: List[Cad] = cads
+        self.cassette: Optional[Cassette] = None  # Used to record or replay web traffic
+        self.cost_matrix: Optional[CostMatrix] = None  # Cached by *Order.cost_matrix_get*()
         self.excluded_vendor_names: Dict[str, None] = {}  # Excluded vendors
+        self.fetcher: Fetcher = fetcher  # Shared by all of the *Panda*'s and *Collection*'s
         self.final_choice_parts: List[ChoicePart] = []
         self.inventories: List[Inventory] = []      # List[Inventory]: Existing inventoried parts
+        self.lookups_deadline: float = 0.0  # Seconds allowed for all lookups (0.0 means no limit)
+        # The *manifest* is only present in incremental mode (see *Order.output_open*()):
+        self.manifest: "Optional[OrderManifest]" = None
+        # Seconds allowed for *Order.vendors_optimize*() (0.0 means use the greedy heuristic):
+        self.optimize_time_limit: float = 0.0
+        self.order_result: "Optional[OrderResult]" = None  # Set by *Order.process*()
         self.order_root: str = order_root
         self.pandas: List[Panda] = pandas
+        self.panda_pool: PandaPool = PandaPool(pandas, lookups_maximum)
         self.projects: List[Project] = []                 # List[Project]
+        # The *ReportWriter*'s run by *Order.reports_write*() (plug-ins are appended):
+        self.report_writers: "List[ReportWriter]" = [
+          AssemblyReportWriter(), BomReportWriter(), ColumnarReportWriter(), CsvReportWriter(),
+          JsonLinesReportWriter()]
         self.projects_table: Dict[str, Project] = {}      # Dict[Net_File_Name, Project]
+        self.price_breaks_stale: int = 6 * 7 * 24 * 60 * 60  # 6 weeks
+        # In stale-while-revalidate mode, stale *ActualPart*'s are priced from the vendor parts
+        # cache and refreshed in the background.  Afterwards, any *ChoicePart* whose selected
+        # vendor changed or whose cost changed by more than *revalidate_threshold* (a fraction
+        # of the cost) is listed in a delta report:
+        self.revalidate_future: Optional[concurrent.futures.Future] = None
+        self.revalidate_refreshes: List[Refresh] = []
+        self.revalidate_threshold: float = 0.05
+        self.scenarios: "List[Scenario]" = []  # What if vendor sets for *Order.scenarios_write*()
         self.selected_vendor_names: List[str] = []
-        self.stale: int = 2 * 7 * 24 * 60 * 60  # 2 weeks
+        self.shipping_cost_default: float = 15.0  # Shipping cost for vendors not listed below
+        self.stale: int = 2 * 7 * 24 * 60 * 60  # 2 weeks (for quantity available)
+        self.stale_while_revalidate: bool = False
+        self.sweep_quantities: List[int] = []  # Build quantities for *Order.cost_curve_write*()
         # self.requests: List[Request] = []           # List[Request]: Additional requested parts
         self.vendor_minimums: Dict[str, float] = vendor_minimums
+        self.vendor_parts_cache: VendorPartsCache = vendor_parts_cache
         self.vendor_priorities: Dict[str, int] = vendor_priorities
         self.vendor_priority: int = 10
         self.vendor_searches_root: str = vendor_searches_root
+        self.vendor_shipping_costs: Dict[str, float] = {}
+
+        # Load any per vendor shipping costs and minimum orders:
+        vendor_costs_file_name: str = os.path.join(order_root, "vendor_costs.csv")
+        if os.path.isfile(vendor_costs_file_name):
+            self.vendor_costs_load(vendor_costs_file_name)
 
     # Order.__str__():
     def __str__(self) -> str:
@@ -3607,58 +4594,46 @@ class Order:
 
     # Order.bom_write():
     @trace(1)
-    def bom_write(self, bom_file_name: str, key_function: "Callable[[ChoicePart], Any]") -> None:
+    def bom_write(self, order_result: "OrderResult", bom_file_name: str,
+                  key_function: "Callable[[Selection], Any]") -> None:
         """ *Order*: Write out the BOM (Bill Of Materials) for the
             *Order* object (i.e. *self*) to *bom_file_name* ("" for stdout)
-            using *key_function* to provide the sort key for each
-            *ChoicePart*.
+            from *order_result* using *key_function* to provide the sort key for each
+            *Selection*.
         """
-        # Grab some values from *order* (i.e. *self*):
+        # Sort the *selections* of *order_result* using *key_function*:
         order: Order = self
-        excluded_vendor_names: Dict[str, None] = order.excluded_vendor_names
-        final_choice_parts: List[ChoicePart] = order.final_choice_parts
+        selections: List[Selection] = sorted(order_result.selections, key=key_function)
         tracing: str = tracing_get()
         if tracing:
-            print(f"{tracing}len(final_choice_parts)={len(final_choice_parts)}")
-
-        # Sort *final_choice_parts* using *key_function*.
-        final_choice_parts.sort(key=key_function)
+            print(f"{tracing}len(selections)={len(selections)}")
 
         # Open *bom_file*
         bom_file: IO[str]
-        with (sys.stdout if bom_file_name == "" else open(bom_file_name, "w")) as bom_file:
+        with (sys.stdout if bom_file_name == "" else
+              order.output_open(bom_file_name)) as bom_file:
             # Now generate a BOM summary:
             total_cost: float = 0.0
-            choice_part: ChoicePart
-            for choice_part in final_choice_parts:
-                # Sort the *pose_parts* by *project* followed by reference:
-                pose_parts: List[PosePart] = choice_part.pose_parts
-                pose_parts.sort(key=lambda pose_part:
-                                (pose_part.project.name, pose_part.reference.upper(),
-                                 int(text_filter(pose_part.reference, str.isdigit))))
-
+            selection: Selection
+            for selection in selections:
                 # Write the first line out to *bom_file*:
+                choice_part: ChoicePart = selection[0]
                 part_name: str = choice_part.name
                 part_footprint: str = choice_part.footprint
                 part_description: str = choice_part.description
                 part_count: int = choice_part.count_get()
-                part_references_text: str = choice_part.references_text_get()
+                part_references_text: str = selection[7]
                 bom_file.write(f"  {part_name}:{part_footprint};{part_description}"
                                f" {part_count}:{part_references_text}\n")
 
-                # Select the vendor_part and associated quantity/cost
-                choice_part.select(excluded_vendor_names, True)
-                # selected_actual_part = choice_part.selected_actual_part
-                selected_vendor_part: Optional[VendorPart] = choice_part.selected_vendor_part
-                assert isinstance(selected_vendor_part, VendorPart)
-                selected_order_quantity: int = choice_part.selected_order_quantity
-                selected_total_cost: float = choice_part.selected_total_cost
-                selected_price_break_index: int = choice_part.selected_price_break_index
+                # Grab the selected vendor_part and associated quantity/cost:
+                selected_vendor_part: Optional[VendorPart] = selection[2]
+                selected_price_break_index: int = selection[4]
+                selected_order_quantity: int = selection[5]
+                selected_total_cost: float = selection[6]
 
-                # It should be impossible not to have a *VendorPart*:
+                # A missing part does not have a *VendorPart*:
                 if isinstance(selected_vendor_part, VendorPart):
-                    # Grab the *vendor_name*:
-                    assert isinstance(selected_vendor_part, VendorPart)
                     # vendor_name = selected_vendor_part.vendor_name
 
                     # Show the *price breaks* on each side of the
@@ -3698,8 +4673,8 @@ class Order:
 
                     total_cost += selected_total_cost
                 else:
-                    # It should be impossible to get here:
-                    print(f"{tracing}type(selected_vendor_part)={type(selected_vendor_part)}")
+                    # No vendor can supply *choice_part*:
+                    bom_file.write("    No vendor parts found\n")
 
             # Wrap up the *bom_file*:
             bom_file.write(f"{tracing}Total: ${0:.2f}\n".format(total_cost))
@@ -3714,37 +4689,124 @@ class Order:
         for project in projects:
             project.check(collections)
 
-    # Order.csvs_write():
+    # Order.cost_curve_compute():
+    def cost_curve_compute(self, choice_parts: "List[ChoicePart]", quantities: List[int],
+                           excluded_vendor_names: Dict[str, None]) -> List[Tuple[float, int]]:
+        """ *Order*: Return the (total cost, missing parts) pair for *choice_parts* for
+            each build quantity in *quantities* excluding the vendors in
+            *excluded_vendor_names*.  A build quantity multiplies the count of each *Project*
+            of the *Order* object (i.e. *self*).  The already loaded vendor parts are used, so
+            no lookups are done.
+        """
+        # Compute the required quantity of each *choice_part* for each build quantity by
+        # temporarily scaling the count of each *project*:
+        order: Order = self
+        projects: List[Project] = order.projects
+        project_counts: List[int] = [project.count for project in projects]
+        required_quantities_lists: List[List[int]] = [[] for choice_part in choice_parts]
+        quantity: int
+        for quantity in quantities:
+            project: Project
+            project_count: int
+            for project, project_count in zip(projects, project_counts):
+                project.count = project_count * quantity
+            index: int
+            choice_part: ChoicePart
+            for index, choice_part in enumerate(choice_parts):
+                required_quantities_lists[index].append(choice_part.count_get())
+        for project, project_count in zip(projects, project_counts):
+            project.count = project_count
+
+        # Sum up the selected offers of each *choice_part* for each build quantity:
+        total_costs: List[float] = [0.0] * len(quantities)
+        missing_parts: List[int] = [0] * len(quantities)
+        required_quantities: List[int]
+        for choice_part, required_quantities in zip(choice_parts, required_quantities_lists):
+            quints: List[Optional[Quint]] = choice_part.cost_curve_get(required_quantities,
+                                                                       excluded_vendor_names)
+            quint: Optional[Quint]
+            for index, quint in enumerate(quints):
+                if quint is None:
+                    missing_parts[index] += 1
+                else:
+                    total_costs[index] += quint[0]
+        return list(zip(total_costs, missing_parts))
+
+    # Order.cost_curve_write():
     @trace(1)
-    def csv_write(self) -> None:
-        """ *Order*: Write out the *Order* object (i.e. *self) BOM (Bill Of Materials)
-            for each vendor as a .csv (Comma Seperated Values).
+    def cost_curve_write(self, cost_curve_file_name: str) -> None:
+        """ *Order*: Write the total cost versus build quantity (from *sweep_quantities*) of
+            the *Order* object (i.e. *self*) out to *cost_curve_file_name* as a `.csv` file.
+            There is a total cost and missing parts column for both all vendors and for the
+            vendors selected by the vendor reduction.
         """
-        # Grab some values from *order* (i.e. *self*):
+        # Compute the *cost_curves* for each vendor set:
         order: Order = self
-        excluded_vendor_names: Dict[str, None] = order.excluded_vendor_names
         final_choice_parts: List[ChoicePart] = order.final_choice_parts
+        sweep_quantities: List[int] = order.sweep_quantities
+        vendor_sets: List[Tuple[str, Dict[str, None]]] = [
+          ("All Vendors", {}),
+          ("Selected Vendors", order.excluded_vendor_names)]
+        cost_curves: List[List[Tuple[float, int]]] = [
+          order.cost_curve_compute(final_choice_parts, sweep_quantities, excluded_vendor_names)
+          for vendor_set_name, excluded_vendor_names in vendor_sets]
+
+        # Write out the *cost_curves*:
+        cost_curve_file: IO[str]
+        with order.output_open(cost_curve_file_name) as cost_curve_file:
+            csv_writer: Any = csv.writer(cost_curve_file)
+            header: List[str] = ["Quantity"]
+            vendor_set_name: str
+            for vendor_set_name, excluded_vendor_names in vendor_sets:
+                header += [f"{vendor_set_name} Total Cost", f"{vendor_set_name} Unit Cost",
+                           f"{vendor_set_name} Missing Parts"]
+            csv_writer.writerow(header)
+            index: int
+            quantity: int
+            for index, quantity in enumerate(sweep_quantities):
+                row: List[str] = [str(quantity)]
+                cost_curve: List[Tuple[float, int]]
+                for cost_curve in cost_curves:
+                    total_cost: float
+                    missing_parts: int
+                    total_cost, missing_parts = cost_curve[index]
+                    row += [f"{total_cost:.2f}", f"{total_cost / max(1, quantity):.4f}",
+                            str(missing_parts)]
+                csv_writer.writerow(row)
+        print(f"Wrote cost curve for {len(sweep_quantities)} quantities to "
+              f"'{cost_curve_file_name}'")
+
+    # Order.cost_matrix_get():
+    def cost_matrix_get(self, choice_parts: "List[ChoicePart]") -> CostMatrix:
+        """ *Order*: Return the *CostMatrix* for *choice_parts*.  It is cached in
+            the *Order* object (i.e. *self*) until *choice_parts* or their offers change.
+        """
+        order: Order = self
+        cost_matrix: Optional[CostMatrix] = order.cost_matrix
+        if cost_matrix is None or not cost_matrix.is_current(choice_parts):
+            cost_matrix = CostMatrix(choice_parts)
+            order.cost_matrix = cost_matrix
+        return cost_matrix
 
-        # Sort *final_choice_parts*:
-        final_choice_parts.sort(key=lambda choice_part:
-                                (choice_part.selected_vendor_name,
-                                 choice_part.selected_total_cost,
-                                 choice_part.name))
+    # Order.csvs_write():
+    @trace(1)
+    def csv_write(self, order_result: "OrderResult") -> None:
+        """ *Order*: Write out the *Order* object (i.e. *self) BOM (Bill Of Materials)
+            for each vendor from *order_result* as a .csv (Comma Seperated Values).
+        """
+        # Sort the *selections* of *order_result* by vendor:
+        order: Order = self
+        selections: List[Selection] = sorted(order_result.selections, key=lambda selection:
+                                             (selection[3], selection[6], selection[0].name))
 
         vendor_boms: Dict[str, List[str]] = {}
-        choice_part: ChoicePart
-        for choice_part in final_choice_parts:
-            # Sort the *pose_parts* by *project* followed by reference:
-            pose_parts: List[PosePart] = choice_part.pose_parts
-            pose_parts.sort(key=lambda pose_part:
-                            (pose_part.project.name, pose_part.reference.upper(),
-                             int(text_filter(pose_part.reference, str.isdigit))))
-
-            # Select the vendor_part and associated quantity/cost
-            choice_part.select(excluded_vendor_names, True)
-            selected_actual_part: Optional[ActualPart] = choice_part.selected_actual_part
-            selected_vendor_part: Optional[VendorPart] = choice_part.selected_vendor_part
-            selected_order_quantity: int = choice_part.selected_order_quantity
+        selection: Selection
+        for selection in selections:
+            # Grab the selected vendor_part and associated quantity:
+            choice_part: ChoicePart = selection[0]
+            selected_actual_part: Optional[ActualPart] = selection[1]
+            selected_vendor_part: Optional[VendorPart] = selection[2]
+            selected_order_quantity: int = selection[5]
 
             if selected_vendor_part is not None and selected_actual_part is not None:
                 # Grab the *vendor_name* and *vendor_part_name*:
@@ -3775,7 +4837,7 @@ class Order:
             vendor_base_name: str = Encode.to_file_name(vendor_name) + ".csv"
             vendor_full_name: str = os.path.join(order_root, vendor_base_name)
             vendor_file: IO[str]
-            with open(vendor_full_name, "w") as vendor_file:
+            with order.output_open(vendor_full_name) as vendor_file:
                 # Write out each line in *lines*:
                 print(f"Writing '{vendor_full_name}'")
                 vendor_file.write(vendor_text)
@@ -3787,103 +4849,75 @@ class Order:
         """ *Order*: Sweep through *choice_parts* and figure out which vendors
             to add to *excluded_vendor_names* to reduce shipping costs.
         """
+        # The *selection_tracker* keeps the best and runner-up vendors of each *choice_part*
+        # in the *cost_matrix*, so that the cost of excluding a vendor is computed from just
+        # the *choice_parts* currently assigned to that vendor.
+        order: Order = self
+        cost_matrix: CostMatrix = order.cost_matrix_get(choice_parts)
+        selection_tracker: SelectionTracker = SelectionTracker(cost_matrix,
+                                                               excluded_vendor_names)
+
         # First figure out the total *missing_parts*.  We will stop if
         # excluding a vendor increases above the *missing_parts* number:
-        order: Order = self
-        quad: Quad = order.quad_compute(choice_parts, excluded_vendor_names, "")
-        missing_parts: int = quad[0]
+        missing_parts: int = selection_tracker.missing_parts
+
+        # The removal penalty of a vendor (i.e. the additional missing parts and the additional
+        # cost of excluding it) can only go up as other vendors are excluded, since the vendor
+        # picks up more *choice_parts* and the runner-up vendors only get worse.  Thus, a
+        # penalty computed before the latest exclusion is a lower bound, and only the vendor at
+        # the top of the *penalty_heap* needs to be recomputed until its penalty is current
+        # (see *SelectionTracker.penalty_pop*()).  The vendor name breaks ties in the same
+        # order as sorting the vendor names does:
+        penalty_heap: List[Tuple[int, float, str, int]] = [
+            (0, 0.0, vendor_name, -1)
+            for vendor_name in order.vendor_names_get(choice_parts, excluded_vendor_names)]
+        heapq.heapify(penalty_heap)
 
         # Sweep through and figure out what vendors to order from:
         tracing: str = tracing_get()
         done: bool = False
         while not done:
-            # Get the base cost for the current *excluded_vendor_names*:
-            base_quad: Quad = \
-              order.quad_compute(choice_parts, excluded_vendor_names, "")
-            # print(">>>>base_quad={0}".format(base_quad))
-
-            # If the *base_missing_parts* increases, we need to stop because
+            # If the *missing_parts* increases, we need to stop because
             # excluding additional vendors will cause the order to become
-            # incomplete:
-            base_missing_parts: int = base_quad[0]
-            if base_missing_parts > missing_parts:
-                break
-
-            # Grab *base_cost*:
-            base_cost: float = base_quad[1]
-
-            # Figure out what vendors are still available for *choice_parts*:
-            base_vendor_names: List[str] = order.vendor_names_get(choice_parts,
-                                                                  excluded_vendor_names)
-            # print("base: {0} {1}".format(base_cost, base_vendor_names))
-
-            # For small designs, sometimes the algorithm will attempt to
+            # incomplete.  For small designs, sometimes the algorithm will attempt to
             # throw everything out.  The test below makes sure we always
             # have one last remaining vendor:
-            if len(base_vendor_names) <= 1:
+            if selection_tracker.missing_parts > missing_parts or len(penalty_heap) <= 1:
                 break
 
-            # Iterate through *vendor_names*, excluding one *vendor_name*
-            # at a time:
-            trial_quads: List[Quad] = []
-            for vendor_name in base_vendor_names:
-                # Create *trial_excluded_vendor_names* which is a copy
-                # of *excluded_vendor_names* plus *vendor_name*:
-                trial_excluded_vendor_names: Dict[str, None] = dict(excluded_vendor_names)
-                trial_excluded_vendor_names[vendor_name] = None
-
-                # Get the base cost for *trial_excluded_vendor_names*
-                # and tack it onto *trial_quads*:
-                trial_quad: Quad = order.quad_compute(choice_parts, trial_excluded_vendor_names,
-                                                      vendor_name)
-                trial_quads.append(trial_quad)
-
-                # For debugging only:
-                # trial_cost = trial_quad[0]
-                # trial_vendor_name = trial_quad[1]
-                # print("    {0:.2f} with {1} excluded".
-                #  format(trial_cost, trial_vendor_name))
-
-            # Sort the *trial_quads* to bring the most interesting one to the front:
-            trial_quads.sort(key=lambda quad: (quad[0], quad[1]))
-            # For debugging:
-            # for trial_quad in trial_quads:
-            #        print("   {0}".format(trial_quad))
-
-            # Quickly ignore all vendors that have zero cost savings:
-            while len(trial_quads) >= 2:
-                # We want to ensure that *trial_quads* always has at least 2
-                # entries for so that the next step after this loop will be
-                # guaranteed to have at least one entry in *trial_quads*:
-                lowest_quad = trial_quads[0]
-                lowest_cost = lowest_quad[1]
-                lowest_vendor_name = lowest_quad[3]
-                savings = lowest_cost - base_cost
-                if savings == 0.0:
-                    # This vendor offers no savings; get rid of the vendor:
-                    # print("trail_quads[0]={0}".format(trial_quads))
-                    reduced_vendor_messages.append("Excluding '{0}': saves nothing\n".format(
-                                                   lowest_vendor_name, savings))
-                    excluded_vendor_names[lowest_vendor_name] = None
-                    del trial_quads[0]
-                else:
-                    # We are done skipping over zero *savings*:
-                    break
-            assert len(trial_quads) >= 1
-
-            # Grab some values from *lowest_quad*:
-            lowest_quad = trial_quads[0]
-            lowest_cost = lowest_quad[1]
-            lowest_vendor_name = lowest_quad[3]
+            # Quickly ignore all vendors that have zero cost savings.  We want to ensure that
+            # *penalty_heap* always has at least 1 entry left over after *lowest_penalty* is
+            # popped off so that there is always one remaining vendor.  The zero savings
+            # vendors are not excluded until the end of this round so that every penalty in
+            # this round is measured against the same *base_cost*:
+            base_cost: float = selection_tracker.total_cost
+            zero_savings_vendor_names: List[str] = []
+            lowest_penalty: Tuple[int, float, str, int] = (
+                selection_tracker.penalty_pop(penalty_heap))
+            lowest_vendor_name: str = lowest_penalty[2]
+            savings: float = lowest_penalty[1]
+            while savings == 0.0 and len(penalty_heap) >= 1:
+                # This vendor offers no savings; get rid of the vendor:
+                reduced_vendor_messages.append("Excluding '{0}': saves nothing\n".format(
+                                               lowest_vendor_name))
+                zero_savings_vendor_names.append(lowest_vendor_name)
+                lowest_penalty = selection_tracker.penalty_pop(penalty_heap)
+                lowest_vendor_name = lowest_penalty[2]
+                savings = lowest_penalty[1]
+            zero_savings_vendor_name: str
+            for zero_savings_vendor_name in zero_savings_vendor_names:
+                selection_tracker.vendor_exclude(zero_savings_vendor_name)
+
+            # Grab some values from *lowest_penalty*:
+            lowest_cost: float = base_cost + savings
             # lowest_vendor_name = text_filter(lowest_vendor_name, str.isprintable)
-            savings = lowest_cost - base_cost
             print("      Price is ${0:.2f} when '{1}' is excluded".
                   format(lowest_cost, lowest_vendor_name))
 
             # We use $15.00 as an approximate minimum shipping cost.
             # If the savings is less that the shipping cost, we exclude
             # the vendor:
-            if savings < 15.0 and len(trial_quads) >= 2 and lowest_vendor_name != "Digi-Key":
+            if savings < 15.0 and len(penalty_heap) >= 1 and lowest_vendor_name != "Digi-Key":
                 # The shipping costs are too high and there at least one
                 # vendor left; exclude this vendor:
                 message: str = ("Excluding '{0}': only saves {1:.2f}".
@@ -3891,9 +4925,9 @@ class Order:
                 reduced_vendor_messages.append(message + '\n')
                 if tracing:
                     print(message)
-                excluded_vendor_names[lowest_vendor_name] = None
+                selection_tracker.vendor_exclude(lowest_vendor_name)
             else:
-                # We are done when *lowest_quad* is worth shipping:
+                # We are done when *lowest_penalty* is worth shipping:
                 # print("lowest_cost={0:.2f}".format(lowest_cost))
                 done = True
 
@@ -3904,9 +4938,10 @@ class Order:
         """ *Order*: Sweep through *choice* parts and figure out if the
             vendors with large minimum orders can be dropped:
         """
-        # Grab table of *vendor_minimums* from *order*:
+        # Grab table of *vendor_minimums* and the *cost_matrix* from *order*:
         order: Order = self
         vendor_minimums: Dict[str, float] = order.vendor_minimums
+        cost_matrix: CostMatrix = order.cost_matrix_get(choice_parts)
 
         # Now visit each vendor a decide if we should dump them because
         # they cost too much:
@@ -3916,13 +4951,12 @@ class Order:
             # Grab the *vendor_minimum_cost*:
             vendor_minimum_cost: float = vendor_minimums[vendor_name]
 
-            # Compute *vendor_total_cost* by visiting each *choice_part*
-            # to figure out if it has be selected to from *vendor_name*:
-            vendor_total_cost = 0.0
-            for choice_part in choice_parts:
-                choice_part.select(excluded_vendor_names)
-                if choice_part.selected_vendor_name == vendor_name:
-                    vendor_total_cost += choice_part.selected_total_cost
+            # Compute *vendor_total_cost* from the *choice_parts* that are
+            # selected from *vendor_name*:
+            selections: List[int] = cost_matrix.selections_get(
+              cost_matrix.mask_get(excluded_vendor_names))
+            vendor_total_cost: float = \
+                cost_matrix.vendor_costs_get(selections).get(vendor_name, 0.0)
 
             # If the amount of order parts does not exceed the minimum,
             # exclude *vendor_name*:
@@ -3945,6 +4979,15 @@ class Order:
         projects: List[Project] = order.projects
         excluded_vendor_names: Dict[str, None] = order.excluded_vendor_names
 
+        # Start with an empty *actual_parts_table* so that each *ActualPart* is refreshed
+        # exactly once during this run:
+        order.actual_parts_table = {}
+
+        # Start the clock on the order wide *lookups_deadline*:
+        lookups_deadline: float = order.lookups_deadline
+        order.panda_pool.deadline_time = (time.monotonic() + lookups_deadline
+                                          if lookups_deadline > 0.0 else 0.0)
+
         # Construct *project_parts_table* table (Dict[name, List[ProjectPart]]) so that every
         # we have a name to a List[ProjectPart] mapping.
         project_parts_table: Dict[str, List[ProjectPart]] = {}
@@ -3997,15 +5040,26 @@ class Order:
                 print(f"{tracing}Could not find a search that matches part '{search_name}'")
 
         # Now load the associated *actual_parts* into each *choice_part* from *final_choice_parts*:
+        refreshes: List[Refresh] = list()
         for choice_part in final_choice_parts:
             # Refresh the vendor part cache for each *actual_part*:
             new_actual_parts: List[ActualPart] = collections.actual_parts_lookup(choice_part)
 
-            # Get reasonably up-to-date pricing and availability information about
-            # each *ActualPart* in actual_parts.  *order* is needed to loccate where
-            # the cached information is:
+            # Load the cached pricing and availability information about each *ActualPart* in
+            # actual_parts.  *order* is needed to loccate where the cached information is.  Any
+            # *ActualPart* that is missing or out of date is collected into *refreshes*:
             choice_part_name: str = choice_part.name
-            choice_part.vendor_parts_refresh(new_actual_parts, order, choice_part_name)
+            choice_part.vendor_parts_load(new_actual_parts, order, choice_part_name, refreshes)
+
+        # Now get reasonably up-to-date pricing and availability for all of *refreshes* at once
+        # so that the lookups can be performed concurrently.  In stale-while-revalidate mode,
+        # only the *ActualPart*'s that are not cached at all are looked up now; the stale ones
+        # are priced from the cache while they are refreshed in the background:
+        if order.stale_while_revalidate:
+            order.vendor_parts_lookup([refresh for refresh in refreshes if refresh[1] is None])
+            order.revalidate_start([refresh for refresh in refreshes if refresh[1] is not None])
+        else:
+            order.vendor_parts_lookup(refreshes)
 
         # Stuff *final_choice_parts* back into *order*:
         final_choice_parts.sort(key=lambda final_choice_part: final_choice_part.name)
@@ -4024,9 +5078,7 @@ class Order:
             project_parts_table = project.project_parts_table
 
             # Sort *pose_parts* by letters first followed by integers:
-            pose_parts.sort(key=lambda pose_part: (
-                             text_filter(pose_part.reference, str.isalpha).upper(),
-                             int(text_filter(pose_part.reference, str.isdigit))))
+            pose_parts.sort(key=lambda pose_part: pose_part.sort_key)
 
             choice_parts_table = None
             assert False
@@ -4128,6 +5180,17 @@ class Order:
                 print("Footprint '{0}' does not exist for '{1}'".
                       format(footprint_path, kicad_footprints[footprint_name]))
 
+    # Order.output_open():
+    def output_open(self, output_file_name: str) -> ContextManager[IO[str]]:
+        """ *Order*: Return a context manager that opens *output_file_name* for writing a
+            report of the *Order* object (i.e. *self*).  In incremental mode, the file is
+            only rewritten when its contents differ (see *OrderManifest.output_open*().)
+        """
+        order: Order = self
+        manifest: Optional[OrderManifest] = order.manifest
+        return (open(output_file_name, "w") if manifest is None
+                else manifest.output_open(output_file_name))
+
     # Order.positions_process():
     def positions_process(self) -> None:
         """ *Order*: Process any Pick and Place `.csv` or `.pos` file.
@@ -4187,19 +5250,37 @@ class Order:
 
         # order.exclude_vendors_with_high_minimums(final_choice_parts, excluded_vendor_names,
         #                                          reduced_vendor_messages)
-        order.exclude_vendors_to_reduce_shipping_costs(final_choice_parts, excluded_vendor_names,
-                                                       reduced_vendor_messages)
+        # In incremental mode, the excluded vendors of the previous run are reused when
+        # nothing that the vendor reduction depends on has changed since then:
+        manifest: Optional[OrderManifest] = order.manifest
+        is_reused: bool = (manifest is not None and
+                           manifest.excluded_vendor_names_reuse(order, final_choice_parts,
+                                                                excluded_vendor_names))
+        if is_reused:
+            pass
+        elif order.optimize_time_limit > 0.0:
+            order.vendors_optimize(final_choice_parts, excluded_vendor_names,
+                                   reduced_vendor_messages)
+        else:
+            order.exclude_vendors_to_reduce_shipping_costs(final_choice_parts,
+                                                           excluded_vendor_names,
+                                                           reduced_vendor_messages)
+        if manifest is not None:
+            manifest.excluded_vendor_names = list(excluded_vendor_names.keys())
         if tracing:
             print(f"{tracing}C:len(final_choice_parts)={len(final_choice_parts)}")
 
-        # Write out *reduced_vendor_messages* to a report file:
+        # Write out *reduced_vendor_messages* to a report file (a reused vendor reduction
+        # leaves the previous report file alone):
         order_root: str = order.order_root
         reduced_vendor_messages_file_name = os.path.join(order_root, "vendor_reduction_report.txt")
-        reduced_vendor_messages_file: IO[str]
-        with open(reduced_vendor_messages_file_name, "w") as reduced_vendor_messages_file:
-            reduced_vendor_message: str
-            for reduced_vendor_message in reduced_vendor_messages:
-                reduced_vendor_messages_file.write(reduced_vendor_message)
+        if not is_reused:
+            reduced_vendor_messages_file: IO[str]
+            with order.output_open(
+              reduced_vendor_messages_file_name) as reduced_vendor_messages_file:
+                reduced_vendor_message: str
+                for reduced_vendor_message in reduced_vendor_messages:
+                    reduced_vendor_messages_file.write(reduced_vendor_message)
         if tracing:
             print(f"{tracing}D:len(final_choice_parts)={len(final_choice_parts)}")
 
@@ -4217,29 +5298,21 @@ class Order:
 
         if tracing:
             print(f"{tracing}F:len(final_choice_parts)={len(final_choice_parts)}")
+        # Select the vendor for each of the *final_choice_parts* exactly once.  All of the
+        # reports below are just formatted from *order_result*:
+        order.final_choice_parts = final_choice_parts
+        order_result: OrderResult = OrderResult(order, final_choice_parts, excluded_vendor_names)
+        order.order_result = order_result
+
         # Print out the final selected vendor summary:
-        order.summary_print(final_choice_parts, excluded_vendor_names)
+        order.summary_print(order_result)
 
-        # Generate the bom file reports for *self.final_choice_parts*:
-        order.final_choice_parts = final_choice_parts
-        order.bom_write(os.path.join(order_root, "bom_by_price.txt"), lambda choice_part:
-                        (choice_part.selected_total_cost,
-                         choice_part.selected_vendor_name,
-                         choice_part.name))
-        order.bom_write(os.path.join(order_root, "bom_by_vendor.txt"), lambda choice_part:
-                        (choice_part.selected_vendor_name,
-                         choice_part.selected_total_cost,
-                         choice_part.name))
-        order.bom_write(os.path.join(order_root, "bom_by_name.txt"), lambda choice_part:
-                        (choice_part.name,
-                         choice_part.selected_vendor_name,
-                         choice_part.selected_total_cost))
-        order.csv_write()
-
-        # Write a part summary file for each project:
-        project: Project
-        for project in order.projects:
-            project.assembly_summary_write(final_choice_parts, order)
+        # Generate the bom file, vendor `.csv`, project assembly, and any other reports
+        # for *order_result*:
+        order.reports_write(order_result)
+
+        # Wait for any background refresh to finish and report what it changed:
+        order.revalidate_finish(final_choice_parts, excluded_vendor_names)
 
         # Now generate a BOM summary:
         if False:
@@ -4325,64 +5398,290 @@ class Order:
             The returned key is structured to sort so that most interesting
             vendor to exclude sorts to the first item.
         """
+        # Perform the vendor selection excluding all vendors in *excluded_vendor_names*
+        # as a masked row minimum over the *cost_matrix*:
         order: Order = self
-        missing_parts: int = 0
+        cost_matrix: CostMatrix = order.cost_matrix_get(choice_parts)
+        selections: List[int] = cost_matrix.selections_get(
+          cost_matrix.mask_get(excluded_vendor_names))
+        cost_matrix.selections_apply(selections)
+        missing_parts: int = selections.count(-1)
+
+        # Keep a running total of everything (a missing *choice_part* keeps its previous
+        # selection, just like *ChoicePart.select*()):
         total_cost: float = 0.0
         choice_part: ChoicePart
         for choice_part in choice_parts:
-            # Perform the vendor selection excluding all vendors in
-            # *excluded_vendor_names*:
-            missing_parts += choice_part.select(excluded_vendor_names, False)
-
-            # Grab some values out of *choice_part*:
-            # selected_vendor_name = choice_part.selected_vendor_name
-            selected_total_cost = choice_part.selected_total_cost
-
-            # Keep a running total of everything:
-            total_cost += selected_total_cost
+            total_cost += choice_part.selected_total_cost
 
         # Figure out *vendor_priority* for *excluded_vendor_name*:
-        vendor_priorities: Dict[str, int] = order.vendor_priorities
-        if excluded_vendor_name in vendor_priorities:
-            # Priority already assigned to *excluded_vendor_name*:
-            vendor_priority = vendor_priorities[excluded_vendor_name]
-        else:
-            # Assigned a new priority for *excluded_vendor_name*:
-            vendor_priority = order.vendor_priority
-            vendor_priorities[excluded_vendor_name] = vendor_priority
-            order.vendor_priority += 1
+        vendor_priority: int = order.vendor_priority_get(excluded_vendor_name)
 
         # Return the final *quad*:
         quad: Quad = (missing_parts, total_cost, vendor_priority, excluded_vendor_name)
         return quad
 
+    # Order.reports_write():
+    def reports_write(self, order_result: "OrderResult") -> None:
+        """ *Order*: Run each *ReportWriter* of the *Order* object (i.e. *self*) on
+            *order_result*.  The *ReportWriter*'s are run concurrently in a thread pool.
+        """
+        # Start each *report_writer* and then wait for them in order so that the first
+        # exception (if any) is raised here:
+        order: Order = self
+        report_writers: List[ReportWriter] = order.report_writers
+        if report_writers:
+            executor: concurrent.futures.ThreadPoolExecutor
+            with concurrent.futures.ThreadPoolExecutor(
+              max_workers=len(report_writers)) as executor:
+                futures: List[concurrent.futures.Future] = [
+                  executor.submit(report_writer.report_write, order_result, order)
+                  for report_writer in report_writers]
+                future: concurrent.futures.Future
+                for future in futures:
+                    future.result()
+
+    # Order.revalidate_finish():
+    @trace(1)
+    def revalidate_finish(self, final_choice_parts: "List[ChoicePart]",
+                          excluded_vendor_names: Dict[str, None]) -> None:
+        """ *Order*: Wait for the background refresh started by *Order.revalidate_start*() to
+            complete, save the results into the vendor parts cache, and write out a delta report
+            of each *ChoicePart* in *final_choice_parts* whose selection changed significantly.
+        """
+        # Grab some values from *order* (i.e. *self*):
+        order: Order = self
+        actual_parts_table: Dict[Tuple[str, str], ActualPart] = order.actual_parts_table
+        order_root: str = order.order_root
+        revalidate_future: Optional[concurrent.futures.Future] = order.revalidate_future
+        revalidate_refreshes: List[Refresh] = order.revalidate_refreshes
+        revalidate_threshold: float = order.revalidate_threshold
+        tracing: str = tracing_get()
+        if not revalidate_refreshes:
+            return
+
+        # Wait for the refresh to complete.  When *tracing*, it was never started in the
+        # background, so it is performed right here:
+        if revalidate_future is None:
+            order.vendor_parts_fetch(revalidate_refreshes)
+        else:
+            revalidate_future.result()
+        order.vendor_parts_save(revalidate_refreshes)
+        order.revalidate_future = None
+        order.revalidate_refreshes = []
+
+        # Remember what was selected using the cached *VendorPart*'s:
+        previous_order_result: Optional[OrderResult] = order.order_result
+        assert isinstance(previous_order_result, OrderResult)
+
+        # Swap the refreshed *VendorPart*'s into the *ActualPart*'s that were used for selection:
+        revalidate_refresh: Refresh
+        for revalidate_refresh in revalidate_refreshes:
+            revalidate_actual_part: ActualPart = revalidate_refresh[0]
+            actual_part: ActualPart = actual_parts_table[revalidate_actual_part.key]
+            actual_part.vendor_parts = revalidate_actual_part.vendor_parts
+            actual_part.timestamp = revalidate_actual_part.timestamp
+            actual_part.fallback = revalidate_actual_part.fallback
+
+        # Select again and collect the significant changes into *delta_lines*:
+        order_result: OrderResult = OrderResult(order, final_choice_parts, excluded_vendor_names)
+        order.order_result = order_result
+        delta_lines: List[str] = list()
+        previous_selection: Selection
+        selection: Selection
+        for previous_selection, selection in zip(previous_order_result.selections,
+                                                 order_result.selections):
+            choice_part: ChoicePart = selection[0]
+            previous_vendor_name: str = previous_selection[3]
+            previous_total_cost: float = previous_selection[6]
+            vendor_name: str = selection[3]
+            total_cost: float = selection[6]
+            if (vendor_name != previous_vendor_name or
+                    abs(total_cost - previous_total_cost) >
+                    revalidate_threshold * previous_total_cost):
+                delta_lines.append(f"{choice_part.name}: "
+                                   f"{previous_vendor_name} ${previous_total_cost:.2f} => "
+                                   f"{vendor_name} ${total_cost:.2f}\n")
+        if tracing:
+            print(f"{tracing}len(delta_lines)={len(delta_lines)}")
+
+        # Write out the *delta_lines* and let the user know about them:
+        delta_report_file_name: str = os.path.join(order_root, "revalidate_report.txt")
+        delta_report_file: IO[str]
+        with order.output_open(delta_report_file_name) as delta_report_file:
+            delta_report_file.write(f"Refreshed {len(revalidate_refreshes)} stale actual parts "
+                                    f"after the reports were written from cached data.\n")
+            delta_report_file.write(f"{len(delta_lines)} parts changed vendor or changed cost "
+                                    f"by more than {revalidate_threshold:.0%}:\n")
+            delta_line: str
+            for delta_line in delta_lines:
+                delta_report_file.write(delta_line)
+        if delta_lines:
+            print(f"{tracing}{len(delta_lines)} parts changed after refreshing stale prices.  "
+                  f"See '{delta_report_file_name}' file for details.")
+
+    # Order.revalidate_start():
+    def revalidate_start(self, refreshes: "List[Refresh]") -> None:
+        """ *Order*: Start refreshing the stale *ActualPart*'s in *refreshes* in the background.
+            The refresh is performed on copies of the *ActualPart*'s so that the cached
+            *VendorPart*'s can continue to be used until *Order.revalidate_finish*() is called.
+        """
+        # Grab some values from *order* (i.e. *self*):
+        order: Order = self
+        tracing: str = tracing_get()
+
+        # Make a copy of each *ActualPart* in *refreshes*:
+        revalidate_refreshes: List[Refresh] = list()
+        actual_part: ActualPart
+        previous_actual_part: Optional[ActualPart]
+        part_name: str
+        stale_vendor_names: List[str]
+        for actual_part, previous_actual_part, part_name, stale_vendor_names in refreshes:
+            revalidate_actual_part: ActualPart = ActualPart(actual_part.manufacturer_name,
+                                                            actual_part.manufacturer_part_name)
+            revalidate_actual_part.vendor_parts = list(actual_part.vendor_parts)
+            revalidate_actual_part.timestamp = actual_part.timestamp
+            revalidate_refreshes.append((revalidate_actual_part, previous_actual_part,
+                                         part_name, stale_vendor_names))
+        order.revalidate_future = None
+        order.revalidate_refreshes = revalidate_refreshes
+
+        # Start the background refresh.  The vendor parts cache is only written from the
+        # calling thread by *Order.revalidate_finish*().  *tracing* output is not thread safe,
+        # so the refresh is deferred until then when *tracing*:
+        if revalidate_refreshes and not tracing:
+            executor: concurrent.futures.ThreadPoolExecutor = \
+                concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            order.revalidate_future = executor.submit(order.vendor_parts_fetch,
+                                                      revalidate_refreshes)
+            executor.shutdown(wait=False)
+        if revalidate_refreshes:
+            print(f"{tracing}Refreshing {len(revalidate_refreshes)} stale actual parts "
+                  f"in the background.")
+
+    # Order.scenarios_evaluate():
+    def scenarios_evaluate(self, choice_parts: "List[ChoicePart]",
+                           scenarios: "List[Scenario]") -> List[Tuple[float, int, int]]:
+        """ *Order*: Return the (total cost, missing parts, vendors count) triple for each
+            *Scenario* in *scenarios* for *choice_parts* of the *Order* object (i.e. *self*).
+            The *scenarios* are evaluated in a process pool that shares the vendor costs.  The
+            worker processes are not forked from this process, since other threads (e.g. the
+            background refresh and *Panda* workers) may be holding locks when it forks.
+        """
+        # Boil the *cost_matrix* down to just the preference ordered (column, cost) pairs of
+        # each row, since that is all *Scenario.evaluate*() needs:
+        order: Order = self
+        cost_matrix: CostMatrix = order.cost_matrix_get(choice_parts)
+        costs: List[List[float]] = cost_matrix.costs
+        rows_offers: List[List[Tuple[int, float]]] = [
+          [(column, costs[row][column]) for column in row_columns]
+          for row, row_columns in enumerate(cost_matrix.rows_columns)]
+        masks: List[List[bool]] = [scenario.mask_get(cost_matrix.vendor_names)
+                                   for scenario in scenarios]
+
+        # Only bother with a process pool when there is more than one *scenario*:
+        results: List[Tuple[float, int, int]]
+        if len(scenarios) <= 1:
+            Scenario.worker_start(rows_offers)
+            results = [Scenario.evaluate(mask) for mask in masks]
+        else:
+            start_method: str = ("forkserver"
+                                 if "forkserver" in multiprocessing.get_all_start_methods()
+                                 else "spawn")
+            executor: concurrent.futures.ProcessPoolExecutor
+            with concurrent.futures.ProcessPoolExecutor(
+              max_workers=min(len(scenarios), os.cpu_count() or 1),
+              mp_context=multiprocessing.get_context(start_method),
+              initializer=Scenario.worker_start, initargs=(rows_offers,)) as executor:
+                results = list(executor.map(Scenario.evaluate, masks))
+        return results
+
+    # Order.scenarios_write():
+    @trace(1)
+    def scenarios_write(self, scenarios_file_name: str) -> None:
+        """ *Order*: Evaluate the *scenarios* of the *Order* object (i.e. *self*) and write
+            a comparison table out to *scenarios_file_name* (a `.csv` file) and to the console.
+        """
+        # Evaluate the *scenarios*:
+        order: Order = self
+        scenarios: List[Scenario] = order.scenarios
+        results: List[Tuple[float, int, int]] = order.scenarios_evaluate(order.final_choice_parts,
+                                                                         scenarios)
+
+        # Write out the comparison table:
+        print("Scenarios:")
+        scenarios_file: IO[str]
+        with order.output_open(scenarios_file_name) as scenarios_file:
+            csv_writer: Any = csv.writer(scenarios_file)
+            csv_writer.writerow(["Scenario", "Total Cost", "Missing Parts", "Vendors"])
+            scenario: Scenario
+            result: Tuple[float, int, int]
+            for scenario, result in zip(scenarios, results):
+                total_cost: float
+                missing_parts: int
+                vendors_count: int
+                total_cost, missing_parts, vendors_count = result
+                csv_writer.writerow([scenario.name, f"{total_cost:.2f}",
+                                     str(missing_parts), str(vendors_count)])
+                print(f"    {scenario.name}: ${total_cost:.2f} from {vendors_count} vendors"
+                      f" ({missing_parts} missing parts)")
+        print(f"Wrote {len(scenarios)} scenarios to '{scenarios_file_name}'")
+
     # Order.summary_print():
     @trace(1)
-    def summary_print(self, choice_parts: "List[ChoicePart]",
-                      excluded_vendor_names: Dict[str, None]) -> None:
-        """ *Order*: Print a summary of the selected vendors.
+    def summary_print(self, order_result: "OrderResult") -> None:
+        """ *Order*: Print a summary of the selected vendors of *order_result*.
         """
-        # Let the user know what we winnowed the vendor list down to:
-        final_vendor_names: List[str] = self.vendor_names_get(choice_parts, excluded_vendor_names)
+        # Announce each part that has no vendor (i.e. an empty selected vendor name):
+        tracing: str = tracing_get()
+        selection: Selection
+        for selection in order_result.selections:
+            if selection[3] == "":
+                print(f"{tracing}No vendor parts found for Part '{selection[0].name}'")
 
         # Print the final *total_cost*:
-        total_cost: float = 0.0
-        choice_part: ChoicePart
-        for choice_part in choice_parts:
-            choice_part.select(excluded_vendor_names, False)
-            total_cost += choice_part.selected_total_cost
-        print("Total Cost: ${0:.2f}".format(total_cost))
+        print("Total Cost: ${0:.2f}".format(order_result.total_cost))
 
-        # Print out the sub-totals for each vendor:
+        # Print out the sub-totals for each vendor that we winnowed the vendor list down to:
         print("Final selected vendors:")
-        venodr_name: str
-        for vendor_name in final_vendor_names:
-            vendor_cost: float = 0.0
-            for choice_part in choice_parts:
-                if choice_part.selected_vendor_name == vendor_name:
-                    vendor_cost += choice_part.selected_total_cost
+        vendor_name: str
+        vendor_cost: float
+        for vendor_name, vendor_cost in order_result.vendor_costs:
             print("    {0}: ${1:.2f}".format(vendor_name, vendor_cost))
 
+        # Flag the parts that were priced from cached data because a lookup failed:
+        fallback_choice_part_names: Tuple[str, ...] = order_result.fallback_part_names
+        if fallback_choice_part_names:
+            print("Parts priced from fallback (cached or incomplete) data:")
+            fallback_choice_part_name: str
+            for fallback_choice_part_name in fallback_choice_part_names:
+                print(f"    {fallback_choice_part_name}")
+
+    # Order.vendor_costs_load():
+    def vendor_costs_load(self, vendor_costs_file_name: str) -> int:
+        """ *Order*: Load the per vendor shipping costs and minimum orders of the *Order* object
+            (i.e. *self*) from *vendor_costs_file_name* (a `.csv` file of "vendor,shipping,minimum"
+            rows where an empty field is left alone) and return the number of vendors loaded.
+            Any minimum order makes *Order.vendors_optimize*() a heuristic rather than exact.
+        """
+        order: Order = self
+        vendors_count: int = 0
+        vendor_costs_file: IO[str]
+        with open(vendor_costs_file_name) as vendor_costs_file:
+            row: List[str]
+            for row in csv.reader(vendor_costs_file):
+                if len(row) >= 2 and not row[0].startswith("#"):
+                    vendor_name: str = row[0].strip()
+                    try:
+                        if row[1].strip():
+                            order.vendor_shipping_costs[vendor_name] = float(row[1])
+                        if len(row) >= 3 and row[2].strip():
+                            order.vendor_minimums[vendor_name] = float(row[2])
+                        vendors_count += 1
+                    except ValueError:
+                        pass  # Ignore the header row (and any other junk)
+        return vendors_count
+
     # Order.vendor_exclude():
     def vendor_exclude(self, vendor_name: str) -> None:
         """ *Order*: Exclude *vendor_name* from the *Order* object (i.e. *self*)
@@ -4404,6 +5703,180 @@ class Order:
         # Return the sorted list of vendor names:
         return list(sorted(vendor_names_table.keys()))
 
+    # Order.vendor_parts_fetch():
+    def vendor_parts_fetch(self, refreshes: "List[Refresh]") -> None:
+        """ *Order*: Look up fresh *VendorPart*'s for each *ActualPart* in *refreshes*
+            using the *Panda*'s of the *Order* object (i.e. *self*) and merge them into
+            each *ActualPart*.  Only the *ActualPart*'s in *refreshes* are modified, so this
+            can safely run in a background thread.
+        """
+        # Grab some values from *order* (i.e. *self*):
+        order: Order = self
+        pandas: List[Panda] = order.pandas
+        panda_pool: PandaPool = order.panda_pool
+
+        # Build *vendor_panda_indices* which maps a vendor name to the *Panda*'s that can
+        # answer for just that vendor:
+        vendor_panda_indices: Dict[str, List[int]] = dict()
+        panda_index: int
+        panda: Panda
+        for panda_index, panda in enumerate(pandas):
+            if panda.vendor_name:
+                if panda.vendor_name not in vendor_panda_indices:
+                    vendor_panda_indices[panda.vendor_name] = list()
+                vendor_panda_indices[panda.vendor_name].append(panda_index)
+
+        # Figure out which *Panda*'s to query for each *refresh*.  When every stale vendor can
+        # be answered by a single vendor *Panda*, only those *Panda*'s are queried; otherwise,
+        # all of the *Panda*'s are queried and all of the *VendorPart*'s are replaced:
+        all_panda_indices: List[int] = list(range(len(pandas)))
+        panda_indices_lists: List[List[int]] = list()
+        stale_vendor_names_list: List[List[str]] = list()
+        refresh: Refresh
+        for refresh in refreshes:
+            stale_vendor_names: List[str] = refresh[3]
+            panda_indices: List[int] = all_panda_indices
+            if stale_vendor_names and all([stale_vendor_name in vendor_panda_indices
+                                           for stale_vendor_name in stale_vendor_names]):
+                panda_indices = sorted(set([panda_index
+                                            for stale_vendor_name in stale_vendor_names
+                                            for panda_index in
+                                            vendor_panda_indices[stale_vendor_name]]))
+            else:
+                stale_vendor_names = list()
+            panda_indices_lists.append(panda_indices)
+            stale_vendor_names_list.append(stale_vendor_names)
+
+        # Perform all of the lookups (possibly concurrently):
+        actual_parts: List[ActualPart] = [refresh[0] for refresh in refreshes]
+        part_names: List[str] = [refresh[2] for refresh in refreshes]
+        new_vendor_parts_lists: List[List[VendorPart]]
+        faileds: List[bool]
+        new_vendor_parts_lists, faileds = \
+            panda_pool.vendor_parts_lookup(actual_parts, part_names, panda_indices_lists)
+
+        # Merge the *new_vendor_parts* into each *actual_part*.  When a lookup failed, the
+        # *actual_part* falls back to the previously cached *VendorPart*'s (or to whatever was
+        # found if nothing was cached) and is marked so that it is neither saved nor trusted:
+        now: int = int(time.time())
+        index: int
+        for index, refresh in enumerate(refreshes):
+            actual_part: ActualPart = refresh[0]
+            previous_actual_part: Optional[ActualPart] = refresh[1]
+            if faileds[index]:
+                actual_part.fallback = True
+                if previous_actual_part is None:
+                    actual_part.vendor_parts_merge(new_vendor_parts_lists[index], None, [])
+                continue
+            actual_part.vendor_parts_merge(new_vendor_parts_lists[index], previous_actual_part,
+                                           stale_vendor_names_list[index])
+            actual_part.timestamp = now
+
+    # Order.vendor_parts_lookup():
+    @trace(1)
+    def vendor_parts_lookup(self, refreshes: "List[Refresh]") -> None:
+        """ *Order*: Look up fresh *VendorPart*'s for each *ActualPart* in *refreshes*
+            using the *Panda*'s of the *Order* object (i.e. *self*) and save any that
+            changed into the vendor parts cache.
+        """
+        order: Order = self
+        order.vendor_parts_fetch(refreshes)
+        order.vendor_parts_save(refreshes)
+
+    # Order.vendor_parts_save():
+    def vendor_parts_save(self, refreshes: "List[Refresh]") -> None:
+        """ *Order*: Save each refreshed *ActualPart* in *refreshes* into the vendor parts
+            cache of the *Order* object (i.e. *self*), but only when it differs from the
+            previously cached *ActualPart*.
+        """
+        # Grab some values from *order* (i.e. *self*):
+        order: Order = self
+        vendor_parts_cache: VendorPartsCache = order.vendor_parts_cache
+        tracing: str = tracing_get()
+
+        # Only write each *actual_part* back to the *vendor_parts_cache* when its fingerprint
+        # differs from that of the *previous_actual_part*:
+        saves_count: int = 0
+        refresh: Refresh
+        for refresh in refreshes:
+            actual_part: ActualPart = refresh[0]
+            previous_actual_part: Optional[ActualPart] = refresh[1]
+            if actual_part.fallback:
+                continue
+            if (previous_actual_part is None or
+                    previous_actual_part.fingerprint_get() != actual_part.fingerprint_get()):
+                vendor_parts_cache.actual_part_save(actual_part)
+                saves_count += 1
+        if tracing:
+            print(f"{tracing}len(refreshes)={len(refreshes)} saves_count={saves_count}")
+
+    # Order.vendor_priority_get():
+    def vendor_priority_get(self, vendor_name: str) -> int:
+        """ *Order*: Return the sort priority for *vendor_name*, assigning a new one
+            if the *Order* object (i.e. *self*) has not seen *vendor_name* before.
+        """
+        order: Order = self
+        vendor_priorities: Dict[str, int] = order.vendor_priorities
+        vendor_priority: int
+        if vendor_name in vendor_priorities:
+            # Priority already assigned to *vendor_name*:
+            vendor_priority = vendor_priorities[vendor_name]
+        else:
+            # Assigned a new priority for *vendor_name*:
+            vendor_priority = order.vendor_priority
+            vendor_priorities[vendor_name] = vendor_priority
+            order.vendor_priority += 1
+        return vendor_priority
+
+    # Order.vendors_optimize():
+    @trace(1)
+    def vendors_optimize(self, choice_parts: "List[ChoicePart]",
+                         excluded_vendor_names: Dict[str, None],
+                         reduced_vendor_messages: List[str]) -> None:
+        """ *Order*: Find the set of vendors for *choice_parts* that minimizes the parts cost
+            plus the shipping costs and minimum order shortfalls (see *VendorSetOptimizer*), and
+            add every other vendor to *excluded_vendor_names*.  This is the exact alternative to
+            *Order.exclude_vendors_to_reduce_shipping_costs*() when there are no vendor minimum
+            orders and the search finishes in time (otherwise it is a better heuristic.)
+        """
+        # Grab some values from *order* (i.e. *self*):
+        order: Order = self
+        cost_matrix: CostMatrix = order.cost_matrix_get(choice_parts)
+        shipping_cost_default: float = order.shipping_cost_default
+        vendor_minimums: Dict[str, float] = order.vendor_minimums
+        vendor_shipping_costs: Dict[str, float] = order.vendor_shipping_costs
+
+        # Search for the best *vendor_names* set:
+        vendor_names: List[str] = cost_matrix.vendor_names
+        shipping_costs: List[float] = [vendor_shipping_costs.get(vendor_name,
+                                                                 shipping_cost_default)
+                                       for vendor_name in vendor_names]
+        minimum_costs: List[float] = [vendor_minimums.get(vendor_name, 0.0)
+                                      for vendor_name in vendor_names]
+        vendor_set_optimizer: VendorSetOptimizer = VendorSetOptimizer(
+          cost_matrix, excluded_vendor_names, shipping_costs, minimum_costs,
+          order.optimize_time_limit)
+        selected_vendor_names: List[str] = vendor_set_optimizer.solve()
+        best_cost: float = vendor_set_optimizer.best_cost
+        quality: str = "optimal"
+        if vendor_set_optimizer.is_timed_out:
+            quality = "best found in time limit"
+        elif not vendor_set_optimizer.is_exact:
+            quality = "heuristic, since vendor minimum orders are not fully modeled"
+        print(f"      Price is ${best_cost:.2f} (including shipping) from "
+              f"{len(selected_vendor_names)} vendors ({quality})")
+
+        # Exclude every vendor that did not make the cut:
+        tracing: str = tracing_get()
+        vendor_name: str
+        for vendor_name in order.vendor_names_get(choice_parts, excluded_vendor_names):
+            if vendor_name not in selected_vendor_names:
+                message: str = f"Excluding '{vendor_name}': not in the lowest cost vendor set"
+                reduced_vendor_messages.append(message + '\n')
+                if tracing:
+                    print(message)
+                excluded_vendor_names[vendor_name] = None
+
     # Order.vendors_select():
     def vendors_select(self, selected_vendor_names: List[str]) -> None:
         """ *Order*: Force the selected vendors for the *order* object (i.e. *self*)
@@ -4415,31 +5888,770 @@ class Order:
         order.selected_vendor_names = selected_vendor_names
 
 
-# Panda:
-class Panda:
-    # Panda stands for Pricing AND Availability:
+# OrderResult:
+class OrderResult:
+    # An *OrderResult* is an immutable snapshot of the vendor selection of each *ChoicePart*
+    # of an *Order*.  The selection is done exactly once (from the *CostMatrix*) when the
+    # *OrderResult* is created, so the report writers (*Order.bom_write*(), *Order.csv_write*(),
+    # *Order.summary_print*(), and *Project.assembly_summary_write*()) only do formatting.
 
-    # Panda.__init__():
-    def __init__(self, name: str) -> None:
-        # Stuff values into *panda* (i.e. *self*):
-        # panda = self
-        self.name = name
+    # OrderResult.__init__():
+    def __init__(self, order: Order, choice_parts: "List[ChoicePart]",
+                 excluded_vendor_names: Dict[str, None]) -> None:
+        """ *OrderResult*: Initialize *self* to contain the selection of each *ChoicePart*
+            in *choice_parts* from the vendors of *order* that are not in
+            *excluded_vendor_names*.
+        """
+        # Select every *choice_part* from the *cost_matrix*.  The selected offers are also
+        # stored into each *choice_part*:
+        cost_matrix: CostMatrix = order.cost_matrix_get(choice_parts)
+        columns: List[int] = cost_matrix.selections_get(
+          cost_matrix.mask_get(excluded_vendor_names))
+        cost_matrix.selections_apply(columns)
+
+        # Freeze the selection of each *choice_part* into *selections*.  The *pose_parts* of
+        # each *choice_part* are sorted by *project* followed by reference (if they are not
+        # sorted already).  Nothing is printed here, since an *OrderResult* can be created more
+        # than once per run (see *Order.summary_print*() for the missing parts):
+        fallback_part_names: List[str] = []
+        missing_parts: int = 0
+        selections: List[Selection] = []
+        total_cost: float = 0.0
+        choice_part: ChoicePart
+        column: int
+        for choice_part, column in zip(choice_parts, columns):
+            choice_part.pose_parts_sort()
+            references_text: str = choice_part.references_text_get()
+            selection: Selection
+            if column < 0:
+                selection = (choice_part, None, None, "", -1, 0, 0.0, references_text)
+                missing_parts += 1
+            else:
+                selection = (choice_part, choice_part.selected_actual_part,
+                             choice_part.selected_vendor_part, choice_part.selected_vendor_name,
+                             choice_part.selected_price_break_index,
+                             choice_part.selected_order_quantity,
+                             choice_part.selected_total_cost, references_text)
+                total_cost += choice_part.selected_total_cost
+            selections.append(selection)
+
+            # Remember the parts that were priced from cached data because a lookup failed:
+            if any([actual_part.fallback for actual_part in choice_part.actual_parts]):
+                fallback_part_names.append(choice_part.name)
+
+        # Total up the selected cost of each remaining vendor:
+        vendor_costs_table: Dict[str, float] = cost_matrix.vendor_costs_get(columns)
+        vendor_costs: Tuple[Tuple[str, float], ...] = tuple([
+          (vendor_name, vendor_costs_table.get(vendor_name, 0.0))
+          for vendor_name in order.vendor_names_get(choice_parts, excluded_vendor_names)])
+
+        # Rank each *selection* in vendor order (the order of the vendor `.csv` files):
+        selections_table: Dict[str, Tuple[int, Selection]] = {
+          selection[0].name: (rank, selection) for rank, selection in
+          enumerate(sorted(selections, key=lambda selection:
+                           (selection[3], selection[6], selection[0].name)))}
+
+        # Load up *order_result* (i.e. *self*) and freeze it:
+        # order_result: OrderResult = self
+        self.excluded_vendor_names: Tuple[str, ...] = tuple(sorted(excluded_vendor_names))
+        self.fallback_part_names: Tuple[str, ...] = tuple(fallback_part_names)
+        self.missing_parts: int = missing_parts
+        self.selections: Tuple[Selection, ...] = tuple(selections)  # Same order as *choice_parts*
+        # Maps a part name to its rank in vendor order and its *Selection*:
+        self.selections_table: Dict[str, Tuple[int, Selection]] = selections_table
+        self.total_cost: float = total_cost
+        self.vendor_costs: Tuple[Tuple[str, float], ...] = vendor_costs
+        self.is_frozen: bool = True
+
+    # OrderResult.__setattr__():
+    def __setattr__(self, name: str, value: Any) -> None:
+        """ *OrderResult*: Set the *name* attribute of the *OrderResult* object (i.e. *self*)
+            to *value*.  Once the *OrderResult* has been initialized, it can not be changed.
+        """
+        if getattr(self, "is_frozen", False):
+            raise AttributeError(f"OrderResult is immutable (can not set '{name}')")
+        object.__setattr__(self, name, value)
 
-    # Panda.__str__():
+    # OrderResult.__str__():
     def __str__(self) -> str:
-        panda: Panda = self
-        name: str = "??"
-        if hasattr(panda, "name"):
-            name = panda.name
-        return f"Panda({name})"
-
-    # Panda.vendor_parts_lookup():
+        order_result: OrderResult = self
+        return (f"OrderResult(len(selections)={len(order_result.selections)}, "
+                f"total_cost={order_result.total_cost:.2f})")
+
+
+# OrderManifest:
+class OrderManifest:
+    # An *OrderManifest* records the content hashes of the inputs and the outputs of an
+    # *Order* run in a JSON file in the order root, so that the next `--incremental` run can
+    # tell what has changed.  The inputs are the net files, the order configuration files,
+    # the vendor exclusion settings, and the fingerprint of each *ChoicePart* (which covers
+    # both the search results and the vendor parts cache entries of the *ChoicePart*.)
+    #
+    # The vendor reduction looks at every *ChoicePart* at once, so its excluded vendors are
+    # reused only when none of the inputs that it depends on have changed.  Any change to a
+    # *ChoicePart* count (e.g. from editing one net file) or offer changes the selection key,
+    # and then the whole vendor reduction is redone; it is not narrowed down to the changed
+    # *ChoicePart*'s, since dropping a vendor can change the selection of any *ChoicePart*.
+    # (The selection of each *ChoicePart* with the excluded vendors is just a *CostMatrix*
+    # row minimum.)  What is always saved is rewriting report files: a report file is only
+    # rewritten when its contents differ from the previous run, so its modification time is
+    # left alone for anything downstream.
+
+    # OrderManifest.__init__():
+    def __init__(self, manifest_file_name: str) -> None:
+        """ *OrderManifest*: Initialize *self* and load the previous run from
+            *manifest_file_name* (if it exists.)
+        """
+        # Load the *previous* manifest, ignoring one that can not be read:
+        previous: Dict[str, Any] = {}
+        if os.path.isfile(manifest_file_name):
+            manifest_file: IO[str]
+            try:
+                with open(manifest_file_name) as manifest_file:
+                    previous = json.load(manifest_file)
+            except (OSError, ValueError):
+                print(f"Ignoring unreadable manifest file '{manifest_file_name}'.")
+
+        # Stuff values into *manifest* (i.e. *self*):
+        # manifest: OrderManifest = self
+        self.choice_parts: Dict[str, str] = {}   # ChoicePart name to fingerprint
+        self.excluded_vendor_names: List[str] = []
+        self.inputs: Dict[str, str] = {}         # Input file/settings name to content hash
+        self.lock: threading.Lock = threading.Lock()  # Guards *outputs* and *outputs_unchanged*
+        self.manifest_file_name: str = manifest_file_name
+        self.outputs: Dict[str, str] = {}        # Output file name to content hash
+        self.outputs_unchanged: int = 0          # Output files that were not rewritten
+        self.previous: Dict[str, Any] = previous
+        self.selection_key: str = ""
+
+    # OrderManifest.__str__():
+    def __str__(self) -> str:
+        manifest: OrderManifest = self
+        manifest_file_name: str = "??"
+        if hasattr(manifest, "manifest_file_name"):
+            manifest_file_name = manifest.manifest_file_name
+        return f"OrderManifest('{manifest_file_name}')"
+
+    # OrderManifest.changes_count():
+    def changes_count(self, table_name: str) -> int:
+        """ *OrderManifest*: Return the number of entries in the *table_name* table of the
+            *OrderManifest* object (i.e. *self*) that are new or differ from the previous run.
+        """
+        manifest: OrderManifest = self
+        table: Dict[str, str] = getattr(manifest, table_name)
+        previous_table: Dict[str, str] = manifest.previous.get(table_name, {})
+        return len([name for name, digest in table.items()
+                    if previous_table.get(name) != digest])
+
+    # OrderManifest.digest_get():
+    @staticmethod
+    def digest_get(data: bytes) -> str:
+        """ *OrderManifest*: Return the content hash of *data* as a hexadecimal string. """
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    # OrderManifest.excluded_vendor_names_reuse():
+    def excluded_vendor_names_reuse(self, order: "Order", choice_parts: "List[ChoicePart]",
+                                    excluded_vendor_names: Dict[str, None]) -> bool:
+        """ *OrderManifest*: Record the inputs of *order* and the fingerprints of
+            *choice_parts* in the *OrderManifest* object (i.e. *self*).  If none of the
+            inputs of the vendor reduction have changed since the previous run, add the
+            previously excluded vendors to *excluded_vendor_names* and return *True*.
+        """
+        # Record the content hash of each input file.  The net files are only reported
+        # on, since they only affect the vendor reduction through the *ChoicePart* counts:
+        manifest: OrderManifest = self
+        inputs: Dict[str, str] = manifest.inputs
+        order_root: str = order.order_root
+        configuration_file_names: List[str] = [
+          os.path.join(order_root, "exchange_rates.csv"),
+          os.path.join(order_root, "vendor_costs.csv")]
+        input_file_names: List[str] = configuration_file_names + [
+          file_name for project in order.projects
+          for file_name in (project.cad_file_name, project.positions_file_name) if file_name]
+        input_file_name: str
+        for input_file_name in input_file_names:
+            if os.path.isfile(input_file_name):
+                input_file: IO[bytes]
+                with open(input_file_name, "rb") as input_file:
+                    inputs[input_file_name] = OrderManifest.digest_get(input_file.read())
+
+        # The vendor exclusion settings are recorded as if they were one more input:
+        settings_text: str = repr((
+          sorted(excluded_vendor_names.keys()), order.selected_vendor_names,
+          order.optimize_time_limit, order.shipping_cost_default, order.vendor_priority,
+          sorted(order.vendor_priorities.items()), sorted(order.vendor_minimums.items()),
+          sorted(order.vendor_shipping_costs.items())))
+        inputs["settings"] = OrderManifest.digest_get(settings_text.encode())
+
+        # Record the fingerprint of each *choice_part*:
+        choice_parts_table: Dict[str, str] = manifest.choice_parts
+        choice_part: ChoicePart
+        for choice_part in choice_parts:
+            choice_parts_table[choice_part.name] = f"{choice_part.fingerprint_get():016x}"
+
+        # The *selection_key* covers everything the vendor reduction depends on:
+        selection_key_text: str = repr((
+          [inputs.get(file_name, "") for file_name in configuration_file_names],
+          inputs["settings"], sorted(choice_parts_table.items())))
+        selection_key: str = OrderManifest.digest_get(selection_key_text.encode())
+        manifest.selection_key = selection_key
+
+        # Let the user know what changed and reuse the previous excluded vendors if possible:
+        previous: Dict[str, Any] = manifest.previous
+        is_reused: bool = previous.get("selection_key") == selection_key
+        print(f"Incremental: {manifest.changes_count('inputs')} of {len(inputs)} inputs and "
+              f"{manifest.changes_count('choice_parts')} of {len(choice_parts_table)} "
+              "parts changed since the last run.")
+        if is_reused:
+            previous_excluded_vendor_names: List[str] = previous.get("excluded_vendor_names", [])
+            vendor_name: str
+            for vendor_name in previous_excluded_vendor_names:
+                excluded_vendor_names[vendor_name] = None
+            print(f"Incremental: Reusing the {len(previous_excluded_vendor_names)} "
+                  "excluded vendors of the last run.")
+        else:
+            print("Incremental: Redoing the whole vendor reduction.")
+        return is_reused
+
+    # OrderManifest.output_open():
+    @contextlib.contextmanager
+    def output_open(self, output_file_name: str) -> Iterator[IO[str]]:
+        """ *OrderManifest*: Yield an in memory file for the contents of *output_file_name*
+            and afterwards write the contents out only if they differ from both the previous
+            run and the current contents of *output_file_name*.  This can be called
+            concurrently from the *ReportWriter*'s.
+        """
+        # Collect the *text* to be written:
+        manifest: OrderManifest = self
+        buffer: io.StringIO = io.StringIO()
+        yield buffer
+        text: str = buffer.getvalue()
+
+        # The file on disk is only compared (i.e. read) when the previous hash matches:
+        digest: str = OrderManifest.digest_get(text.encode())
+        is_unchanged: bool = False
+        if (manifest.previous.get("outputs", {}).get(output_file_name) == digest and
+           os.path.isfile(output_file_name)):
+            previous_file: IO[str]
+            with open(output_file_name, newline="") as previous_file:
+                is_unchanged = previous_file.read() == text
+        if not is_unchanged:
+            output_file: IO[str]
+            with open(output_file_name, "w") as output_file:
+                output_file.write(text)
+        with manifest.lock:
+            manifest.outputs[output_file_name] = digest
+            if is_unchanged:
+                manifest.outputs_unchanged += 1
+
+    # OrderManifest.save():
+    def save(self) -> None:
+        """ *OrderManifest*: Write the *OrderManifest* object (i.e. *self*) out for the next
+            incremental run.  Outputs that were not generated by this run are remembered too.
+        """
+        # Summarize the outputs:
+        manifest: OrderManifest = self
+        outputs: Dict[str, str] = manifest.outputs
+        if outputs:
+            print(f"Incremental: {manifest.outputs_unchanged} of {len(outputs)} report files "
+                  "were unchanged and not rewritten.")
+
+        # Write the manifest to a temporary file first so that an interrupted save does not
+        # leave a partial manifest behind:
+        manifest_table: Dict[str, Any] = {
+          "choice_parts": manifest.choice_parts,
+          "excluded_vendor_names": manifest.excluded_vendor_names,
+          "inputs": manifest.inputs,
+          "outputs": dict(manifest.previous.get("outputs", {}), **outputs),
+          "selection_key": manifest.selection_key}
+        manifest_file_name: str = manifest.manifest_file_name
+        temporary_file_name: str = manifest_file_name + ".tmp"
+        manifest_file: IO[str]
+        with open(temporary_file_name, "w") as manifest_file:
+            json.dump(manifest_table, manifest_file, indent=1, sort_keys=True)
+        os.replace(temporary_file_name, manifest_file_name)
+
+
+# Panda:
+class Panda:
+    # Panda stands for Pricing AND Availability:
+
+    # A *Panda* sub-class can override these to limit how hard it hits its web site.  The
+    # *concurrency_limit* is the maximum number of simultaneous lookups (only a thread-safe
+    # *Panda* should raise it above 1) and *requests_per_second* is the maximum lookup rate
+    # (0.0 means no limit).  A *Panda* that
+    # implements *vendor_parts_lookup_batch*() sets *batch_size* to the maximum number of
+    # *ActualPart*'s it can price with a single request.  A *Panda* that only answers for a
+    # single vendor (i.e. distributor) sets *vendor_name* to that vendor's name so that it can
+    # be used to refresh just the stale *VendorPart*'s of that vendor.  A lookup that takes
+    # longer than *timeout* seconds is abandoned and, after *failures_maximum* failed lookups
+    # in a row, the *Panda* is not used for the rest of the run:
+    batch_size: int = 1
+    concurrency_limit: int = 1
+    failures_maximum: int = 3
+    requests_per_second: float = 0.0
+    timeout: float = 60.0
+    vendor_name: str = ""
+
+    # *fetcher* is the shared *Fetcher* provided by the *Order* for fetching web pages:
+    fetcher: Optional[Fetcher] = None
+
+    # Panda.__init__():
+    def __init__(self, name: str) -> None:
+        # Stuff values into *panda* (i.e. *self*):
+        # panda = self
+        self.name = name
+
+    # Panda.__str__():
+    def __str__(self) -> str:
+        panda: Panda = self
+        name: str = "??"
+        if hasattr(panda, "name"):
+            name = panda.name
+        return f"Panda({name})"
+
+    # Panda.fetcher_set():
+    def fetcher_set(self, fetcher: Fetcher) -> None:
+        """ *Panda*: Provide the shared *fetcher* to the *Panda* object (i.e. *self*). """
+        panda: Panda = self
+        panda.fetcher = fetcher
+
+    # Panda.vendor_parts_lookup():
     def vendor_parts_lookup(self, actual_part, part_name) -> "List[VendorPart]":
         panda: Panda = self
         class_name: str = panda.__class__.__name__
         assert False, f"{class_name}.vendor_parts_lookup() has not been implemented"
         return list()
 
+    # Panda.vendor_parts_lookup_batch():
+    def vendor_parts_lookup_batch(self, actual_parts: List[ActualPart],
+                                  part_names: List[str]) -> "List[List[VendorPart]]":
+        """ *Panda*: Look up the *VendorPart*'s for each *ActualPart* in *actual_parts*
+            (with the matching part name from *part_names*) and return one list of
+            *VendorPart*'s per *ActualPart*.  This default implementation simply performs
+            one *vendor_parts_lookup*() per *ActualPart*; a sub-class whose web site can
+            price many parts at once should override it and set *batch_size*.
+        """
+        panda: Panda = self
+        assert len(actual_parts) == len(part_names)
+        return [panda.vendor_parts_lookup(actual_part, part_names[index])
+                for index, actual_part in enumerate(actual_parts)]
+
+
+# CassettePanda:
+class CassettePanda(Panda):
+    # A *CassettePanda* wraps another *Panda* so that its lookups are recorded into (or
+    # replayed from) a *Cassette*.  The limits of the wrapped *Panda* are kept so that a
+    # replay is batched and throttled the same way as the original lookups.
+
+    # CassettePanda.__init__():
+    def __init__(self, panda: Panda, cassette: Cassette) -> None:
+        # Initialize the *Panda* super class with the same name as *panda*:
+        super().__init__(panda.name)
+
+        # Stuff values into *cassette_panda* (i.e. *self*):
+        # cassette_panda: CassettePanda = self
+        self.batch_size: int = panda.batch_size
+        self.cassette: Cassette = cassette
+        self.concurrency_limit: int = panda.concurrency_limit
+        self.failures_maximum: int = panda.failures_maximum
+        self.panda: Panda = panda
+        self.requests_per_second: float = panda.requests_per_second
+        self.timeout: float = panda.timeout
+        self.vendor_name: str = panda.vendor_name
+
+    # CassettePanda.__str__():
+    def __str__(self) -> str:
+        cassette_panda: CassettePanda = self
+        name: str = "??"
+        if hasattr(cassette_panda, "name"):
+            name = cassette_panda.name
+        return f"CassettePanda({name})"
+
+    # CassettePanda.fetcher_set():
+    def fetcher_set(self, fetcher: Fetcher) -> None:
+        """ *CassettePanda*: Provide the shared *fetcher* to both the *CassettePanda* object
+            (i.e. *self*) and the wrapped *Panda*. """
+        cassette_panda: CassettePanda = self
+        cassette_panda.fetcher = fetcher
+        cassette_panda.panda.fetcher_set(fetcher)
+
+    # CassettePanda.vendor_parts_lookup():
+    def vendor_parts_lookup(self, actual_part, part_name) -> "List[VendorPart]":
+        cassette_panda: CassettePanda = self
+        return cassette_panda.cassette.vendor_parts_lookup(cassette_panda.panda, [actual_part],
+                                                           [part_name])[0]
+
+    # CassettePanda.vendor_parts_lookup_batch():
+    def vendor_parts_lookup_batch(self, actual_parts: List[ActualPart],
+                                  part_names: List[str]) -> "List[List[VendorPart]]":
+        cassette_panda: CassettePanda = self
+        return cassette_panda.cassette.vendor_parts_lookup(cassette_panda.panda, actual_parts,
+                                                           part_names)
+
+
+# PandaPool:
+class PandaPool:
+    # A *PandaPool* performs *Panda* vendor part lookups for many *ActualPart*'s concurrently
+    # using a pool of threads.  Each *Panda* is limited to at most *Panda.concurrency_limit*
+    # lookups at a time and at most *Panda.requests_per_second* lookups per second (where 0.0
+    # means no limit.)  The results are merged back in a deterministic order.  A lookup that
+    # takes longer than *Panda.timeout* seconds or that is still pending at *deadline_time* is
+    # abandoned.  A *Panda* with *Panda.failures_maximum* failed lookups in a row is marked as
+    # *broken* (i.e. the circuit breaker opens) and is not used again.
+
+    # PandaPool.__init__():
+    def __init__(self, pandas: List[Panda], workers_maximum: int) -> None:
+        """ *PandaPool*: Initialize *self* to look up *VendorPart*'s using *pandas*
+            with no more than *workers_maximum* concurrent lookups. """
+        # Create the per *Panda* limiting values:
+        panda_semaphores: List[threading.BoundedSemaphore] = list()
+        panda_locks: List[threading.Lock] = list()
+        panda_intervals: List[float] = list()
+        panda: Panda
+        for panda in pandas:
+            panda_semaphores.append(threading.BoundedSemaphore(max(1, panda.concurrency_limit)))
+            panda_locks.append(threading.Lock())
+            requests_per_second: float = panda.requests_per_second
+            panda_intervals.append(1.0 / requests_per_second if requests_per_second > 0.0
+                                   else 0.0)
+
+        # Load up *panda_pool* (i.e. *self*):
+        # panda_pool: PandaPool = self
+        self.deadline_time: float = 0.0  # *time.monotonic*() deadline (0.0 means none)
+        self.pandas: List[Panda] = pandas
+        self.panda_brokens: List[bool] = [False] * len(pandas)
+        self.panda_failures: List[int] = [0] * len(pandas)  # Failures in a row
+        self.panda_intervals: List[float] = panda_intervals
+        self.panda_locks: List[threading.Lock] = panda_locks
+        self.panda_next_times: List[float] = [0.0] * len(pandas)
+        self.panda_semaphores: List[threading.BoundedSemaphore] = panda_semaphores
+        self.workers_maximum: int = workers_maximum
+
+    # PandaPool.__str__():
+    def __str__(self) -> str:
+        panda_pool: PandaPool = self
+        workers_maximum: int = -1
+        if hasattr(panda_pool, "workers_maximum"):
+            workers_maximum = panda_pool.workers_maximum
+        return f"PandaPool({workers_maximum})"
+
+    # PandaPool.batch_perform():
+    def batch_perform(self, panda_index: int, actual_part_keys: List[Tuple[str, str]],
+                      part_names: List[str], start_times: Optional[List[float]] = None,
+                      releaseds: Optional[List[bool]] = None,
+                      batch_index: int = 0) -> Optional[List[List["VendorPart"]]]:
+        """ *PandaPool*: Return the *VendorPart*'s found by looking up each key in
+            *actual_part_keys* using the *Panda* at *panda_index* while enforcing the limits
+            for that *Panda*.  A batch of more than one key is looked up with a single
+            *Panda.vendor_parts_lookup_batch*() request, which must return one list of
+            *VendorPart*'s per key (*ValueError* is raised otherwise.)  When *start_times* and
+            *releaseds* are provided, the time that the request is actually issued is stored
+            at *batch_index* and the concurrency slot is only given back if it has not already
+            been released by *PandaPool.slot_release*().  *None* is returned if the *Panda*
+            became unavailable while waiting for its turn.
+        """
+        # Grab the per *Panda* values from *panda_pool* (i.e. *self*):
+        panda_pool: PandaPool = self
+        panda: Panda = panda_pool.pandas[panda_index]
+        panda_interval: float = panda_pool.panda_intervals[panda_index]
+        panda_lock: threading.Lock = panda_pool.panda_locks[panda_index]
+        panda_semaphore: threading.BoundedSemaphore = panda_pool.panda_semaphores[panda_index]
+
+        # Each lookup is performed on private *scratch_actual_parts* so that concurrent
+        # lookups never append *VendorPart*'s to a shared list.  The *VendorPart*'s themselves
+        # are the lists returned by the *panda*:
+        scratch_actual_parts: List[ActualPart] = [ActualPart(actual_part_key[0], actual_part_key[1])
+                                                  for actual_part_key in actual_part_keys]
+        panda_semaphore.acquire()
+        try:
+            # Reserve the next request slot for *panda* and wait for it to arrive:
+            if panda_interval > 0.0:
+                with panda_lock:
+                    now: float = time.monotonic()
+                    request_time: float = max(now, panda_pool.panda_next_times[panda_index])
+                    panda_pool.panda_next_times[panda_index] = request_time + panda_interval
+                if request_time > now:
+                    time.sleep(request_time - now)
+
+            # Now perform the actual lookup (unless *panda* became unavailable while waiting):
+            if not panda_pool.is_available(panda_index):
+                return None
+            if start_times is not None:
+                start_times[batch_index] = time.monotonic()
+            vendor_parts_lists: List[List[VendorPart]]
+            if len(scratch_actual_parts) == 1:
+                vendor_parts_lists = [panda.vendor_parts_lookup(scratch_actual_parts[0],
+                                                                part_names[0])]
+            else:
+                vendor_parts_lists = panda.vendor_parts_lookup_batch(scratch_actual_parts,
+                                                                     part_names)
+        finally:
+            if releaseds is None:
+                panda_semaphore.release()
+            else:
+                panda_pool.slot_release(panda_index, releaseds, batch_index)
+
+        # Make sure that *panda* kept its side of the contract:
+        if (not isinstance(vendor_parts_lists, list) or
+           len(vendor_parts_lists) != len(actual_part_keys) or
+           not all([isinstance(vendor_parts, list) for vendor_parts in vendor_parts_lists])):
+            raise ValueError(f"{panda} did not return one list of vendor parts for each of "
+                             f"the {len(actual_part_keys)} actual parts")
+        return vendor_parts_lists
+
+    # PandaPool.is_available():
+    def is_available(self, panda_index: int) -> bool:
+        """ *PandaPool*: Return *True* if the *Panda* at *panda_index* can still be used (i.e.
+            it is not broken and the deadline has not passed.)
+        """
+        panda_pool: PandaPool = self
+        deadline_time: float = panda_pool.deadline_time
+        return (not panda_pool.panda_brokens[panda_index] and
+                (deadline_time <= 0.0 or time.monotonic() < deadline_time))
+
+    # PandaPool.result_record():
+    def result_record(self, panda_index: int, failed: bool, reason: str) -> None:
+        """ *PandaPool*: Record whether a lookup using the *Panda* at *panda_index* *failed*
+            (for *reason*) and open the circuit breaker after too many failures in a row.
+        """
+        panda_pool: PandaPool = self
+        panda: Panda = panda_pool.pandas[panda_index]
+        with panda_pool.panda_locks[panda_index]:
+            if not failed:
+                panda_pool.panda_failures[panda_index] = 0
+                return
+            if panda_pool.panda_brokens[panda_index]:
+                return
+            panda_pool.panda_failures[panda_index] += 1
+            print(f"{panda}: lookup failed ({reason})")
+            if panda_pool.panda_failures[panda_index] >= max(1, panda.failures_maximum):
+                panda_pool.panda_brokens[panda_index] = True
+                print(f"{panda}: {panda_pool.panda_failures[panda_index]} failures in a row; "
+                      "using cached data instead for the rest of this run")
+
+    # PandaPool.slot_release():
+    def slot_release(self, panda_index: int, releaseds: List[bool], batch_index: int) -> None:
+        """ *PandaPool*: Give back the concurrency slot held by the batch at *batch_index* for
+            the *Panda* at *panda_index*, unless *releaseds* shows that it was already given
+            back.  This allows a timed out lookup to give up its slot while it is still hung.
+        """
+        panda_pool: PandaPool = self
+        with panda_pool.panda_locks[panda_index]:
+            if releaseds[batch_index]:
+                return
+            releaseds[batch_index] = True
+        panda_pool.panda_semaphores[panda_index].release()
+
+    # PandaPool.vendor_parts_lookup():
+    @trace(1)
+    def vendor_parts_lookup(self, actual_parts: List[ActualPart], part_names: List[str],
+                            panda_indices_lists: List[List[int]]
+                            ) -> "Tuple[List[List[VendorPart]], List[bool]]":
+        """ *PandaPool*: Look up the *VendorPart*'s for each *ActualPart* in *actual_parts*
+            using the *Panda*'s in the *PandaPool* object (i.e. *self*).  *part_names* has
+            the part name to pass along with each *ActualPart* and *panda_indices_lists* has
+            the indices of the *Panda*'s to query for each *ActualPart*.  The *ActualPart*'s
+            are grouped into batches of up to *Panda.batch_size* for each *Panda*.  One list
+            of *VendorPart*'s is returned for each *ActualPart* in *Panda* order, independent
+            of the order that the lookups actually complete in.  A list of flags is returned
+            as well, where a flag is *True* when at least one lookup for the corresponding
+            *ActualPart* failed, timed out, or was skipped.
+        """
+        # Grab some values from *panda_pool* (i.e. *self*):
+        panda_pool: PandaPool = self
+        pandas: List[Panda] = panda_pool.pandas
+        workers_maximum: int = panda_pool.workers_maximum
+        tracing: str = tracing_get()
+        assert len(actual_parts) == len(part_names) == len(panda_indices_lists)
+
+        # Sort the *actual_parts* indices into *panda_actual_part_indices* so that each *Panda*
+        # has the list of *ActualPart*'s that it needs to look up:
+        panda_actual_part_indices: List[List[int]] = [list() for panda in pandas]
+        actual_part_index: int
+        panda_indices: List[int]
+        panda_index: int
+        for actual_part_index, panda_indices in enumerate(panda_indices_lists):
+            for panda_index in panda_indices:
+                panda_actual_part_indices[panda_index].append(actual_part_index)
+
+        # Split each *Panda*'s work into *batches* of (*panda_index*, *actual_part_indices*):
+        batches: List[Tuple[int, List[int]]] = list()
+        panda: Panda
+        for panda_index, panda in enumerate(pandas):
+            batch_size: int = max(1, panda.batch_size)
+            lookup_indices: List[int] = panda_actual_part_indices[panda_index]
+            start_index: int
+            for start_index in range(0, len(lookup_indices), batch_size):
+                batches.append((panda_index, lookup_indices[start_index:start_index + batch_size]))
+
+        # Fill in *batches_vendor_parts* with the *VendorPart*'s for each batch in *batches*
+        # (or *None* if the batch failed).  Tracing output is only coherent when done one at a
+        # time, so the lookups are only performed concurrently when tracing is off.  (Timeouts
+        # are not enforced when tracing.)
+        batches_size: int = len(batches)
+        batches_vendor_parts: List[Optional[List[List[VendorPart]]]] = [None] * batches_size
+        batch_index: int
+        actual_part_indices: List[int]
+        if tracing:
+            for batch_index, (panda_index, actual_part_indices) in enumerate(batches):
+                if panda_pool.is_available(panda_index):
+                    try:
+                        batches_vendor_parts[batch_index] = panda_pool.batch_perform(
+                            panda_index, [actual_parts[index].key for index in actual_part_indices],
+                            [part_names[index] for index in actual_part_indices])
+                        panda_pool.result_record(panda_index, False, "")
+                    except Exception as error:
+                        panda_pool.result_record(panda_index, True, repr(error))
+        elif batches:
+            # Queue up all of the *batches*.  The worker threads are daemon threads so that a
+            # hung lookup can be abandoned.  *batch_threads* records the worker thread that
+            # performs each batch so that the worker of a timed out batch can be replaced:
+            batch_threads: List[Optional[threading.Thread]] = [None] * batches_size
+            releaseds: List[bool] = [False] * batches_size
+            start_times: List[float] = [0.0] * batches_size
+            futures: List[concurrent.futures.Future] = list()
+            work_queue: queue.Queue = queue.Queue()
+            for batch_index, (panda_index, actual_part_indices) in enumerate(batches):
+                future: concurrent.futures.Future = concurrent.futures.Future()
+                futures.append(future)
+                work_queue.put((batch_index, panda_index,
+                                [actual_parts[index].key for index in actual_part_indices],
+                                [part_names[index] for index in actual_part_indices], future))
+
+            # Now start the worker threads and wait for each batch to complete, fail, or run out
+            # of time.  Each worker that is stuck in an abandoned lookup is replaced (at most one
+            # worker is abandoned per batch.)  If no live worker is left to take them (i.e. no
+            # more threads can be started), the batches that are still queued are abandoned:
+            workers_count: int = max(1, min(workers_maximum, batches_size))
+            threads: List[threading.Thread] = list()
+            abandoned_threads: List[threading.Thread] = list()
+            pending_batch_indices: List[int] = list(range(batches_size))
+            while pending_batch_indices:
+                queued_batch_indices: List[int] = [
+                  batch_index for batch_index in pending_batch_indices
+                  if not futures[batch_index].running() and not futures[batch_index].done()]
+                workers_live: int = len([thread for thread in threads
+                                         if thread.is_alive() and
+                                         thread not in abandoned_threads])
+                while workers_live < min(workers_count, len(queued_batch_indices)):
+                    thread: threading.Thread = threading.Thread(
+                      target=panda_pool.worker_run,
+                      args=(work_queue, start_times, releaseds, batch_threads), daemon=True)
+                    try:
+                        thread.start()
+                    except RuntimeError:
+                        break  # The operating system is out of threads.
+                    threads.append(thread)
+                    workers_live += 1
+                if workers_live == 0:
+                    for batch_index in queued_batch_indices:
+                        futures[batch_index].cancel()
+                concurrent.futures.wait([futures[batch_index]
+                                         for batch_index in pending_batch_indices],
+                                        timeout=0.1,
+                                        return_when=concurrent.futures.FIRST_COMPLETED)
+                now: float = time.monotonic()
+                deadline_time: float = panda_pool.deadline_time
+                remaining_batch_indices: List[int] = list()
+                for batch_index in pending_batch_indices:
+                    panda_index = batches[batch_index][0]
+                    future = futures[batch_index]
+                    start_time: float = start_times[batch_index]
+                    if future.cancelled():
+                        pass
+                    elif future.done():
+                        exception: Optional[BaseException] = future.exception()
+                        if exception is None:
+                            batches_vendor_parts[batch_index] = future.result()
+                            if future.result() is not None:
+                                panda_pool.result_record(panda_index, False, "")
+                        else:
+                            panda_pool.result_record(panda_index, True, repr(exception))
+                    elif (0.0 < deadline_time <= now or
+                          (panda_pool.panda_brokens[panda_index] and start_time == 0.0)):
+                        # Abandon batches that have run out of time or that are still waiting
+                        # on a broken *Panda*:
+                        future.cancel()
+                    elif 0.0 < start_time and start_time + pandas[panda_index].timeout <= now:
+                        # Abandon the hung lookup along with its worker thread and give its
+                        # slot to the next batch.  The failure is recorded first so that the
+                        # next batch does not start if the circuit breaker has just opened:
+                        batch_thread: Optional[threading.Thread] = batch_threads[batch_index]
+                        if batch_thread is not None:
+                            abandoned_threads.append(batch_thread)
+                        panda_pool.result_record(panda_index, True, "timed out")
+                        panda_pool.slot_release(panda_index, releaseds, batch_index)
+                    else:
+                        remaining_batch_indices.append(batch_index)
+                pending_batch_indices = remaining_batch_indices
+
+        # Fill in *vendor_parts_table* with one list of *VendorPart*'s for each successful
+        # (*actual_part_index*, *panda_index*) pair:
+        vendor_parts_table: Dict[Tuple[int, int], List[VendorPart]] = dict()
+        for batch_index, (panda_index, actual_part_indices) in enumerate(batches):
+            batch_vendor_parts: Optional[List[List[VendorPart]]] = \
+                batches_vendor_parts[batch_index]
+            if batch_vendor_parts is not None:
+                offset: int
+                for offset, actual_part_index in enumerate(actual_part_indices):
+                    vendor_parts_table[(actual_part_index, panda_index)] = \
+                        batch_vendor_parts[offset]
+
+        # Merge the results for each *actual_part* in a deterministic order:
+        new_vendor_parts_lists: List[List[VendorPart]] = list()
+        faileds: List[bool] = list()
+        actual_part: ActualPart
+        for actual_part_index, actual_part in enumerate(actual_parts):
+            new_vendor_parts: List[VendorPart] = list()
+            failed: bool = False
+            for panda_index in sorted(panda_indices_lists[actual_part_index]):
+                vendor_parts_key: Tuple[int, int] = (actual_part_index, panda_index)
+                if vendor_parts_key not in vendor_parts_table:
+                    failed = True
+                    continue
+                vendor_parts: List[VendorPart] = vendor_parts_table[vendor_parts_key]
+                if tracing:
+                    print(f"{tracing}{actual_part.key}:{pandas[panda_index]}: "
+                          f"{len(vendor_parts)} vendor parts")
+                new_vendor_parts.extend(vendor_parts)
+            new_vendor_parts_lists.append(new_vendor_parts)
+            faileds.append(failed)
+        return new_vendor_parts_lists, faileds
+
+    # PandaPool.worker_run():
+    def worker_run(self, work_queue: queue.Queue, start_times: List[float],
+                   releaseds: List[bool], batch_threads: List[Optional[threading.Thread]]) -> None:
+        """ *PandaPool*: Perform the batches in *work_queue* until it is empty.  Each
+            batch is skipped (with a *None* result) if its *Panda* is no longer available.
+            The current thread is recorded in *batch_threads* for each batch it performs.
+        """
+        panda_pool: PandaPool = self
+        while True:
+            try:
+                work: Tuple[int, int, List[Tuple[str, str]], List[str],
+                            concurrent.futures.Future] = work_queue.get_nowait()
+            except queue.Empty:
+                break
+            batch_index: int
+            panda_index: int
+            actual_part_keys: List[Tuple[str, str]]
+            part_names: List[str]
+            future: concurrent.futures.Future
+            batch_index, panda_index, actual_part_keys, part_names, future = work
+            if not future.set_running_or_notify_cancel():
+                continue
+            if not panda_pool.is_available(panda_index):
+                future.set_result(None)
+                continue
+            batch_threads[batch_index] = threading.current_thread()
+            try:
+                future.set_result(panda_pool.batch_perform(panda_index, actual_part_keys,
+                                                           part_names, start_times, releaseds,
+                                                           batch_index))
+            except BaseException as error:
+                future.set_exception(error)
+
 
 # Parameter():
 class Parameter:
@@ -4586,7 +6798,8 @@ class Parameter:
 class PosePart:
     # A PosePart basically specifies the binding of a ProjectPart
     # and its associated schemtatic reference.  Reference strings must
-    # be unique for a given project.
+    # be unique for a given project.  A *PosePart* never changes its *project* once it is
+    # built (see *ChoicePart.count_get*()).
 
     # PosePart.__init__():
     def __init__(self, project: "Project", project_part: "ProjectPart", reference: str,
@@ -4601,6 +6814,11 @@ class PosePart:
         self.reference: str = reference
         self.comment: str = comment
         self.install: bool = (comment != "DNI")
+        # The natural sort key of *reference* (e.g. ("SW", 123) for "SW123") is computed
+        # just once (-1 means that *reference* has no digits):
+        reference_digits: str = text_filter(reference, str.isdigit)
+        self.sort_key: Tuple[str, int] = (text_filter(reference, str.isalpha).upper(),
+                                          int(reference_digits) if reference_digits else -1)
 
     # PosePart.__str__():
     def __str__(self) -> str:
@@ -5060,13 +7278,23 @@ class PriceBreak:
     # A price break is where a the pricing changes:
 
     # PriceBreak.__init__():
-    def __init__(self, quantity: int, price: float) -> None:
-        """ *PriceBreak*: Initialize *self* to contain *quantity*
-            and *price*.  """
+    def __init__(self, quantity: int, price: float, currency: str = "USD") -> None:
+        """ *PriceBreak*: Initialize *self* to contain *quantity* and *price* (in *currency*).
+            The price is normalized into the base currency right here so that the selection
+            code only ever compares plain floats.  """
+        # Normalize *price* into the base currency.  A price in a currency with no exchange
+        # rate becomes *math.inf* (and the *PriceBreak* is dropped by *VendorPart*):
+        base_price: float = price
+        if currency != ActualPart.ACTUAL_PART_BASE_CURRENCY:
+            exchange_rate: Optional[float] = ActualPart.exchange_rate_get(currency)
+            base_price = math.inf if exchange_rate is None else price * exchange_rate
+
         # Load up *price_break* (i.e. *self*):
         # price_break: PriceBreak = self
+        self.currency: str = currency
+        self.currency_price: float = price  # *price* before normalization (i.e. in *currency*)
         self.quantity: int = quantity
-        self.price: float = price
+        self.price: float = base_price
         self.order_quantity: int = 0
         self.order_price: float = 0.00
 
@@ -5076,7 +7304,8 @@ class PriceBreak:
         if isinstance(price_break2, PriceBreak):
             price_break1: PriceBreak = self
             equal = (price_break1.quantity == price_break2.quantity and
-                     price_break1.price == price_break2.price)
+                     price_break1.currency_price == price_break2.currency_price and
+                     price_break1.currency == price_break2.currency)
         return equal
 
     # PriceBreak.__format__():
@@ -5113,11 +7342,12 @@ class PriceBreak:
         # Grab some values from *price_break* (i.e. *self*):
         price_break: PriceBreak = self
         quantity: int = price_break.quantity
-        price: float = price_break.price
+        currency_price: float = price_break.currency_price
+        currency: str = price_break.currency
 
         # Output `<PriceBreak ...>` tag:
-        xml_lines.append('{0}<PriceBreak quantity="{1}" price="{2:.6f}"/>'.
-                         format(indent, quantity, price))
+        xml_lines.append('{0}<PriceBreak quantity="{1}" price="{2:.6f}" currency="{3}"/>'.
+                         format(indent, quantity, currency_price, Encode.to_attribute(currency)))
 
     # PriceBreak.xml_parse():
     @staticmethod
@@ -5126,14 +7356,19 @@ class PriceBreak:
         attributes_table: Dict[str, str] = price_break_tree.attrib
         quantity: int = int(attributes_table["quantity"])
         price: float = float(attributes_table["price"])
+        currency: str = attributes_table.get("currency", "USD")
 
         # Create and return the new *PriceBreak* object:
-        price_break: PriceBreak = PriceBreak(quantity, price)
+        price_break: PriceBreak = PriceBreak(quantity, price, currency)
         return price_break
 
 
 # Project:
 class Project:
+    # *PROJECT_COUNT_CHANGES* is bumped whenever the *count* of any *Project* is changed so
+    # that *ChoicePart.count_get*() knows when to recompute its cached count:
+    PROJECT_COUNT_CHANGES: int = 0
+
     # Project.__init__():
     def __init__(self, name: str, revision: str, cad_file_name: str, count: int, order: Order,
                  positions_file_name: str = "") -> None:
@@ -5155,6 +7390,10 @@ class Project:
         self.all_pose_parts: List[PosePart] = []               # All *ProjectPart*'s
         self.installed_pose_parts: List[PosePart] = []         # *ProjectPart*'s to be installed
         self.uninstalled_pose_parts: List[PosePart] = []       # *ProjectParts*'s not installed
+        # The (*PosePart*, *ChoicePart*) pairs of the *Project* keyed by the *install* flag of
+        # the *PosePart* (filled in by *ChoicePart.pose_part_append*()):
+        self.pose_part_pairs: Dict[bool, List[Tuple[PosePart, "ChoicePart"]]] = {True: [],
+                                                                                 False: []}
 
         # Read all of the *cads* associated with *order*:
         cads: List[Cad] = order.cads
@@ -5176,6 +7415,15 @@ class Project:
         result: str = f"{name}.{revision}"
         return result
 
+    # Project.__setattr__():
+    def __setattr__(self, name: str, value: Any) -> None:
+        """ *Project*: Set the *name* attribute of the *Project* object (i.e. *self*) to
+            *value*, noting any change to *count*.
+        """
+        object.__setattr__(self, name, value)
+        if name == "count":
+            Project.PROJECT_COUNT_CHANGES += 1
+
     # Project.__str__():
     def __str__(self) -> str:
         name: str = "??"
@@ -5186,17 +7434,16 @@ class Project:
 
     # Project.assembly_summary_write():
     @trace(1)
-    def assembly_summary_write(self, final_choice_parts: "List[ChoicePart]",
-                               order: Order) -> None:
+    def assembly_summary_write(self, order_result: OrderResult, order: Order) -> None:
         """ Write out an assembly summary .csv file for the *Project* object (i.e. *self*)
-            using *final_choice_parts*.
+            using the selections in *order_result*.
         """
         # Open *project_file* (i.e. *self*):
         project: Project = self
         order_root: str = order.order_root
         project_file_name: str = os.path.join(order_root, f"{project.name}.csv")
         project_file: IO[str]
-        with open(project_file_name, "w") as project_file:
+        with order.output_open(project_file_name) as project_file:
             # Write out the column headings:
             project_file.write(
               '"Quan.","Reference","Schematic Name","Description","Fractional",' +
@@ -5204,7 +7451,7 @@ class Project:
 
             # Output the installed parts:
             has_fractional_parts1: bool = project.assembly_summary_write_helper(True,
-                                                                                final_choice_parts,
+                                                                                order_result,
                                                                                 project_file)
 
             # Output the uninstalled parts:
@@ -5212,7 +7459,7 @@ class Project:
 
             # Output the installed parts:
             has_fractional_parts2: bool = project.assembly_summary_write_helper(False,
-                                                                                final_choice_parts,
+                                                                                order_result,
                                                                                 project_file)
 
             # Explain what a fractional part is:
@@ -5224,40 +7471,45 @@ class Project:
         print(f"Wrote out assembly file '{project_file_name}'")
 
     # Project.assembly_summary_write_helper():
-    def assembly_summary_write_helper(self, install: bool, final_choice_parts: "List[ChoicePart]",
+    def assembly_summary_write_helper(self, install: bool, order_result: OrderResult,
                                       csv_file: IO[str]) -> bool:
         """ Write out an assembly summary .csv file for *Project* object (i.e. *self*)
             out to *project_file*.  *install* is set *True* to list the installable parts from
-            *final_choice_parts* and *False* for an uninstallable parts listing.
+            *order_result* and *False* for an uninstallable parts listing.
             This routine returns *True* if there are any fractional parts output to *csv_file*.
         """
+        # Only the (*pose_part*, *final_choice_part*) pairs of the project (i.e. *self*) that
+        # match the *install* selector are visited.  They are visited in vendor order (just
+        # like *Order.csv_write*()) followed by reference order, so the references of the parts
+        # that share a schematic name are listed in that order:
+        project: Project = self
+        selections_table: Dict[str, Tuple[int, Selection]] = order_result.selections_table
+        project_final_pairs: List[Tuple[PosePart, ChoicePart]] = [
+          project_final_pair for project_final_pair in project.pose_part_pairs[install]
+          if project_final_pair[1].name in selections_table]
+        project_final_pairs.sort(key=lambda project_final_pair:
+                                 (selections_table[project_final_pair[1].name][0],
+                                  project_final_pair[0].sort_key))
+
         # Each *final_choice_part* that is part of the project (i.e. *self*) will wind up
         # in a list in *pose_parts_table*.  The key is the *project_part_key*:
-        project: Project = self
         pose_parts_table: Dict[str, List[Tuple[PosePart, ChoicePart]]] = {}
-        final_choice_part: ChoicePart
-        for final_choice_part in final_choice_parts:
-            # Now figure out if final choice part is part of *pose_parts*:
-            pose_parts: List[PosePart] = final_choice_part.pose_parts
-            pose_part: PosePart
-            for pose_part in pose_parts:
-                # We only care care about *final_choice_part* if is used on *project* and
-                # it matches the *install* selector:
-                if pose_part.project is project and pose_part.install == install:
-                    # We are on the project; create *schemati_part_key*:
-                    project_part: ProjectPart = pose_part.project_part
-                    project_part_key: str = (f"{project_part.base_name};"
-                                             f"{project_part.short_footprint}")
-
-                    # Create/append a list to *pose_parts_table*, keyed on *project_part_key*:
-                    if project_part_key not in pose_parts_table:
-                        pose_parts_table[project_part_key] = []
-                    key: str = project_part_key
-                    pairs_list: List[Tuple[PosePart, ChoicePart]] = pose_parts_table[key]
-
-                    # Append a pair of *pose_part* and *final_choice_part* onto *pairs_list*:
-                    project_final_pair = (pose_part, final_choice_part)
-                    pairs_list.append(project_final_pair)
+        project_final_pair: Tuple[PosePart, ChoicePart]
+        for project_final_pair in project_final_pairs:
+            # Create *project_part_key*:
+            pose_part: PosePart = project_final_pair[0]
+            project_part: ProjectPart = pose_part.project_part
+            project_part_key: str = (f"{project_part.base_name};"
+                                     f"{project_part.short_footprint}")
+
+            # Create/append a list to *pose_parts_table*, keyed on *project_part_key*:
+            if project_part_key not in pose_parts_table:
+                pose_parts_table[project_part_key] = []
+            key: str = project_part_key
+            pairs_list: List[Tuple[PosePart, ChoicePart]] = pose_parts_table[key]
+
+            # Append the pair of *pose_part* and *final_choice_part* onto *pairs_list*:
+            pairs_list.append(project_final_pair)
 
         # Now organize everything around the *reference_list*:
         reference_pose_parts: Dict[str, Tuple[PosePart, ChoicePart]] = {}
@@ -5289,13 +7541,14 @@ class Project:
             project_part_key = f"{project_part.base_name};{project_part.short_footprint}"
 
             # Now get the *actual_part*:
-            actual_part: Optional[ActualPart] = final_choice_part.selected_actual_part
+            selection: Selection = selections_table[final_choice_part.name][1]
+            actual_part: Optional[ActualPart] = selection[1]
             if isinstance(actual_part, ActualPart):
 
                 # Now get the VendorPart:
                 manufacturer_name: str = actual_part.manufacturer_name
                 manufacturer_part_name: str = actual_part.manufacturer_part_name
-                vendor_part: Optional[VendorPart] = final_choice_part.selected_vendor_part
+                vendor_part: Optional[VendorPart] = selection[2]
                 assert isinstance(vendor_part, VendorPart)
 
                 # Output the line for the .csv file:
@@ -5564,9 +7817,15 @@ class ChoicePart(ProjectPart):
         self.actual_parts: List[ActualPart] = []
         self.searches: List[Search] = searches
         # Fields used by algorithm:
+        self.count: int = -1  # Cached by *count_get*()
+        self.count_key: Tuple[int, int, int, int, int] = (-1, -1, -1, -1, -1)
         self.description: str = "DESCRIPTION"
         self.footprint: str = "FOOTPRINT"
         self.fractional_parts: List[FractionalPart] = []
+        self.offers: List[Quint] = []  # Cached by *offers_get*()
+        self.offers_key: Tuple[int, Tuple[Tuple[int, ...], ...]] = (-1, ())
+        self.pose_parts_changes: int = 0  # Bumped whenever *pose_parts* is changed
+        self.pose_parts_sorted: int = -1  # *pose_parts_changes* when last sorted
         self.selected_total_cost: float = 0.00
         self.selected_order_quantity: int = -1
         self.selected_actual_part: Optional[ActualPart] = None
@@ -5687,6 +7946,10 @@ class ChoicePart(ProjectPart):
         """
         choice_part: ChoicePart = self
         choice_part.pose_parts.append(pose_part)
+        choice_part.pose_parts_changes += 1
+
+        # Index the pair by the *project* of *pose_part* for *Project.assembly_summary_write*():
+        pose_part.project.pose_part_pairs[pose_part.install].append((pose_part, choice_part))
 
     # ChoicePart.pose_parts_sort():
     def pose_parts_sort(self) -> None:
@@ -5695,23 +7958,100 @@ class ChoicePart(ProjectPart):
         """
 
         # Sort the *pose_parts* using a key of
-        # (project_name, reference, reference_number).  A reference of
-        # "SW123" gets conferted to (..., "SW123", 123):
+        # (project_name, (reference_letters, reference_number)).  A reference of
+        # "SW123" gets conferted to (..., ("SW", 123)) (see *PosePart.sort_key*).
+        # The *pose_parts* are not sorted again until another *PosePart* is appended:
         choice_part: ChoicePart = self
-        pose_parts: List[PosePart] = choice_part.pose_parts
-        pose_parts.sort(key=lambda pose_part:
-                        (pose_part.project.name,
-                         text_filter(pose_part.reference, str.isalpha).upper(),
-                         int(text_filter(pose_part.reference, str.isdigit))))
+        if choice_part.pose_parts_sorted != choice_part.pose_parts_changes:
+            pose_parts: List[PosePart] = choice_part.pose_parts
+            choice_part.pose_parts_changes += 1
+            pose_parts.sort(key=lambda pose_part: (pose_part.project.name, pose_part.sort_key))
+            choice_part.pose_parts_sorted = choice_part.pose_parts_changes
 
         # print("  {0}:{1};{2} {3}:{4}".\
         #  format(choice_part.name,
         # choice_part.kicad_footprint, choice_part.description,
         #  choice_part.count_get(), choice_part.references_text_get()))
 
-    # ChoicePart.count_get():
-    def count_get(self) -> int:
-        """ *ChoicePart*: Return the number of needed instances of *self*. """
+    # ChoicePart.cost_curve_get():
+    def cost_curve_get(self, required_quantities: List[int],
+                       excluded_vendor_names: Dict[str, None]) -> List[Optional[Quint]]:
+        """ *ChoicePart*: Return the offer that *ChoicePart.select*() would select for the
+            *ChoicePart* (i.e. *self*) for each quantity in *required_quantities* excluding any
+            vendors in *excluded_vendor_names* (*None* when there is no offer.)
+        """
+        # Grab some values from *choice_part* (i.e. *self*):
+        choice_part: ChoicePart = self
+        actual_parts: List[ActualPart] = choice_part.actual_parts
+
+        # The offers only change in character at a price break quantity or just past an
+        # available quantity, so those *breakpoints* split the quantities into intervals:
+        breakpoints_table: Dict[int, None] = {}
+        actual_part: ActualPart
+        vendor_part: VendorPart
+        for actual_part in actual_parts:
+            for vendor_part in actual_part.vendor_parts:
+                if vendor_part.vendor_name not in excluded_vendor_names:
+                    price_break: PriceBreak
+                    for price_break in vendor_part.price_breaks:
+                        breakpoints_table[price_break.quantity] = None
+                    breakpoints_table[vendor_part.quantity_available + 1] = None
+        breakpoints: List[int] = sorted(breakpoints_table.keys())
+
+        # Within an interval, the best offer ordering exactly the required quantity has a cost
+        # that goes up linearly (at the cheapest *price*) and the best offer ordering a larger
+        # price break quantity has a constant cost.  These two are computed once per interval
+        # and the selection for each required quantity is just the better of the two:
+        intervals_table: Dict[int, Tuple[Optional[Tuple[float, int, int, int, int]],
+                                         Optional[Quint]]] = {}
+        quints: List[Optional[Quint]] = []
+        required_quantity: int
+        for required_quantity in required_quantities:
+            interval: int = bisect.bisect_right(breakpoints, required_quantity)
+            if interval not in intervals_table:
+                linear_best: Optional[Tuple[float, int, int, int, int]] = None
+                constant_best: Optional[Quint] = None
+                actual_part_index: int
+                for actual_part_index, actual_part in enumerate(actual_parts):
+                    vendor_part_index: int
+                    for vendor_part_index, vendor_part in enumerate(actual_part.vendor_parts):
+                        if vendor_part.vendor_name not in excluded_vendor_names:
+                            price_breaks_size: int = len(vendor_part.price_breaks)
+                            below_index: int
+                            above_offer: Optional[Tuple[float, int, int]]
+                            below_index, above_offer = \
+                                vendor_part.offer_parts_get(required_quantity)
+                            if below_index >= 0:
+                                linear: Tuple[float, int, int, int, int] = (
+                                  vendor_part.price_breaks[below_index].price, actual_part_index,
+                                  vendor_part_index, below_index, price_breaks_size)
+                                if linear_best is None or linear < linear_best:
+                                    linear_best = linear
+                            if above_offer is not None:
+                                constant: Quint = (above_offer[0], above_offer[1],
+                                                   actual_part_index, vendor_part_index,
+                                                   above_offer[2], price_breaks_size)
+                                if constant_best is None or constant < constant_best:
+                                    constant_best = constant
+                intervals_table[interval] = (linear_best, constant_best)
+
+            # Pick the better of the linear and constant offers for *required_quantity*:
+            linear_best, constant_best = intervals_table[interval]
+            quint: Optional[Quint] = constant_best
+            if linear_best is not None:
+                linear_quint: Quint = (required_quantity * linear_best[0], required_quantity,
+                                       linear_best[1], linear_best[2], linear_best[3],
+                                       linear_best[4])
+                if quint is None or linear_quint < quint:
+                    quint = linear_quint
+            quints.append(quint)
+        return quints
+
+    # ChoicePart.count_compute():
+    def count_compute(self) -> int:
+        """ *ChoicePart*: Compute and return the number of needed instances of *self*
+            without using the cache (see *ChoicePart.count_get*().)
+        """
         choice_part: ChoicePart = self
         count: int = 0
         fractional_part: FractionalPart
@@ -5751,17 +8091,57 @@ class ChoicePart(ProjectPart):
                 else:
                     assert False, "Missing code"
 
+                # Each of the *project_count* instances of *pose_part* adds
+                # *fractional_numerator* to *numerator*, starting a new part (i.e.
+                # *count* += 1) whenever *denominator* would be exceeded.  The first
+                # instance is done by hand, and the rest are done in closed form:
                 fractional_numerator: int = fractional_part.numerator
-                for index in range(pose_part.project.count):
+                project_count: int = pose_part.project.count
+                if project_count > 0:
                     if numerator + fractional_numerator > denominator:
                         count += 1
                         numerator = 0
                     numerator += fractional_numerator
+                    remaining_count: int = project_count - 1
+                    if remaining_count > 0 and fractional_numerator > denominator:
+                        # Every remaining instance starts a new part:
+                        count += remaining_count
+                    elif remaining_count > 0 and fractional_numerator > 0:
+                        # *numerator* <= *denominator* here.  Fill up the current part and
+                        # then pack *per_part* instances into each of the new parts:
+                        fit_count: int = (denominator - numerator) // fractional_numerator
+                        if remaining_count <= fit_count:
+                            numerator += remaining_count * fractional_numerator
+                        else:
+                            remaining_count -= fit_count
+                            per_part: int = denominator // fractional_numerator
+                            new_parts_count: int = (remaining_count + per_part - 1) // per_part
+                            count += new_parts_count
+                            numerator = ((remaining_count - (new_parts_count - 1) * per_part) *
+                                         fractional_numerator)
             if numerator > 0:
                 numerator = 0
                 count += 1
         return count
 
+    # ChoicePart.count_get():
+    def count_get(self) -> int:
+        """ *ChoicePart*: Return the number of needed instances of *self*.  The count is cached
+            until the pose parts, the fractional parts (or any fraction), or any *Project*
+            count changes.  A *PosePart* never changes its *Project* once it is built, so
+            there is nothing else to watch.
+        """
+        choice_part: ChoicePart = self
+        count_key: Tuple[int, int, int, int, int] = (choice_part.pose_parts_changes,
+                                                     len(choice_part.pose_parts),
+                                                     len(choice_part.fractional_parts),
+                                                     FractionalPart.FRACTIONAL_PART_CHANGES,
+                                                     Project.PROJECT_COUNT_CHANGES)
+        if count_key != choice_part.count_key:
+            choice_part.count = choice_part.count_compute()
+            choice_part.count_key = count_key
+        return choice_part.count
+
     # ChoicePart.choice_parts():
     def choice_parts(self) -> "List[ChoicePart]":
         """ *ChoicePart*: Return a list of *ChoicePart* corresponding
@@ -5769,6 +8149,22 @@ class ChoicePart(ProjectPart):
         choice_part: ChoicePart = self
         return [choice_part]
 
+    # ChoicePart.fingerprint_get():
+    def fingerprint_get(self) -> int:
+        """ *ChoicePart*: Return a stable fingerprint of everything that the selection of the
+            *ChoicePart* object (i.e. *self*) depends on, namely its name, its count, and the
+            *VendorPart* fingerprints of each *ActualPart*.  The *VendorPart* fingerprints are
+            kept in order, since ties between equal offers are broken by position.
+        """
+        choice_part: ChoicePart = self
+        fingerprint_text: str = repr((choice_part.name, choice_part.count_get(),
+                                      [(actual_part.key,
+                                        [vendor_part.fingerprint_get()
+                                         for vendor_part in actual_part.vendor_parts])
+                                       for actual_part in choice_part.actual_parts]))
+        return int.from_bytes(hashlib.blake2b(fingerprint_text.encode(),
+                                              digest_size=8).digest(), "big")
+
     # ChoicePart.footprints_check():
     def footprints_check(self, footprints: Dict[str, str]) -> None:
         """ *ChoicePart*: Verify that all the footprints exist for the *ChoicePart* object
@@ -5805,6 +8201,70 @@ class ChoicePart(ProjectPart):
         references_text += "]"
         return references_text
 
+    # ChoicePart.offer_select():
+    def offer_select(self, quint: Quint) -> None:
+        """ *ChoicePart*: Make *quint* (one of the offers from *ChoicePart.offers_get*())
+            the selected offer of the *ChoicePart* object (i.e. *self*).
+        """
+        # Extract values from *quint*:
+        choice_part: ChoicePart = self
+        selected_total_cost: float = quint[0]
+        selected_order_quantity: int = quint[1]
+        selected_actual_part: ActualPart = choice_part.actual_parts[quint[2]]
+        selected_vendor_part: VendorPart = selected_actual_part.vendor_parts[quint[3]]
+        selected_vendor_name: str = selected_vendor_part.vendor_name
+        selected_price_break_index: int = quint[4]
+
+        # Now stuff extracted values from *quint* into *choice_part*:
+        choice_part.selected_total_cost = selected_total_cost
+        choice_part.selected_order_quantity = selected_order_quantity
+        choice_part.selected_actual_part = selected_actual_part
+        choice_part.selected_vendor_part = selected_vendor_part
+        choice_part.selected_vendor_name = selected_vendor_name
+        choice_part.selected_price_break_index = selected_price_break_index
+        assert selected_price_break_index < len(selected_vendor_part.price_breaks)
+
+        # print("selected_vendor_name='{0}'".format(selected_vendor_name))
+
+    # ChoicePart.offers_get():
+    def offers_get(self, required_quantity: int) -> List[Quint]:
+        """ *ChoicePart*: Return the best offer of each *VendorPart* of the *ChoicePart*
+            (i.e. *self*) for *required_quantity* parts as a sorted list of *Quint*'s.  The
+            list is cached until *required_quantity* or a *VendorPart* changes, so that
+            repeated selections with different excluded vendors do not rescan price breaks.
+        """
+        # Compute *offers_key* from the *VendorPart* fingerprints.  The fingerprints are kept
+        # in order because the *Quint*'s refer to the *VendorPart*'s by index:
+        choice_part: ChoicePart = self
+        actual_parts: List[ActualPart] = choice_part.actual_parts
+        offers_key: Tuple[int, Tuple[Tuple[int, ...], ...]] = (
+          required_quantity,
+          tuple([tuple([vendor_part.fingerprint_get() for vendor_part in actual_part.vendor_parts])
+                 for actual_part in actual_parts]))
+
+        # Rebuild *offers* only when *offers_key* has changed:
+        offers: List[Quint] = choice_part.offers
+        if offers_key != choice_part.offers_key:
+            offers = []
+            actual_part_index: int
+            actual_part: ActualPart
+            for actual_part_index, actual_part in enumerate(actual_parts):
+                vendor_part_index: int
+                vendor_part: VendorPart
+                for vendor_part_index, vendor_part in enumerate(actual_part.vendor_parts):
+                    offer: Optional[Tuple[float, int, int]] = vendor_part.offer_get(
+                      required_quantity)
+                    if offer is not None:
+                        total_cost, order_quantity, price_break_index = offer
+                        quint: Quint = (total_cost, order_quantity,
+                                        actual_part_index, vendor_part_index,
+                                        price_break_index, len(vendor_part.price_breaks))
+                        offers.append(quint)
+            offers.sort()
+            choice_part.offers = offers
+            choice_part.offers_key = offers_key
+        return offers
+
     # ChoicePart.select():
     @trace(2)
     def select(self, excluded_vendor_names: Dict[str, None], announce: bool = False) -> int:
@@ -5815,106 +8275,41 @@ class ChoicePart(ProjectPart):
         trace_level: int = trace_level_get()
         tracing: str = tracing_get()
 
-        # This lovely piece of code basically brute forces the decision
-        # process of figuring out which *vendor_part* to select and the
-        # number of parts to order.  We iterate over each *actual_part*,
-        # *vendor_part* and *price_break* and compute the *total_cost*
-        # and *order_quanity* for that combination.  We store this into
-        # a 5-tuple called *quint* and build of the list of *quints*.
-        # When we are done, we sort *quints* and select the first one
-        # off the head of the list.
+        # The best offer (a *Quint*) of each *vendor_part* is computed once by *offers_get*()
+        # and sorted in ascending order.  The first offer from a vendor that is not in
+        # *excluded_vendor_names* is the one to select.  This gives the same answer as sorting
+        # every *actual_part*, *vendor_part*, and *price_break* combination, but most calls
+        # only look at the first few offers.
 
         # Grab some values from *choice_part* (i.e. *self*):
         choice_part: "ChoicePart" = self
         required_quantity: int = choice_part.count_get()
         actual_parts: List[ActualPart] = choice_part.actual_parts
-        quints: List[Quint] = []
+        offers: List[Quint] = choice_part.offers_get(required_quantity)
 
-        actual_part_index: int
-        actual_part: ActualPart
-        for actual_part_index, actual_part in enumerate(actual_parts):
-            if tracing and trace_level >= 1:
-                manufacturer_name: str = actual_part.manufacturer_name
-                manufacturer_part_name: str = actual_part.manufacturer_part_name
-                print(f"{tracing} Manufacturer: '{manufacturer_name}' '{manufacturer_part_name}'")
-            vendor_parts: List[VendorPart] = actual_part.vendor_parts
-            vendor_part_index: int
-            vendor_part: VendorPart
-            for vendor_part_index, vendor_part in enumerate(vendor_parts):
-                # if tracing and trace_level >= 2
-                #     print(f"Vendor: {vendor_part.vendor_name}: "
-                #           f"'{vendor_part.vendor_part_name}':"
-                #           f":{vendor_part.quantity_available}")
-                if tracing and trace_level >= 2:
-                    vendor_name: str = vendor_part.vendor_name
-                    vendor_part_name: str = vendor_part.vendor_part_name
-                    quantity_available: int = vendor_part.quantity_available
-                    print(f"{tracing}  Vendor: {quantity_available} x "
-                          f"'{vendor_name}': '{vendor_part_name}'")
-                price_breaks: List[PriceBreak] = vendor_part.price_breaks
-                price_break_index: int
-                price_break: PriceBreak
-                for price_break_index, price_break in enumerate(price_breaks):
-                    # if tracing:
-                    #        print("  B")
-
-                    # We not have an *actual_part*, *vendor_part* and
-                    # *price_break* triple.  Compute *order_quantity*
-                    # and *total_cost*:
-                    price: float = price_break.price
-                    quantity: int = price_break.quantity
-                    order_quantity: int = max(required_quantity, quantity)
-                    total_cost: float = order_quantity * price
-                    # if tracing:
-                    #     print("   price={0:.2f} quant={1} order_quantity={2} total_cost={3:.2f}".
-                    #           format(price, quantity, order_quantity, total_cost))
-
-                    # Assemble the *quint* and append to *quints* if there
-                    # enough parts available:
-                    is_excluded: bool = vendor_part.vendor_name in excluded_vendor_names
-                    # if trace_level:
-                    #    print(f"quantity_available={vendor_part.quantity_available}, "
-                    #          f"is_excluded={is_excluded}")
-                    if tracing and trace_level >= 3:
-                        quantity_available = vendor_part.quantity_available
-                        print(f"{tracing}   Quantity Available:{quantity_available} "
-                              f"Is Excluded:{is_excluded}")
-                    if not is_excluded and vendor_part.quantity_available >= order_quantity:
-                        assert price_break_index < len(price_breaks)
-                        quint: Quint = (total_cost, order_quantity,
-                                        actual_part_index, vendor_part_index,
-                                        price_break_index, len(price_breaks))
-                        quints.append(quint)
-                        if tracing:
-                            print(f"{tracing}    quint={quint}")
+        quints: List[Quint] = []
+        offer: Quint
+        for offer in offers:
+            vendor_part: VendorPart = actual_parts[offer[2]].vendor_parts[offer[3]]
+            is_excluded: bool = vendor_part.vendor_name in excluded_vendor_names
+            if tracing and trace_level >= 2:
+                vendor_name: str = vendor_part.vendor_name
+                vendor_part_name: str = vendor_part.vendor_part_name
+                quantity_available: int = vendor_part.quantity_available
+                print(f"{tracing}  Vendor: {quantity_available} x "
+                      f"'{vendor_name}': '{vendor_part_name}' Is Excluded:{is_excluded}")
+            if not is_excluded:
+                quints.append(offer)
+                if tracing:
+                    print(f"{tracing}    quint={offer}")
+                break
 
         if len(quints) == 0:
             choice_part_name = self.name
             if announce:
                 print(f"{tracing}No vendor parts found for Part '{choice_part_name}'")
         else:
-            # Now sort in ascending order:
-            quints.sort()
-            quint = quints[0]
-
-            # Extract values from *quint*:
-            selected_total_cost = quint[0]
-            selected_order_quantity = quint[1]
-            selected_actual_part = actual_parts[quint[2]]
-            selected_vendor_part = selected_actual_part.vendor_parts[quint[3]]
-            selected_vendor_name = selected_vendor_part.vendor_name
-            selected_price_break_index = quint[4]
-
-            # Now stuff extracted values from *quint* into *self*:
-            self.selected_total_cost = selected_total_cost
-            self.selected_order_quantity = selected_order_quantity
-            self.selected_actual_part = selected_actual_part
-            self.selected_vendor_part = selected_vendor_part
-            self.selected_vendor_name = selected_vendor_name
-            self.selected_price_break_index = selected_price_break_index
-            assert selected_price_break_index < len(selected_vendor_part.price_breaks)
-
-            # print("selected_vendor_name='{0}'".format(selected_vendor_name))
+            choice_part.offer_select(quints[0])
 
         # actual_parts = self.actual_parts
         # for actual_part in actual_parts:
@@ -5957,93 +8352,38 @@ class ChoicePart(ProjectPart):
         for actual_part in actual_parts:
             actual_part.vendor_names_load(vendor_names_table, excluded_vendor_names)
 
-    # ChoicePart.vendor_parts_refresh():
+    # ChoicePart.vendor_parts_load():
     @trace(1)
-    def vendor_parts_refresh(self, proposed_actual_parts: List[ActualPart],
-                             order: Order, part_name: str) -> None:
+    def vendor_parts_load(self, proposed_actual_parts: List[ActualPart], order: Order,
+                          part_name: str, refreshes: "List[Refresh]") -> None:
+        """ *ChoicePart*: Load the *VendorPart*'s for each *ActualPart* in
+            *proposed_actual_parts* from the vendor parts cache of *order* and make them
+            the *actual_parts* of the *ChoicePart* object (i.e. *self*).  Each *ActualPart*
+            that is missing or stale is appended to *refreshes* so that it can be looked up
+            later by *Order.vendor_parts_lookup*().
+        """
         # Grab some values from *choice_part* (i.e. *self*) and *order*:
         choice_part: ChoicePart = self
         choice_part_name: str = choice_part.name
-        pandas: List[Panda] = order.pandas
+        actual_parts_table: Dict[Tuple[str, str], ActualPart] = order.actual_parts_table
+        price_breaks_stale: int = order.price_breaks_stale
         stale: int = order.stale
-        vendor_searches_root: str = order.vendor_searches_root
+        vendor_parts_cache: VendorPartsCache = order.vendor_parts_cache
         trace_level: int = trace_level_get()
-
-        # Construct the file path for the `.xml` file associated *choice_part*:
-        xml_base_name: str = Encode.to_file_name(choice_part_name + ".xml")
-        xml_full_name: str = os.path.join(vendor_searches_root, xml_base_name)
         tracing: str = tracing_get()
         if tracing:
             print(f"{tracing}choice_part_name='{choice_part_name}'")
-            print(f"{tracing}vendor_searches_root='{vendor_searches_root}'")
-            print(f"{tracing}xml_base_name='{xml_base_name}'")
-            print(f"{tracing}xml_full_name='{xml_full_name}'")
-
-        # Open *xml_full_name*, read it in, and fill in *previous_actual_parts_table* with
-        # the resulting *previous_actual_part* from the `.xml` file.  Mark *xml_save_required*
-        # as *True* if *xml_full_file_name* does not exist:
-        xml_save_required: bool = False
-        previous_actual_parts: List[ActualPart] = list()
-        previous_actual_parts_table: Dict[Tuple[str, str], ActualPart] = dict()
-        if os.path.isfile(xml_full_name):
-            # Read in and parse the *xml_full_name* file:
-            xml_read_file: IO[str]
-            with open(xml_full_name) as xml_read_file:
-                choice_part_xml_text: str = xml_read_file.read()
-                choice_part_tree: etree._Element = etree.fromstring(choice_part_xml_text)
-
-                # Note that *previous_choice_part* is kind of busted since it
-                # its internal *project_parts* and *searches* lists are empty.
-                # This is OK, since we only need the *previous_actual_parts* list
-                # which is popluated with valid *ActualPart*'s:
-                previous_choice_part: ChoicePart = ChoicePart.xml_parse(choice_part_tree)
-                if tracing:
-                    print(f"{tracing}Read in '{xml_full_name}'")
-
-                # Sweep through *previous_actual_parts* and enter them into
-                # *previous_actual_parts_table*:
-                previous_actual_parts = previous_choice_part.actual_parts
-                for previous_actual_part in previous_actual_parts:
-                    previous_actual_parts_table[previous_actual_part.key] = previous_actual_part
-        else:
-            # *xml_full_name* does not exist, so we must write out a new one later one:
-            xml_save_required = True
 
-        # For debugging show both the sorted *proposed_actual_parts* and *previous_actual_parts*
-        # side-by-side:
-        if tracing and trace_level >= 2:
-            # First sort *proposed_actual_parts* and *previous_actual_parts*:
-            proposed_actual_parts.sort(key=lambda proposed_actual_part: proposed_actual_part.key)
-            previous_actual_parts.sort(key=lambda previous_actual_part: previous_actual_part.key)
-
-            # Compute the *maximum_actual_parts_size*:
-            proposed_actual_parts_size: int = len(proposed_actual_parts)
-            previous_actual_parts_size: int = len(previous_actual_parts)
-            maximum_actual_parts_size: int = max(proposed_actual_parts_size,
-                                                 previous_actual_parts_size)
-            print(f"{tracing}proposed_actual_parts_size={proposed_actual_parts_size}")
-            print(f"{tracing}previous_actual_parts_size={previous_actual_parts_size}")
-            print(f"{tracing}maximum_actual_parts_size={maximum_actual_parts_size}")
-
-            # Now sweep across both *proposed_actual_parts* and *previous_actual_parts*
-            # printing out the key values side by side:
-            print(f"{tracing}Actual_Parts[xx]: (proposed)  (previous)")
-            for index in range(maximum_actual_parts_size):
-                proposed_text: str = ("--------" if index >= proposed_actual_parts_size
-                                      else str(proposed_actual_parts[index].key))
-                previous_text: str = ("--------" if index >= previous_actual_parts_size
-                                      else str(previous_actual_parts[index].key))
-                print(f"{tracing}Actual_Parts[{index}]:'{previous_text}'\t{proposed_text}")
-
-        # We need to figure out when actual parts from the `.xml` are old (i.e. *stale*)
-        # and refresh them.
+        # We need to figure out when actual parts from the *vendor_parts_cache* are old
+        # (i.e. *stale*) and refresh them.
         now: int = int(time.time())
         if tracing:
             print(f"{tracing}now={now} stale={stale} now-stale={now-stale}")
 
-        # Now sweep through *proposed_actual_parts* and refresh any that are either missing or out
-        # of date and construct the *final_actual_parts*:
+        # Now sweep through *proposed_actual_parts* and queue up any that are either missing or
+        # out of date and construct the *final_actual_parts*:
         final_actual_parts: List[ActualPart] = list()
+        final_actual_part_keys: Dict[Tuple[str, str], None] = dict()
         proposed_actual_part: ActualPart
         for index, proposed_actual_part in enumerate(proposed_actual_parts):
             # Grab the *proposed_actual_part_key*:
@@ -6051,108 +8391,94 @@ class ChoicePart(ProjectPart):
             if tracing:
                 print(f"{tracing}Proposed_Actual_Part[{index}]:'{proposed_actual_part.key}'")
 
+            # Skip over any duplicate *proposed_actual_part* for *choice_part*:
+            if proposed_actual_part_key in final_actual_part_keys:
+                if tracing:
+                    print(f"{tracing}Duplicate '{proposed_actual_part_key}' skipped")
+                continue
+            final_actual_part_keys[proposed_actual_part_key] = None
+
+            # If another *ChoicePart* has already loaded *proposed_actual_part* during this
+            # run, just share that *ActualPart* rather than loading and looking it up again:
+            if proposed_actual_part_key in actual_parts_table:
+                if tracing:
+                    print(f"{tracing}'{proposed_actual_part_key}' already loaded this run")
+                final_actual_parts.append(actual_parts_table[proposed_actual_part_key])
+                continue
+
             # Start by assuming that *lookup_is_required* and set to *False* if we can avoid
-            # the lookup:
+            # the lookup.  When only some vendors are stale, *stale_vendor_names* lists them:
             lookup_is_required: bool = True
-            if proposed_actual_part_key in previous_actual_parts_table:
+            stale_vendor_names: List[str] = list()
+            previous_actual_part: Optional[ActualPart] = \
+                vendor_parts_cache.actual_part_load(proposed_actual_part_key)
+            if previous_actual_part is not None:
                 if tracing and trace_level >= 2:
-                    print(f"{tracing}'{proposed_actual_part_key} is in previous_actual_parts_table")
+                    print(f"{tracing}'{proposed_actual_part_key} is in vendor_parts_cache")
 
                 # We have a *previous_actual_part* that matches *proposed_actual_part*.
                 # Now we see if can simply copy *previous_vendor_parts* over or
                 # whether we must trigger a vendor parts lookup:
-                key: Tuple[str, str] = proposed_actual_part_key
-                previous_actual_part = previous_actual_parts_table[key]
                 previous_vendor_parts: List[VendorPart] = previous_actual_part.vendor_parts
                 if tracing and trace_level >= 2:
                     print(f"{tracing}previous_actual_part.name="
                           f"'{previous_actual_part.manufacturer_part_name}'")
                     print(f"{tracing}len(previous_vendor_parts)={len(previous_vendor_parts)}")
 
-                # Compute the *minimum_time_stamp* across all *previous_vendor_parts*:
-                minimum_timestamp: int = now
-                for previous_vendor_part in previous_vendor_parts:
-                    minimum_timestamp = min(minimum_timestamp, previous_vendor_part.timestamp)
+                # Each *previous_vendor_part* is checked for freshness on its own, so that one
+                # stale vendor does not force a lookup of all the others.  When there are no
+                # *previous_vendor_parts*, the time of the last lookup is used instead:
+                proposed_actual_part.vendor_parts = previous_vendor_parts
+                proposed_actual_part.timestamp = previous_actual_part.timestamp
+                if previous_vendor_parts:
+                    stale_vendor_names = sorted(set([
+                        previous_vendor_part.vendor_name
+                        for previous_vendor_part in previous_vendor_parts
+                        if previous_vendor_part.is_stale(now, stale, price_breaks_stale)]))
+                    lookup_is_required = len(stale_vendor_names) > 0
+                else:
+                    lookup_is_required = previous_actual_part.timestamp + stale <= now
                 if tracing and trace_level >= 2:
-                    print(f"{tracing}minimum_timestamp={minimum_timestamp}")
-
-                # If the *minimum_time_stamp* is too stale, force a refresh:
-                if minimum_timestamp + stale > now:
-                    if tracing and trace_level >= 2:
-                        print(f"{tracing}Not stale")
-                    proposed_actual_part.vendor_parts = previous_vendor_parts
-                    lookup_is_required = False
+                    print(f"{tracing}stale_vendor_names={stale_vendor_names}")
             else:
                 if tracing and trace_level >= 2:
-                    print(f"{tracing}'{proposed_actual_part_key} is not"
-                          f" in previous_actual_parts_table")
+                    print(f"{tracing}'{proposed_actual_part_key} is not in vendor_parts_cache")
             if tracing:
                 print(f"{tracing}lookup_is_required={lookup_is_required}")
 
-            # If *lookup_is_required*, visit each *Panda* object in *pandas* and look up
-            # *VendorPart*'s.  Assemble them all in the *new_vendor_parts* list:
+            # Queue up *proposed_actual_part* for a lookup if *lookup_is_required*:
             if lookup_is_required:
-                new_vendor_parts: List[VendorPart] = list()
-                panda: Panda
-                for panda in pandas:
-                    actual_part: ActualPart = proposed_actual_part
-                    panda_vendor_parts: List[VendorPart] = panda.vendor_parts_lookup(actual_part,
-                                                                                     part_name)
-                    if tracing:
-                        print(f"{tracing}len(panda_vendor_parts)={len(panda_vendor_parts)}")
-                    new_vendor_parts.extend(panda_vendor_parts)
-                    if tracing:
-                        panda_vendor_parts_size: int = len(panda_vendor_parts)
-                        new_vendor_parts_size: int = len(new_vendor_parts)
-                        print(f"{tracing}panda_vendor_parts_size={panda_vendor_parts_size}")
-                        print(f"{tracing}new_vendor_parts_size={new_vendor_parts_size}")
-                if len(new_vendor_parts) >= 0:
-                    final_actual_parts.append(proposed_actual_part)
-                xml_save_required = True
-            else:
-                final_actual_parts.append(proposed_actual_part)
-
-        # Figure out if we need to write out *final_actual_parts* by figuring out
-        # whether or not they match *previous_actual_parts*:
-        TableType = Dict[Tuple[str, str], ActualPart]
-        previous_actual_parts_table = {previous_actual_part.key: previous_actual_part
-                                       for previous_actual_part in previous_actual_parts}
-        final_actual_parts_table: TableType = {final_actual_part.key: final_actual_part
-                                               for final_actual_part in final_actual_parts}
-        xml_save_required &= len(previous_actual_parts_table) != len(final_actual_parts_table)
-        if not xml_save_required:
-            for final_actual_part_key, final_actual_part in final_actual_parts_table.items():
-                if final_actual_part_key not in previous_actual_parts_table:
-                    xml_save_required = True
-                    break
-                previous_actual_part = previous_actual_parts_table[final_actual_part_key]
-                if previous_actual_part != final_actual_part:
-                    xml_save_required = True
-                    break
+                refresh: Refresh = (proposed_actual_part, previous_actual_part, part_name,
+                                    stale_vendor_names)
+                refreshes.append(refresh)
+            final_actual_parts.append(proposed_actual_part)
+
+            # Remember that *proposed_actual_part* has been loaded for the rest of this run:
+            actual_parts_table[proposed_actual_part_key] = proposed_actual_part
 
         # Do a little more *tracing*:
         if tracing:
             final_actual_parts_size = len(final_actual_parts)
-            previous_actual_parts_size = len(previous_actual_parts)
             proposed_actual_parts_size = len(proposed_actual_parts)
             print(f"{tracing}final_actual_parts_size={final_actual_parts_size}")
-            print(f"{tracing}previous_actual_parts_size={previous_actual_parts_size}")
             print(f"{tracing}proposed_actual_parts_size={proposed_actual_parts_size}")
+            print(f"{tracing}len(refreshes)={len(refreshes)}")
 
         # Update *choice_part* with the new *final_actual_parts*:
         choice_part.actual_parts = final_actual_parts
 
-        # Save *choice_part* out to *xml_file* if *xml_save_required* hase been set:
-        if xml_save_required:
-            if tracing:
-                print(f"{tracing}Writing out '{xml_full_name}'")
-            xml_lines = []
-            xml_lines.append('<?xml version="1.0"?>')
-            choice_part.xml_lines_append(xml_lines, "")
-            xml_lines.append("")
-            xml_text = "\n".join(xml_lines)
-            with open(xml_full_name, "w") as xml_write_file:
-                xml_write_file.write(xml_text)
+    # ChoicePart.vendor_parts_refresh():
+    @trace(1)
+    def vendor_parts_refresh(self, proposed_actual_parts: List[ActualPart],
+                             order: Order, part_name: str) -> None:
+        """ *ChoicePart*: Load the *VendorPart*'s for *proposed_actual_parts* into the
+            *ChoicePart* object (i.e. *self*) and immediately look up any that are stale.
+        """
+        # Load what is available from the cache and look up the rest:
+        choice_part: ChoicePart = self
+        refreshes: List[Refresh] = list()
+        choice_part.vendor_parts_load(proposed_actual_parts, order, part_name, refreshes)
+        order.vendor_parts_lookup(refreshes)
 
     # ChoicePart.xml_lines_append():
     def xml_lines_append(self, xml_lines: List[str], indent: str) -> None:
@@ -6196,6 +8522,11 @@ class FractionalPart(ProjectPart):
     # A *FractionalPart* specifies a part that is constructed by
     # using a portion of another *ProjectPart*.
 
+    # *FRACTIONAL_PART_CHANGES* is bumped whenever the *numerator* or *denominator* of any
+    # *FractionalPart* is changed so that *ChoicePart.count_get*() knows when to recompute its
+    # cached count:
+    FRACTIONAL_PART_CHANGES: int = 0
+
     # FractionalPart.__init__():
     def __init__(self, name: str, projects: List[Project], footprint: str, choice_part: ChoicePart,
                  numerator: int, denominator: int, description: str) -> None:
@@ -6211,6 +8542,15 @@ class FractionalPart(ProjectPart):
         self.denominator: int = denominator
         self.description: str = description
 
+    # FractionalPart.__setattr__():
+    def __setattr__(self, name: str, value: Any) -> None:
+        """ *FractionalPart*: Set the *name* attribute of the *FractionalPart* object (i.e.
+            *self*) to *value*, noting any change to *numerator* or *denominator*.
+        """
+        object.__setattr__(self, name, value)
+        if name == "numerator" or name == "denominator":
+            FractionalPart.FRACTIONAL_PART_CHANGES += 1
+
     # FractionalPart.__str__()
     def __str__(self) -> str:
         name: str = "??"
@@ -6244,6 +8584,429 @@ class FractionalPart(ProjectPart):
             footprints[footprint] = fractional_part.name
 
 
+# ReportWriter:
+class ReportWriter:
+    # A *ReportWriter* writes one or more report files from the *OrderResult* of an *Order*.
+    # Additional report writers are provided by plug-ins via the
+    # "bom_manager_report_writer_get" entry point group.  All of the *ReportWriter*'s of an
+    # *Order* are run concurrently by *Order.reports_write*(), so a *ReportWriter* must only
+    # read the *OrderResult* (which is immutable anyway) and write its own files.
+
+    # The columns of the machine readable reports (see *ReportWriter.rows_get*()):
+    REPORT_WRITER_COLUMNS: List[str] = [
+      "part_name", "footprint", "description", "count", "references", "manufacturer_name",
+      "manufacturer_part_name", "vendor_name", "vendor_part_name", "order_quantity",
+      "price_break_quantity", "price_break_price", "total_cost", "is_fallback"]
+
+    # ReportWriter.__init__():
+    def __init__(self, name: str) -> None:
+        # Stuff values into *report_writer* (i.e. *self*):
+        # report_writer: ReportWriter = self
+        self.name: str = name
+
+    # ReportWriter.__str__():
+    def __str__(self) -> str:
+        report_writer: ReportWriter = self
+        name: str = "??"
+        if hasattr(report_writer, "name"):
+            name = report_writer.name
+        return f"ReportWriter({name})"
+
+    # ReportWriter.report_write():
+    def report_write(self, order_result: OrderResult, order: Order) -> None:
+        report_writer: ReportWriter = self
+        class_name: str = report_writer.__class__.__name__
+        assert False, f"{class_name}.report_write() has not been implemented."
+
+    # ReportWriter.rows_get():
+    @staticmethod
+    def rows_get(order_result: OrderResult) -> List[List[Any]]:
+        """ *ReportWriter*: Return one row for each *Selection* in *order_result* with the
+            values of the *REPORT_WRITER_COLUMNS* (in part name order).  The vendor related
+            values are *None* for a part that no vendor can supply.
+        """
+        fallback_part_names: Tuple[str, ...] = order_result.fallback_part_names
+        rows: List[List[Any]] = []
+        selection: Selection
+        for selection in sorted(order_result.selections,
+                                key=lambda selection: selection[0].name):
+            choice_part: ChoicePart = selection[0]
+            row: List[Any] = [choice_part.name, choice_part.footprint, choice_part.description,
+                              choice_part.count_get(), selection[7]]
+            actual_part: Optional[ActualPart] = selection[1]
+            vendor_part: Optional[VendorPart] = selection[2]
+            if actual_part is not None and vendor_part is not None:
+                price_break: PriceBreak = vendor_part.price_breaks[selection[4]]
+                row += [actual_part.manufacturer_name, actual_part.manufacturer_part_name,
+                        vendor_part.vendor_name, vendor_part.vendor_part_name, selection[5],
+                        price_break.quantity, price_break.price, selection[6]]
+            else:
+                row += [None] * 8
+            row.append(choice_part.name in fallback_part_names)
+            rows.append(row)
+        return rows
+
+
+# AssemblyReportWriter:
+class AssemblyReportWriter(ReportWriter):
+    # An *AssemblyReportWriter* writes the assembly summary `.csv` file of each *Project*.
+
+    # AssemblyReportWriter.__init__():
+    def __init__(self) -> None:
+        super().__init__("Assembly")
+
+    # AssemblyReportWriter.report_write():
+    def report_write(self, order_result: OrderResult, order: Order) -> None:
+        """ *AssemblyReportWriter*: Write a part summary file for each *Project* of *order*. """
+        project: Project
+        for project in order.projects:
+            project.assembly_summary_write(order_result, order)
+
+
+# BomReportWriter:
+class BomReportWriter(ReportWriter):
+    # A *BomReportWriter* writes the BOM text files sorted by price, by vendor, and by name.
+
+    # BomReportWriter.__init__():
+    def __init__(self) -> None:
+        super().__init__("BOM")
+
+    # BomReportWriter.report_write():
+    def report_write(self, order_result: OrderResult, order: Order) -> None:
+        """ *BomReportWriter*: Write the `bom_by_*.txt` files for *order_result* into the
+            order root of *order*.
+        """
+        order_root: str = order.order_root
+        order.bom_write(order_result, os.path.join(order_root, "bom_by_price.txt"),
+                        lambda selection: (selection[6], selection[3], selection[0].name))
+        order.bom_write(order_result, os.path.join(order_root, "bom_by_vendor.txt"),
+                        lambda selection: (selection[3], selection[6], selection[0].name))
+        order.bom_write(order_result, os.path.join(order_root, "bom_by_name.txt"),
+                        lambda selection: (selection[0].name, selection[3], selection[6]))
+
+
+# ColumnarReportWriter:
+class ColumnarReportWriter(ReportWriter):
+    # A *ColumnarReportWriter* writes `order_columns.json` which is a JSON object that maps
+    # each column name to the list of values for that column (one value per part.)  This is
+    # the same column oriented layout as a Parquet file, so it can be loaded straight into
+    # a data frame without requiring a Parquet library here.
+
+    # ColumnarReportWriter.__init__():
+    def __init__(self) -> None:
+        super().__init__("Columnar")
+
+    # ColumnarReportWriter.report_write():
+    def report_write(self, order_result: OrderResult, order: Order) -> None:
+        """ *ColumnarReportWriter*: Write `order_columns.json` for *order_result* into the
+            order root of *order*.
+        """
+        rows: List[List[Any]] = ReportWriter.rows_get(order_result)
+        columns_table: Dict[str, List[Any]] = {
+          column_name: [row[column_index] for row in rows]
+          for column_index, column_name in enumerate(ReportWriter.REPORT_WRITER_COLUMNS)}
+        columns_file_name: str = os.path.join(order.order_root, "order_columns.json")
+        columns_file: IO[str]
+        with order.output_open(columns_file_name) as columns_file:
+            json.dump(columns_table, columns_file)
+        print(f"Writing '{columns_file_name}'")
+
+
+# CsvReportWriter:
+class CsvReportWriter(ReportWriter):
+    # A *CsvReportWriter* writes the `.csv` order file of each selected vendor.
+
+    # CsvReportWriter.__init__():
+    def __init__(self) -> None:
+        super().__init__("CSV")
+
+    # CsvReportWriter.report_write():
+    def report_write(self, order_result: OrderResult, order: Order) -> None:
+        """ *CsvReportWriter*: Write the vendor `.csv` files for *order_result*. """
+        order.csv_write(order_result)
+
+
+# JsonLinesReportWriter:
+class JsonLinesReportWriter(ReportWriter):
+    # A *JsonLinesReportWriter* writes `order.jsonl` which has one JSON object per part.
+
+    # JsonLinesReportWriter.__init__():
+    def __init__(self) -> None:
+        super().__init__("JSON Lines")
+
+    # JsonLinesReportWriter.report_write():
+    def report_write(self, order_result: OrderResult, order: Order) -> None:
+        """ *JsonLinesReportWriter*: Write `order.jsonl` for *order_result* into the
+            order root of *order*.
+        """
+        column_names: List[str] = ReportWriter.REPORT_WRITER_COLUMNS
+        json_lines_file_name: str = os.path.join(order.order_root, "order.jsonl")
+        json_lines_file: IO[str]
+        with order.output_open(json_lines_file_name) as json_lines_file:
+            row: List[Any]
+            for row in ReportWriter.rows_get(order_result):
+                json_lines_file.write(json.dumps(dict(zip(column_names, row))) + "\n")
+        print(f"Writing '{json_lines_file_name}'")
+
+
+# Scenario:
+class Scenario:
+    # A *Scenario* is a named "what if" set of vendor restrictions (e.g. "only Digi-Key and
+    # Mouser" or "no overseas vendors") that is evaluated against the *CostMatrix* of an
+    # already loaded *Order*.  Scenarios are evaluated in a process pool.  The read-only
+    # *CostMatrix* rows are handed to each worker process once (see
+    # *Scenario.worker_start*()) so that each evaluation only needs to send a column mask.
+    # *SCENARIO_ROWS_OFFERS* holds the rows in a worker process.
+    SCENARIO_ROWS_OFFERS: List[List[Tuple[int, float]]] = []
+
+    # Scenario.__init__():
+    def __init__(self, name: str, excluded_vendor_names: Dict[str, None],
+                 selected_vendor_names: Dict[str, None]) -> None:
+        """ *Scenario*: Initialize *self* to contain *name*.  Vendors in
+            *excluded_vendor_names* are not used, and when *selected_vendor_names* is not
+            empty, only the vendors in it are used.
+        """
+        # Load up *scenario* (i.e. *self*):
+        # scenario: Scenario = self
+        self.excluded_vendor_names: Dict[str, None] = excluded_vendor_names
+        self.name: str = name
+        self.selected_vendor_names: Dict[str, None] = selected_vendor_names
+
+    # Scenario.__str__():
+    def __str__(self) -> str:
+        name: str = "??"
+        scenario: Scenario = self
+        if hasattr(scenario, "name"):
+            name = scenario.name
+        return f"Scenario('{name}')"
+
+    # Scenario.evaluate():
+    @staticmethod
+    def evaluate(mask: List[bool]) -> Tuple[float, int, int]:
+        """ *Scenario*: Return the (total cost, missing parts, vendors count) triple for the
+            *SCENARIO_ROWS_OFFERS* when only the columns allowed by *mask* are used.  This is
+            run in a worker process.
+        """
+        total_cost: float = 0.0
+        missing_parts: int = 0
+        used_columns: Dict[int, None] = {}
+        row_offers: List[Tuple[int, float]]
+        for row_offers in Scenario.SCENARIO_ROWS_OFFERS:
+            # *row_offers* is in preference order, so take the first allowed one:
+            column: int
+            cost: float
+            for column, cost in row_offers:
+                if mask[column]:
+                    total_cost += cost
+                    used_columns[column] = None
+                    break
+            else:
+                missing_parts += 1
+        return (total_cost, missing_parts, len(used_columns))
+
+    # Scenario.mask_get():
+    def mask_get(self, vendor_names: List[str]) -> List[bool]:
+        """ *Scenario*: Return the column mask for *vendor_names* (i.e. the *CostMatrix*
+            columns) of the vendors that the *Scenario* object (i.e. *self*) allows.
+        """
+        scenario: Scenario = self
+        excluded_vendor_names: Dict[str, None] = scenario.excluded_vendor_names
+        selected_vendor_names: Dict[str, None] = scenario.selected_vendor_names
+        return [vendor_name not in excluded_vendor_names and
+                (not selected_vendor_names or vendor_name in selected_vendor_names)
+                for vendor_name in vendor_names]
+
+    # Scenario.scenarios_read():
+    @staticmethod
+    def scenarios_read(scenarios_file_name: str) -> "List[Scenario]":
+        """ *Scenario*: Read and return the *Scenario*'s in *scenarios_file_name*.  It is a
+            `.csv` file of "name,kind,vendor,..." rows where kind is either "exclude" (do not
+            use the listed vendors) or "select" (only use the listed vendors.)  A name that
+            shows up on more than one row gets all of the restrictions from those rows.
+        """
+        scenarios: List[Scenario] = []
+        scenarios_table: Dict[str, Scenario] = {}
+        scenarios_file: IO[str]
+        with open(scenarios_file_name) as scenarios_file:
+            row: List[str]
+            for row in csv.reader(scenarios_file):
+                if len(row) >= 2 and not row[0].startswith("#"):
+                    name: str = row[0].strip()
+                    kind: str = row[1].strip().lower()
+                    if kind in ("exclude", "select"):
+                        if name not in scenarios_table:
+                            scenario: Scenario = Scenario(name, {}, {})
+                            scenarios_table[name] = scenario
+                            scenarios.append(scenario)
+                        scenario = scenarios_table[name]
+                        vendor_names: Dict[str, None] = (scenario.excluded_vendor_names
+                                                         if kind == "exclude"
+                                                         else scenario.selected_vendor_names)
+                        vendor_name: str
+                        for vendor_name in row[2:]:
+                            vendor_name = vendor_name.strip()
+                            if vendor_name:
+                                vendor_names[vendor_name] = None
+        return scenarios
+
+    # Scenario.worker_start():
+    @staticmethod
+    def worker_start(rows_offers: List[List[Tuple[int, float]]]) -> None:
+        """ *Scenario*: Stash the read-only *rows_offers* into *SCENARIO_ROWS_OFFERS* for
+            *Scenario.evaluate*().  This is the worker process pool initializer.
+        """
+        Scenario.SCENARIO_ROWS_OFFERS = rows_offers
+
+
+# SelectionTracker:
+class SelectionTracker:
+    # A *SelectionTracker* keeps track of the best column and the runner-up column (i.e. the
+    # next best vendor) of each row of a *CostMatrix*.  Excluding a vendor can only change the
+    # rows that are currently assigned to that vendor, so the cost of a trial exclusion is the
+    # sum of the runner-up deltas for those rows.
+
+    # SelectionTracker.__init__():
+    def __init__(self, cost_matrix: CostMatrix, excluded_vendor_names: Dict[str, None]) -> None:
+        """ *SelectionTracker*: Initialize *self* to track the rows of *cost_matrix* with the
+            vendors in *excluded_vendor_names* excluded.  *excluded_vendor_names* is shared
+            and is updated by *SelectionTracker.vendor_exclude*().
+        """
+        # Load up *selection_tracker* (i.e. *self*):
+        selection_tracker: SelectionTracker = self
+        rows_size: int = len(cost_matrix.rows_columns)
+        self.best_columns: List[int] = [-1] * rows_size
+        self.cost_matrix: CostMatrix = cost_matrix
+        self.costs: List[float] = [0.0] * rows_size
+        self.excluded_vendor_names: Dict[str, None] = excluded_vendor_names
+        self.exclusions_count: int = 0
+        self.mask: List[bool] = cost_matrix.mask_get(excluded_vendor_names)
+        # Each row counts as missing until *offers_select*() finds a column for it:
+        self.missing_parts: int = rows_size
+        self.runner_up_columns: List[int] = [-1] * rows_size
+        self.total_cost: float = 0.0
+        # *column_rows_table* maps a column to the rows whose best or runner-up column it is:
+        self.column_rows_table: Dict[int, Dict[int, None]] = {}
+
+        # Select the initial columns for each row:
+        row: int
+        for row in range(rows_size):
+            selection_tracker.offers_select(row)
+
+    # SelectionTracker.__str__():
+    def __str__(self) -> str:
+        selection_tracker: SelectionTracker = self
+        return (f"SelectionTracker(len(best_columns)={len(selection_tracker.best_columns)}, "
+                f"total_cost={selection_tracker.total_cost:.2f})")
+
+    # SelectionTracker.offers_select():
+    def offers_select(self, row: int) -> None:
+        """ *SelectionTracker*: Recompute the best and runner-up columns of *row* of the
+            *SelectionTracker* object (i.e. *self*).  A row that runs out of columns keeps
+            its previous cost (just like *ChoicePart.select*() leaves its previous selection
+            alone) and is counted as missing.
+        """
+        # Grab some values from *selection_tracker* (i.e. *self*):
+        selection_tracker: SelectionTracker = self
+        column_rows_table: Dict[int, Dict[int, None]] = selection_tracker.column_rows_table
+        mask: List[bool] = selection_tracker.mask
+
+        # Forget about the previous best and runner-up columns:
+        previous_best_column: int = selection_tracker.best_columns[row]
+        previous_column: int
+        for previous_column in (previous_best_column, selection_tracker.runner_up_columns[row]):
+            if previous_column in column_rows_table:
+                column_rows_table[previous_column].pop(row, None)
+
+        # The columns of *row* are in preference order, so the best column is the first one
+        # that is not masked off and the runner-up column is the next one:
+        best_column: int = -1
+        runner_up_column: int = -1
+        column: int
+        for column in selection_tracker.cost_matrix.rows_columns[row]:
+            if mask[column]:
+                if best_column < 0:
+                    best_column = column
+                else:
+                    runner_up_column = column
+                    break
+        selection_tracker.best_columns[row] = best_column
+        selection_tracker.runner_up_columns[row] = runner_up_column
+        for column in (best_column, runner_up_column):
+            if column >= 0:
+                column_rows_table.setdefault(column, {})[row] = None
+
+        # Update *missing_parts* and *total_cost*:
+        if best_column >= 0:
+            if previous_best_column < 0:
+                selection_tracker.missing_parts -= 1
+            cost: float = selection_tracker.cost_matrix.costs[row][best_column]
+            selection_tracker.total_cost += cost - selection_tracker.costs[row]
+            selection_tracker.costs[row] = cost
+        elif previous_best_column >= 0:
+            selection_tracker.missing_parts += 1
+
+    # SelectionTracker.penalty_pop():
+    def penalty_pop(self, penalty_heap: "List[Tuple[int, float, str, int]]"
+                    ) -> Tuple[int, float, str, int]:
+        """ *SelectionTracker*: Pop the vendor with the lowest removal penalty off of
+            *penalty_heap* and return it.  Each *penalty_heap* entry is a (missing parts
+            delta, cost delta, vendor name, stamp) tuple, where stamp is the *exclusions_count*
+            of the *SelectionTracker* object (i.e. *self*) when the penalty was computed.
+            Penalties never go down as vendors are excluded, so stale entries are lower bounds
+            and only the top entry is recomputed until it is current.
+        """
+        selection_tracker: SelectionTracker = self
+        exclusions_count: int = selection_tracker.exclusions_count
+        while penalty_heap[0][3] != exclusions_count:
+            vendor_name: str = penalty_heap[0][2]
+            trial_missing_parts: int
+            trial_cost: float
+            trial_missing_parts, trial_cost = selection_tracker.trial_get(vendor_name)
+            heapq.heapreplace(penalty_heap,
+                              (trial_missing_parts - selection_tracker.missing_parts,
+                               trial_cost - selection_tracker.total_cost,
+                               vendor_name, exclusions_count))
+        return heapq.heappop(penalty_heap)
+
+    # SelectionTracker.trial_get():
+    def trial_get(self, vendor_name: str) -> Tuple[int, float]:
+        """ *SelectionTracker*: Return the missing parts count and total cost that the
+            *SelectionTracker* object (i.e. *self*) would have if *vendor_name* were excluded.
+        """
+        # Only the rows whose best column is the *vendor_name* column can change:
+        selection_tracker: SelectionTracker = self
+        missing_parts: int = selection_tracker.missing_parts
+        total_cost: float = selection_tracker.total_cost
+        vendor_column: int = selection_tracker.cost_matrix.vendor_indices.get(vendor_name, -1)
+        costs: List[List[float]] = selection_tracker.cost_matrix.costs
+        row: int
+        for row in selection_tracker.column_rows_table.get(vendor_column, {}):
+            if selection_tracker.best_columns[row] == vendor_column:
+                runner_up_column: int = selection_tracker.runner_up_columns[row]
+                if runner_up_column < 0:
+                    missing_parts += 1
+                else:
+                    total_cost += costs[row][runner_up_column] - costs[row][vendor_column]
+        return (missing_parts, total_cost)
+
+    # SelectionTracker.vendor_exclude():
+    def vendor_exclude(self, vendor_name: str) -> None:
+        """ *SelectionTracker*: Exclude *vendor_name* and update the rows of the
+            *SelectionTracker* object (i.e. *self*) whose best or runner-up column was
+            the *vendor_name* column.
+        """
+        selection_tracker: SelectionTracker = self
+        selection_tracker.excluded_vendor_names[vendor_name] = None
+        selection_tracker.exclusions_count += 1
+        vendor_column: int = selection_tracker.cost_matrix.vendor_indices.get(vendor_name, -1)
+        if vendor_column >= 0:
+            selection_tracker.mask[vendor_column] = False
+            rows: Dict[int, None] = selection_tracker.column_rows_table.pop(vendor_column, {})
+            row: int
+            for row in rows:
+                selection_tracker.offers_select(row)
+
+
 # Units:
 class Units:
     # Units.__init():
@@ -6299,35 +9062,39 @@ class Units:
 
 # VendorPart:
 class VendorPart:
-    # A vendor part represents a part that can be ordered from a vendor.
+    # A vendor part represents a part that can be ordered from a vendor.  Once a *VendorPart*
+    # is constructed, its price breaks and timestamps are only changed by
+    # *VendorPart.price_breaks_set*() and *VendorPart.timestamps_set*(), which also forget
+    # the cached fingerprint (and price breaks index.)
 
     # VendorPart.__init__():
     def __init__(self, actual_part: ActualPart, vendor_name: str, vendor_part_name: str,
                  quantity_available: int, price_breaks: List[PriceBreak],
-                 timestamp: int = 0) -> None:
-        """ *VendorPart*: Initialize *self* to contain *actual_part"""
+                 timestamp: int = 0, price_breaks_timestamp: int = -1) -> None:
+        """ *VendorPart*: Initialize *self* to contain *actual_part*.  *timestamp* is when
+            *quantity_available* was looked up and *price_breaks_timestamp* is when
+            *price_breaks* was looked up (-1 means the same as *timestamp*.) """
 
         # Clean up *vendor_name*:
-        # original_vendor_name = vendor_name
-        vendor_name = vendor_name.replace('\n', "")
-        if vendor_name.endswith(" •"):
-            vendor_name = vendor_name[:-2]
-        if vendor_name.endswith(" ECIA (NEDA) Member"):
-            vendor_name = vendor_name[:-19]
-        if vendor_name.endswith(" CEDA member"):
-            vendor_name = vendor_name[:-12]
-        vendor_name = vendor_name.strip(" \t")
-        # print("vendor_name='{0}'\t\toriginal_vendor_name='{1}'".format(
-        #  vendor_name, original_vendor_name))
-
-        # Sort *price_breakes* and convert to a tuple:
+        vendor_name = vendor_name_clean(vendor_name)
+
+        # Drop any *price_breaks* in a currency without an exchange rate (which only need to
+        # be looked for once such a currency has shown up) and sort the rest:
+        if ActualPart.ACTUAL_PART_MISSING_CURRENCIES:
+            price_breaks = [price_break for price_break in price_breaks
+                            if price_break.price < math.inf]
         price_breaks.sort(key=lambda price_break: (price_break.quantity, price_break.price))
 
         # Load up *self*:
         # vendor_part: VendorPart = self
         self.actual_part_key: Tuple[str, str] = actual_part.key
+        self.fingerprint: int = 0  # Cached by *fingerprint_get*() (0 means not computed yet)
         self.quantity_available: int = quantity_available
         self.price_breaks: List[PriceBreak] = price_breaks
+        # Cached by *offer_get*() (*None* means not computed yet):
+        self.price_breaks_index: Optional[Tuple[List[int], List[int]]] = None
+        self.price_breaks_timestamp: int = (timestamp if price_breaks_timestamp < 0
+                                            else price_breaks_timestamp)
         self.timestamp: int = timestamp
         self.vendor_key: Tuple[str, str] = (vendor_name, vendor_part_name)
         self.vendor_name: str = vendor_name
@@ -6346,7 +9113,9 @@ class VendorPart:
                                            vendor_part2.actual_part_key)
             quantity_available_equal: bool = (vendor_part1.quantity_available ==
                                               vendor_part2.quantity_available)
-            timestamp_equal: bool = vendor_part1.timestamp == vendor_part2.timestamp
+            timestamp_equal: bool = (vendor_part1.timestamp == vendor_part2.timestamp and
+                                     vendor_part1.price_breaks_timestamp ==
+                                     vendor_part2.price_breaks_timestamp)
             vendor_key_equal: bool = vendor_part1.vendor_key == vendor_part2.vendor_key
 
             # Compute whether *price_breaks1* is equal to *price_breaks2*:
@@ -6371,6 +9140,123 @@ class VendorPart:
         vendor_part: VendorPart = self
         return f"VendorPart('{vendor_part.vendor_name}':'{vendor_part.vendor_part_name}')"
 
+    # VendorPart.fingerprint_get():
+    def fingerprint_get(self) -> int:
+        """ *VendorPart*: Return a stable fingerprint of the key, available quantity,
+            timestamps, and price breaks of the *VendorPart* object (i.e. *self*).  The
+            fingerprint is cached until the *VendorPart* is next modified.
+        """
+        vendor_part: VendorPart = self
+        fingerprint: int = vendor_part.fingerprint
+        if fingerprint == 0:
+            fingerprint_text: str = repr((vendor_part.actual_part_key, vendor_part.vendor_key,
+                                          vendor_part.quantity_available, vendor_part.timestamp,
+                                          vendor_part.price_breaks_timestamp,
+                                          [(price_break.quantity, price_break.currency_price,
+                                            price_break.currency)
+                                           for price_break in vendor_part.price_breaks]))
+            fingerprint = max(1, int.from_bytes(hashlib.blake2b(fingerprint_text.encode(),
+                                                                digest_size=8).digest(), "big"))
+            vendor_part.fingerprint = fingerprint
+        return fingerprint
+
+    # VendorPart.is_stale():
+    def is_stale(self, now: int, quantity_stale: int, price_breaks_stale: int) -> bool:
+        """ *VendorPart*: Return *True* if either the available quantity of the *VendorPart*
+            object (i.e. *self*) is older than *quantity_stale* seconds or its price breaks
+            are older than *price_breaks_stale* seconds.
+        """
+        vendor_part: VendorPart = self
+        return (vendor_part.timestamp + quantity_stale <= now or
+                vendor_part.price_breaks_timestamp + price_breaks_stale <= now)
+
+    # VendorPart.offer_get():
+    def offer_get(self, required_quantity: int) -> Optional[Tuple[float, int, int]]:
+        """ *VendorPart*: Return the best offer of the *VendorPart* object (i.e. *self*) for
+            *required_quantity* parts as a (total cost, order quantity, price break index)
+            triple, or *None* if there are not enough parts available.
+        """
+        # Combine the two parts of the offer:
+        vendor_part: VendorPart = self
+        below_index: int
+        offer: Optional[Tuple[float, int, int]]
+        below_index, offer = vendor_part.offer_parts_get(required_quantity)
+        if below_index >= 0:
+            below_offer: Tuple[float, int, int] = (
+              required_quantity * vendor_part.price_breaks[below_index].price,
+              required_quantity, below_index)
+            if offer is None or below_offer < offer:
+                offer = below_offer
+        return offer
+
+    # VendorPart.offer_parts_get():
+    def offer_parts_get(self,
+                        required_quantity: int) -> Tuple[int, Optional[Tuple[float, int, int]]]:
+        """ *VendorPart*: Return the two parts of the best offer of the *VendorPart* object
+            (i.e. *self*) for *required_quantity* parts.  The first part is the index of the
+            cheapest price break at or below *required_quantity* (-1 for none), which orders
+            exactly *required_quantity* parts.  The second part is the best (total cost, order
+            quantity, price break index) triple of the price breaks above *required_quantity*
+            (*None* for none.)  Both parts stay the same as *required_quantity* changes until it
+            crosses a price break quantity or *quantity_available*.
+        """
+        # Grab some values from *vendor_part* (i.e. *self*):
+        vendor_part: VendorPart = self
+        price_breaks: List[PriceBreak] = vendor_part.price_breaks
+        quantity_available: int = vendor_part.quantity_available
+
+        # Build *price_breaks_index* the first time through.  *quantities* is sorted because
+        # *price_breaks* is sorted, and *minimum_indices[index]* is the index of the cheapest
+        # price break in *price_breaks[:index+1]*:
+        price_breaks_index: Optional[Tuple[List[int], List[int]]] = vendor_part.price_breaks_index
+        if price_breaks_index is None:
+            quantities: List[int] = [price_break.quantity for price_break in price_breaks]
+            minimum_indices: List[int] = []
+            minimum_index: int = -1
+            index: int
+            price_break: PriceBreak
+            for index, price_break in enumerate(price_breaks):
+                if minimum_index < 0 or price_break.price < price_breaks[minimum_index].price:
+                    minimum_index = index
+                minimum_indices.append(minimum_index)
+            price_breaks_index = (quantities, minimum_indices)
+            vendor_part.price_breaks_index = price_breaks_index
+        quantities, minimum_indices = price_breaks_index
+
+        # Every price break at or below *required_quantity* orders exactly *required_quantity*
+        # parts, so only the cheapest of them matters:
+        below_index: int = -1
+        below_size: int = bisect.bisect_right(quantities, required_quantity)
+        if below_size > 0 and quantity_available >= required_quantity:
+            below_index = minimum_indices[below_size - 1]
+
+        # Every price break above *required_quantity* orders its own quantity, so only the
+        # ones that do not exceed *quantity_available* need to be considered:
+        above_offer: Optional[Tuple[float, int, int]] = None
+        available_size: int = bisect.bisect_right(quantities, quantity_available)
+        for index in range(below_size, available_size):
+            quantity: int = quantities[index]
+            candidate: Tuple[float, int, int] = (quantity * price_breaks[index].price,
+                                                 quantity, index)
+            if above_offer is None or candidate < above_offer:
+                above_offer = candidate
+        return (below_index, above_offer)
+
+    # VendorPart.price_breaks_set():
+    def price_breaks_set(self, price_breaks: List[PriceBreak],
+                         price_breaks_timestamp: int) -> None:
+        """ *VendorPart*: Replace the price breaks of the *VendorPart* object (i.e. *self*)
+            with *price_breaks* that were looked up at *price_breaks_timestamp*.  (The
+            *price_breaks* list is never modified in place once it is assigned, so it can
+            be shared with another *VendorPart*.)
+        """
+        vendor_part: VendorPart = self
+        price_breaks.sort(key=lambda price_break: (price_break.quantity, price_break.price))
+        vendor_part.price_breaks = price_breaks
+        vendor_part.price_breaks_index = None
+        vendor_part.price_breaks_timestamp = price_breaks_timestamp
+        vendor_part.fingerprint = 0
+
     # VendorPart.price_breaks_text_get():
     def price_breaks_text_get(self) -> str:
         """ *VendorPart*: Return the prices breaks for the *VendorPart*
@@ -6384,6 +9270,16 @@ class VendorPart:
         price_breaks_text: str = " ".join(price_breaks_texts)
         return price_breaks_text
 
+    # VendorPart.timestamps_set():
+    def timestamps_set(self, timestamp: int, price_breaks_timestamp: int) -> None:
+        """ *VendorPart*: Set the available quantity *timestamp* and the
+            *price_breaks_timestamp* of the *VendorPart* object (i.e. *self*).
+        """
+        vendor_part: VendorPart = self
+        vendor_part.timestamp = timestamp
+        vendor_part.price_breaks_timestamp = price_breaks_timestamp
+        vendor_part.fingerprint = 0
+
     # VendorPart.xml_lines_append():
     def xml_lines_append(self, xml_lines: List[str], indent: str) -> None:
         # Grab some values from *vendor_part* (i.e. *self*):
@@ -6393,11 +9289,13 @@ class VendorPart:
         vendor_name: str = vendor_part.vendor_name
         vendor_part_name: str = vendor_part.vendor_part_name
         timestamp: int = vendor_part.timestamp
+        price_breaks_timestamp: int = vendor_part.price_breaks_timestamp
 
         # Output the `<VendorPart ...>` tag first:
         xml_lines.append(f'{indent}<VendorPart '
                          f'quantity_available="{quantity_available}\" '
                          f'timestamp="{timestamp}" '
+                         f'price_breaks_timestamp="{price_breaks_timestamp}" '
                          f'vendor_name="{Encode.to_attribute(vendor_name)}\" '
                          f'vendor_part_name="{Encode.to_attribute(vendor_part_name)}">')
 
@@ -6417,6 +9315,8 @@ class VendorPart:
         # Pull out the attribute values:
         attributes_table: Dict[str, str] = vendor_part_tree.attrib
         timestamp: int = int(float(attributes_table["timestamp"]))
+        price_breaks_timestamp: int = int(float(attributes_table.get("price_breaks_timestamp",
+                                                                     timestamp)))
         vendor_name: str = attributes_table["vendor_name"]
         vendor_part_name: str = attributes_table["vendor_part_name"]
         quantity_available: int = int(attributes_table["quantity_available"])
@@ -6429,10 +9329,637 @@ class VendorPart:
             price_breaks.append(price_break)
 
         vendor_part: VendorPart = VendorPart(actual_part, vendor_name, vendor_part_name,
-                                             quantity_available, price_breaks, timestamp)
+                                             quantity_available, price_breaks, timestamp,
+                                             price_breaks_timestamp)
         return vendor_part
 
 
+# VendorPartsCache:
+class VendorPartsCache:
+    # A *VendorPartsCache* is an embedded SQLite database that caches the *VendorPart*'s
+    # (and associated *PriceBreak*'s) for each *ActualPart*.  Each *ActualPart* is keyed by
+    # (manufacturer_name, manufacturer_part_name) and each *VendorPart* has its own row, so
+    # that reading or updating an *ActualPart* only touches the rows for that *ActualPart*.
+    # The database is run in WAL (Write Ahead Log) mode so that the small updates are cheap.
+
+    # The database schema version is kept in `PRAGMA user_version` and an older database is
+    # upgraded one step at a time by *VendorPartsCache.schema_upgrade*():
+    VENDOR_PARTS_CACHE_SCHEMA_VERSION: int = 3
+
+    # VendorPartsCache.__init__():
+    def __init__(self, database_file_name: str) -> None:
+        """ *VendorPartsCache*: Initialize *self* to use the SQLite database in
+            *database_file_name*, creating the tables if they do not already exist and
+            upgrading them if they are from an older version.
+        """
+        # Open the *connection* to *database_file_name*:
+        connection: sqlite3.Connection = sqlite3.connect(database_file_name)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+
+        # Create or upgrade the tables and indices:
+        VendorPartsCache.schema_upgrade(connection)
+
+        # Load up *vendor_parts_cache* (i.e. *self*):
+        # vendor_parts_cache: VendorPartsCache = self
+        self.connection: sqlite3.Connection = connection
+        self.database_file_name: str = database_file_name
+
+    # VendorPartsCache.__str__():
+    def __str__(self) -> str:
+        vendor_parts_cache: VendorPartsCache = self
+        database_file_name: str = "??"
+        if hasattr(vendor_parts_cache, "database_file_name"):
+            database_file_name = vendor_parts_cache.database_file_name
+        return f"VendorPartsCache('{database_file_name}')"
+
+    # VendorPartsCache.actual_part_load():
+    def actual_part_load(self, actual_part_key: Tuple[str, str]) -> Optional[ActualPart]:
+        """ *VendorPartsCache*: Return a new *ActualPart* for *actual_part_key* filled in with
+            its cached *VendorPart*'s from the *VendorPartsCache* object (i.e. *self*).  *None*
+            is returned if *actual_part_key* has never been cached.
+        """
+        # Find the row for *actual_part_key*:
+        vendor_parts_cache: VendorPartsCache = self
+        connection: sqlite3.Connection = vendor_parts_cache.connection
+        actual_part_row: Optional[Tuple[int, int]] = connection.execute(
+            "SELECT id, timestamp FROM actual_parts "
+            "WHERE manufacturer_name = ? AND manufacturer_part_name = ?",
+            actual_part_key).fetchone()
+        actual_part: Optional[ActualPart] = None
+        if actual_part_row is not None:
+            # Create the *actual_part* with an empty *vendor_parts* list:
+            actual_part_id: int = actual_part_row[0]
+            actual_part = ActualPart(actual_part_key[0], actual_part_key[1])
+            actual_part.timestamp = actual_part_row[1]
+
+            # Collect all of the *PriceBreak*'s for *actual_part* in a single query and
+            # bucket them by *vendor_part_id*:
+            price_breaks_table: Dict[int, List[PriceBreak]] = dict()
+            price_break_row: Tuple[int, int, float, str]
+            for price_break_row in connection.execute(
+              "SELECT vendor_part_id, quantity, price, currency FROM price_breaks "
+              "WHERE vendor_part_id IN (SELECT id FROM vendor_parts WHERE actual_part_id = ?)",
+              (actual_part_id,)):
+                vendor_part_id: int = price_break_row[0]
+                if vendor_part_id not in price_breaks_table:
+                    price_breaks_table[vendor_part_id] = list()
+                price_breaks_table[vendor_part_id].append(
+                    PriceBreak(price_break_row[1], price_break_row[2], price_break_row[3]))
+
+            # Now create each *VendorPart* (which appends itself to *actual_part*):
+            vendor_part_row: Tuple[int, str, str, int, int, int]
+            for vendor_part_row in connection.execute(
+              "SELECT id, vendor_name, vendor_part_name, quantity_available, timestamp, "
+              "price_breaks_timestamp FROM vendor_parts WHERE actual_part_id = ? ORDER BY id",
+              (actual_part_id,)):
+                vendor_part_id = vendor_part_row[0]
+                price_breaks: List[PriceBreak] = price_breaks_table.get(vendor_part_id, list())
+                VendorPart(actual_part, vendor_part_row[1], vendor_part_row[2],
+                           vendor_part_row[3], price_breaks, vendor_part_row[4],
+                           vendor_part_row[5])
+        return actual_part
+
+    # VendorPartsCache.actual_part_save():
+    def actual_part_save(self, actual_part: ActualPart) -> None:
+        """ *VendorPartsCache*: Save *actual_part* and its *VendorPart*'s into the
+            *VendorPartsCache* object (i.e. *self*).  Only the rows associated with
+            *actual_part* are touched.
+        """
+        # Grab some values from *vendor_parts_cache* (i.e. *self*) and *actual_part*:
+        vendor_parts_cache: VendorPartsCache = self
+        connection: sqlite3.Connection = vendor_parts_cache.connection
+        actual_part_key: Tuple[str, str] = actual_part.key
+        timestamp: int = actual_part.timestamp
+
+        # Perform all of the updates as a single transaction:
+        with connection:
+            # Insert or update the row for *actual_part* and get its *actual_part_id*:
+            actual_part_row: Optional[Tuple[int]] = connection.execute(
+                "SELECT id FROM actual_parts "
+                "WHERE manufacturer_name = ? AND manufacturer_part_name = ?",
+                actual_part_key).fetchone()
+            actual_part_id: int
+            if actual_part_row is None:
+                inserted_actual_part_id: Optional[int] = connection.execute(
+                    "INSERT INTO actual_parts "
+                    "(manufacturer_name, manufacturer_part_name, timestamp) VALUES (?, ?, ?)",
+                    (actual_part_key[0], actual_part_key[1], timestamp)).lastrowid
+                assert inserted_actual_part_id is not None
+                actual_part_id = inserted_actual_part_id
+            else:
+                actual_part_id = actual_part_row[0]
+                connection.execute("UPDATE actual_parts SET timestamp = ? WHERE id = ?",
+                                   (timestamp, actual_part_id))
+
+            # Build *previous_vendor_part_ids* which maps from a vendor key to the row id of
+            # each *VendorPart* that is currently stored for *actual_part*:
+            previous_vendor_part_ids: Dict[Tuple[str, str], int] = {
+                (vendor_name, vendor_part_name): vendor_part_id
+                for vendor_part_id, vendor_name, vendor_part_name in connection.execute(
+                    "SELECT id, vendor_name, vendor_part_name FROM vendor_parts "
+                    "WHERE actual_part_id = ?", (actual_part_id,))}
+
+            # Update or insert a row for each *vendor_part* along with its *price_breaks*.
+            # Duplicate vendor keys are ignored:
+            saved_vendor_keys: Dict[Tuple[str, str], None] = dict()
+            vendor_part: VendorPart
+            for vendor_part in actual_part.vendor_parts:
+                vendor_key: Tuple[str, str] = vendor_part.vendor_key
+                if vendor_key in saved_vendor_keys:
+                    continue
+                saved_vendor_keys[vendor_key] = None
+                vendor_part_id: int
+                if vendor_key in previous_vendor_part_ids:
+                    vendor_part_id = previous_vendor_part_ids.pop(vendor_key)
+                    connection.execute("UPDATE vendor_parts SET quantity_available = ?, "
+                                       "timestamp = ?, price_breaks_timestamp = ? WHERE id = ?",
+                                       (vendor_part.quantity_available, vendor_part.timestamp,
+                                        vendor_part.price_breaks_timestamp, vendor_part_id))
+                    connection.execute("DELETE FROM price_breaks WHERE vendor_part_id = ?",
+                                       (vendor_part_id,))
+                else:
+                    inserted_vendor_part_id: Optional[int] = connection.execute(
+                        "INSERT INTO vendor_parts (actual_part_id, vendor_name, "
+                        "vendor_part_name, quantity_available, timestamp, "
+                        "price_breaks_timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                        (actual_part_id, vendor_key[0], vendor_key[1],
+                         vendor_part.quantity_available, vendor_part.timestamp,
+                         vendor_part.price_breaks_timestamp)).lastrowid
+                    assert inserted_vendor_part_id is not None
+                    vendor_part_id = inserted_vendor_part_id
+                connection.executemany(
+                    "INSERT INTO price_breaks (vendor_part_id, quantity, price, currency) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(vendor_part_id, price_break.quantity, price_break.currency_price,
+                      price_break.currency)
+                     for price_break in vendor_part.price_breaks])
+
+            # Delete any *VendorPart* rows that are no longer associated with *actual_part*:
+            for vendor_part_id in previous_vendor_part_ids.values():
+                connection.execute("DELETE FROM price_breaks WHERE vendor_part_id = ?",
+                                   (vendor_part_id,))
+                connection.execute("DELETE FROM vendor_parts WHERE id = ?", (vendor_part_id,))
+
+    # VendorPartsCache.schema_upgrade():
+    @staticmethod
+    def schema_upgrade(connection: sqlite3.Connection) -> None:
+        """ *VendorPartsCache*: Bring the tables of the database on *connection* up to
+            *VENDOR_PARTS_CACHE_SCHEMA_VERSION* one version at a time.  Version 0 is either
+            a new database or one that was created before the version was recorded, so the
+            columns are checked before they are added.
+        """
+        schema_version: int = connection.execute("PRAGMA user_version").fetchone()[0]
+        latest_schema_version: int = VendorPartsCache.VENDOR_PARTS_CACHE_SCHEMA_VERSION
+        assert schema_version <= latest_schema_version, (
+          f"Vendor parts cache schema version {schema_version} is newer than "
+          f"{latest_schema_version}; please upgrade the BOM manager")
+        column_names: List[str]
+        with connection:
+            # Version 1: The original tables and index:
+            if schema_version < 1:
+                connection.execute("CREATE TABLE IF NOT EXISTS actual_parts ("
+                                   "id INTEGER PRIMARY KEY, "
+                                   "manufacturer_name TEXT NOT NULL, "
+                                   "manufacturer_part_name TEXT NOT NULL, "
+                                   "timestamp INTEGER NOT NULL, "
+                                   "UNIQUE (manufacturer_name, manufacturer_part_name))")
+                connection.execute("CREATE TABLE IF NOT EXISTS vendor_parts ("
+                                   "id INTEGER PRIMARY KEY, "
+                                   "actual_part_id INTEGER NOT NULL, "
+                                   "vendor_name TEXT NOT NULL, "
+                                   "vendor_part_name TEXT NOT NULL, "
+                                   "quantity_available INTEGER NOT NULL, "
+                                   "timestamp INTEGER NOT NULL, "
+                                   "UNIQUE (actual_part_id, vendor_name, vendor_part_name))")
+                connection.execute("CREATE TABLE IF NOT EXISTS price_breaks ("
+                                   "vendor_part_id INTEGER NOT NULL, "
+                                   "quantity INTEGER NOT NULL, "
+                                   "price REAL NOT NULL)")
+                connection.execute("CREATE INDEX IF NOT EXISTS price_breaks_vendor_part_id "
+                                   "ON price_breaks (vendor_part_id)")
+
+            # Version 2: The price breaks of a *VendorPart* have their own timestamp.  It
+            # starts out as the timestamp of the *VendorPart* since they were looked up together:
+            if schema_version < 2:
+                column_names = [column_row[1] for column_row in
+                                connection.execute("PRAGMA table_info(vendor_parts)")]
+                if "price_breaks_timestamp" not in column_names:
+                    connection.execute("ALTER TABLE vendor_parts ADD COLUMN "
+                                       "price_breaks_timestamp INTEGER NOT NULL DEFAULT 0")
+                    connection.execute("UPDATE vendor_parts SET price_breaks_timestamp = timestamp")
+
+            # Version 3: Each price break has a currency (the price was assumed to be USD):
+            if schema_version < 3:
+                column_names = [column_row[1] for column_row in
+                                connection.execute("PRAGMA table_info(price_breaks)")]
+                if "currency" not in column_names:
+                    connection.execute("ALTER TABLE price_breaks "
+                                       "ADD COLUMN currency TEXT NOT NULL DEFAULT 'USD'")
+
+            # Remember the new version:
+            if schema_version < latest_schema_version:
+                connection.execute(f"PRAGMA user_version = {latest_schema_version}")
+
+    # VendorPartsCache.xml_caches_import():
+    @trace(1)
+    def xml_caches_import(self, vendor_searches_root: str) -> int:
+        """ *VendorPartsCache*: Import the older per-*ChoicePart* `.xml` vendor search files
+            in *vendor_searches_root* into the *VendorPartsCache* object (i.e. *self*).
+            An *ActualPart* that is already cached is not overwritten.  The number of
+            imported *ActualPart*'s is returned.
+        """
+        vendor_parts_cache: VendorPartsCache = self
+        tracing: str = tracing_get()
+        imported_count: int = 0
+        xml_base_names: List[str] = (sorted(os.listdir(vendor_searches_root))
+                                     if os.path.isdir(vendor_searches_root) else list())
+        xml_base_name: str
+        for xml_base_name in xml_base_names:
+            if xml_base_name.endswith(".xml"):
+                # Read in and parse *xml_full_name*:
+                xml_full_name: str = os.path.join(vendor_searches_root, xml_base_name)
+                if tracing:
+                    print(f"{tracing}Importing '{xml_full_name}'")
+                xml_file: IO[str]
+                with open(xml_full_name) as xml_file:
+                    choice_part_xml_text: str = xml_file.read()
+                choice_part_tree: etree._Element = etree.fromstring(choice_part_xml_text)
+                choice_part: ChoicePart = ChoicePart.xml_parse(choice_part_tree)
+
+                # Save each *actual_part* that is not already in *vendor_parts_cache*.  The
+                # lookup *timestamp* is the oldest *VendorPart* timestamp:
+                actual_part: ActualPart
+                for actual_part in choice_part.actual_parts:
+                    if vendor_parts_cache.actual_part_load(actual_part.key) is None:
+                        vendor_parts: List[VendorPart] = actual_part.vendor_parts
+                        actual_part.timestamp = (min([vendor_part.timestamp
+                                                      for vendor_part in vendor_parts])
+                                                 if vendor_parts else 0)
+                        vendor_parts_cache.actual_part_save(actual_part)
+                        imported_count += 1
+        return imported_count
+
+
+# VendorSetOptimizer:
+class VendorSetOptimizer:
+    # A *VendorSetOptimizer* searches for the set of vendors to order from that minimizes the
+    # total order cost.  The cost of a vendor set is the cost of ordering each part from the
+    # cheapest vendor in the set, plus a fixed shipping cost for each vendor in the set, plus
+    # the amount needed to bring each vendor up to its minimum order.  The search is a depth
+    # first branch and bound over the vendors (i.e. the columns of a *CostMatrix*) where each
+    # vendor is either opened or closed.  The lower bound of a search node is the cost of
+    # ordering each part from its cheapest vendor that is not closed plus the shipping costs of
+    # the opened vendors.  A greedy solution is used as the initial upper bound.  The clock is
+    # checked at every search node (and during the greedy solution and each dual ascent), so
+    # the time limit is honored even when the bound is expensive to compute.
+    #
+    # The result is only exact when there are no vendor minimum orders.  Each part is always
+    # ordered from its cheapest vendor in the set, but with minimum orders it can be cheaper
+    # to move a part to another vendor in the set to make up a shortfall.  Such vendor sets are
+    # never considered, so with minimum orders the result is a heuristic.
+
+    # VendorSetOptimizer.__init__():
+    def __init__(self, cost_matrix: CostMatrix, excluded_vendor_names: Dict[str, None],
+                 shipping_costs: List[float], minimum_costs: List[float],
+                 time_limit: float) -> None:
+        """ *VendorSetOptimizer*: Initialize *self* to optimize the vendor set of
+            *cost_matrix* ignoring the vendors in *excluded_vendor_names*.  *shipping_costs*
+            and *minimum_costs* are indexed by *cost_matrix* column.  The search gives up after
+            *time_limit* seconds and keeps the best solution found so far.
+        """
+        # Only the columns that are not excluded are searched:
+        mask: List[bool] = cost_matrix.mask_get(excluded_vendor_names)
+
+        # Rows that can not be supplied at all are left out, since no vendor set will help:
+        rows_columns: List[List[int]] = []
+        row_costs_tables: List[Dict[int, float]] = []
+        row_columns: List[int]
+        for row, row_columns in enumerate(cost_matrix.rows_columns):
+            allowed_columns: List[int] = [column for column in row_columns if mask[column]]
+            if allowed_columns:
+                rows_columns.append(allowed_columns)
+                row_costs_tables.append({column: cost_matrix.costs[row][column]
+                                         for column in allowed_columns})
+
+        # *column_rows* lists the rows that each column can supply:
+        columns_size: int = len(cost_matrix.vendor_names)
+        column_rows: List[List[int]] = [[] for column in range(columns_size)]
+        for row, row_columns in enumerate(rows_columns):
+            column: int
+            for column in row_columns:
+                column_rows[column].append(row)
+
+        # Load up *vendor_set_optimizer* (i.e. *self*):
+        # vendor_set_optimizer: VendorSetOptimizer = self
+        self.best_cost: float = math.inf
+        self.best_opens: List[bool] = [False] * columns_size
+        self.closeds: List[bool] = [not allowed for allowed in mask]
+        self.column_rows: List[List[int]] = column_rows
+        self.columns: List[int] = [column for column in range(columns_size)
+                                   if mask[column] and column_rows[column]]
+        self.cost_matrix: CostMatrix = cost_matrix
+        self.deadline: float = time.monotonic() + time_limit
+        self.has_minimums: bool = any([minimum_cost > 0.0 for minimum_cost in minimum_costs])
+        self.is_exact: bool = False  # Set by *solve*() when the result is known to be optimal
+        self.is_timed_out: bool = False  # Set when the time limit runs out
+        self.minimum_costs: List[float] = minimum_costs
+        self.nodes_count: int = 0
+        self.opens: List[bool] = [False] * columns_size
+        self.row_costs_tables: List[Dict[int, float]] = row_costs_tables
+        self.row_indices: List[int] = [0] * len(rows_columns)  # Index of cheapest open column
+        self.rows_columns: List[List[int]] = rows_columns
+        self.rows_cost: float = sum([row_costs_table[row_columns[0]]
+                                     for row_costs_table, row_columns
+                                     in zip(row_costs_tables, rows_columns)])
+        self.shipping_costs: List[float] = shipping_costs
+
+    # VendorSetOptimizer.__str__():
+    def __str__(self) -> str:
+        vendor_set_optimizer: VendorSetOptimizer = self
+        return (f"VendorSetOptimizer(len(columns)={len(vendor_set_optimizer.columns)}, "
+                f"best_cost={vendor_set_optimizer.best_cost:.2f})")
+
+    # VendorSetOptimizer.column_close():
+    def column_close(self, column: int) -> Optional[List[Tuple[int, int]]]:
+        """ *VendorSetOptimizer*: Close *column* in the *VendorSetOptimizer* object (i.e.
+            *self*) and move each row that was using it to its next cheapest column that is not
+            closed.  Return the list of (row, previous row index) changes needed to undo this
+            with *VendorSetOptimizer.column_reopen*(), or *None* if some row has no columns left
+            (in which case nothing has been changed.)
+        """
+        vendor_set_optimizer: VendorSetOptimizer = self
+        closeds: List[bool] = vendor_set_optimizer.closeds
+        row_indices: List[int] = vendor_set_optimizer.row_indices
+        rows_columns: List[List[int]] = vendor_set_optimizer.rows_columns
+        row_costs_tables: List[Dict[int, float]] = vendor_set_optimizer.row_costs_tables
+
+        # Find the next column for each affected row before changing anything:
+        changes: List[Tuple[int, int]] = []
+        row_index_news: List[int] = []
+        row: int
+        for row in vendor_set_optimizer.column_rows[column]:
+            row_columns: List[int] = rows_columns[row]
+            row_index: int = row_indices[row]
+            if row_columns[row_index] == column:
+                row_index += 1
+                while row_index < len(row_columns) and closeds[row_columns[row_index]]:
+                    row_index += 1
+                if row_index >= len(row_columns):
+                    return None
+                changes.append((row, row_indices[row]))
+                row_index_news.append(row_index)
+
+        # Now commit the changes:
+        closeds[column] = True
+        row_index_new: int
+        for (row, row_index), row_index_new in zip(changes, row_index_news):
+            row_costs_table: Dict[int, float] = row_costs_tables[row]
+            vendor_set_optimizer.rows_cost += (row_costs_table[rows_columns[row][row_index_new]] -
+                                               row_costs_table[rows_columns[row][row_index]])
+            row_indices[row] = row_index_new
+        return changes
+
+    # VendorSetOptimizer.column_reopen():
+    def column_reopen(self, column: int, changes: List[Tuple[int, int]]) -> None:
+        """ *VendorSetOptimizer*: Undo a *VendorSetOptimizer.column_close*() of *column*
+            using the *changes* it returned.
+        """
+        vendor_set_optimizer: VendorSetOptimizer = self
+        row_indices: List[int] = vendor_set_optimizer.row_indices
+        rows_columns: List[List[int]] = vendor_set_optimizer.rows_columns
+        row_costs_tables: List[Dict[int, float]] = vendor_set_optimizer.row_costs_tables
+        vendor_set_optimizer.closeds[column] = False
+        row: int
+        row_index: int
+        for row, row_index in changes:
+            row_costs_table: Dict[int, float] = row_costs_tables[row]
+            vendor_set_optimizer.rows_cost += (row_costs_table[rows_columns[row][row_index]] -
+                                               row_costs_table[rows_columns[row][row_indices[row]]])
+            row_indices[row] = row_index
+
+    # VendorSetOptimizer.cost_get():
+    def cost_get(self, opens: List[bool]) -> float:
+        """ *VendorSetOptimizer*: Return the total cost of ordering from the vendors (i.e.
+            columns) marked in *opens* for the *VendorSetOptimizer* object (i.e. *self*), or
+            *math.inf* if some row can not be supplied by them.
+        """
+        vendor_set_optimizer: VendorSetOptimizer = self
+        vendor_totals: List[float] = [0.0] * len(opens)
+        total_cost: float = 0.0
+        row: int
+        row_columns: List[int]
+        for row, row_columns in enumerate(vendor_set_optimizer.rows_columns):
+            column: int = -1
+            for column in row_columns:
+                if opens[column]:
+                    break
+            else:
+                return math.inf
+            cost: float = vendor_set_optimizer.row_costs_tables[row][column]
+            vendor_totals[column] += cost
+            total_cost += cost
+
+        # Add in the shipping cost and any shortfall from the minimum order of each vendor:
+        index: int
+        is_open: bool
+        for index, is_open in enumerate(opens):
+            if is_open:
+                total_cost += (vendor_set_optimizer.shipping_costs[index] +
+                               max(0.0, vendor_set_optimizer.minimum_costs[index] -
+                                   vendor_totals[index]))
+        return total_cost
+
+    # VendorSetOptimizer.dual_bound_get():
+    def dual_bound_get(self) -> float:
+        """ *VendorSetOptimizer*: Return a lower bound on the rows cost plus the shipping
+            costs of the columns that are not yet opened for the current search node of the
+            *VendorSetOptimizer* object (i.e. *self*).  This is the dual ascent bound for the
+            uncapacitated facility location problem: each row value starts at its cheapest
+            cost and is raised one cost level at a time for as long as the shipping costs of
+            the columns that are at or below it can pay for the raise.  (Opened columns have
+            already paid for their shipping, so they can not pay for any raise.)
+        """
+        # Grab some values from *vendor_set_optimizer* (i.e. *self*):
+        vendor_set_optimizer: VendorSetOptimizer = self
+        closeds: List[bool] = vendor_set_optimizer.closeds
+        opens: List[bool] = vendor_set_optimizer.opens
+        row_costs_tables: List[Dict[int, float]] = vendor_set_optimizer.row_costs_tables
+        row_indices: List[int] = vendor_set_optimizer.row_indices
+        rows_columns: List[List[int]] = vendor_set_optimizer.rows_columns
+        slacks: List[float] = [0.0 if is_open else shipping_cost for is_open, shipping_cost
+                               in zip(opens, vendor_set_optimizer.shipping_costs)]
+
+        # Start each row value at its cheapest cost.  *row_ends[row]* is the index just past
+        # the columns of the row whose cost is at or below the row value:
+        row_values: List[float] = []
+        row_ends: List[int] = []
+        row: int
+        row_columns: List[int]
+        for row, row_columns in enumerate(rows_columns):
+            row_index: int = row_indices[row]
+            row_values.append(row_costs_tables[row][row_columns[row_index]])
+            row_ends.append(row_index + 1)
+
+        # Keep raising the row values until none of them can be raised any further.  Every
+        # pass leaves a valid (if weaker) bound, so the ascent stops early when out of time:
+        changed: bool = True
+        while changed and not vendor_set_optimizer.is_out_of_time():
+            changed = False
+            for row, row_columns in enumerate(rows_columns):
+                row_costs_table: Dict[int, float] = row_costs_tables[row]
+                row_value: float = row_values[row]
+
+                # Find the next cost level above *row_value* (if any):
+                row_end: int = row_ends[row]
+                while row_end < len(row_columns) and closeds[row_columns[row_end]]:
+                    row_end += 1
+                next_value: float = (row_costs_table[row_columns[row_end]]
+                                     if row_end < len(row_columns) else math.inf)
+
+                # The raise is limited by the smallest slack of the columns at or below
+                # *row_value*:
+                raise_value: float = next_value - row_value
+                column: int
+                for column in row_columns[row_indices[row]:row_ends[row]]:
+                    if not closeds[column] and slacks[column] < raise_value:
+                        raise_value = slacks[column]
+                if raise_value > 0.0:
+                    for column in row_columns[row_indices[row]:row_ends[row]]:
+                        if not closeds[column]:
+                            slacks[column] -= raise_value
+                    row_values[row] = row_value + raise_value
+                    if raise_value == next_value - row_value:
+                        row_ends[row] = row_end + 1
+                    changed = True
+        return sum(row_values)
+
+    # VendorSetOptimizer.greedy_solve():
+    def greedy_solve(self) -> None:
+        """ *VendorSetOptimizer*: Starting from every vendor, repeatedly drop the vendor that
+            lowers the total cost the most until no drop helps (or the time limit runs out.)
+            The result is stored into the best solution of the *VendorSetOptimizer* object
+            (i.e. *self*).
+        """
+        vendor_set_optimizer: VendorSetOptimizer = self
+        opens: List[bool] = [False] * len(vendor_set_optimizer.opens)
+        column: int
+        for column in vendor_set_optimizer.columns:
+            opens[column] = True
+        cost: float = vendor_set_optimizer.cost_get(opens)
+        improved: bool = True
+        while improved and not vendor_set_optimizer.is_out_of_time():
+            improved = False
+            best_column: int = -1
+            best_cost: float = cost
+            for column in vendor_set_optimizer.columns:
+                if opens[column]:
+                    opens[column] = False
+                    trial_cost: float = vendor_set_optimizer.cost_get(opens)
+                    opens[column] = True
+                    if trial_cost < best_cost:
+                        best_column = column
+                        best_cost = trial_cost
+            if best_column >= 0:
+                opens[best_column] = False
+                cost = best_cost
+                improved = True
+        vendor_set_optimizer.best_cost = cost
+        vendor_set_optimizer.best_opens = opens
+
+    # VendorSetOptimizer.is_out_of_time():
+    def is_out_of_time(self) -> bool:
+        """ *VendorSetOptimizer*: Return *True* (and remember it) once the time limit of the
+            *VendorSetOptimizer* object (i.e. *self*) has run out.
+        """
+        vendor_set_optimizer: VendorSetOptimizer = self
+        if (not vendor_set_optimizer.is_timed_out and
+           time.monotonic() > vendor_set_optimizer.deadline):
+            vendor_set_optimizer.is_timed_out = True
+        return vendor_set_optimizer.is_timed_out
+
+    # VendorSetOptimizer.search():
+    def search(self, depth: int, shipping_cost: float) -> None:
+        """ *VendorSetOptimizer*: Search all of the open/closed choices for the columns from
+            *depth* onward for the *VendorSetOptimizer* object (i.e. *self*), where
+            *shipping_cost* is the total shipping cost of the columns opened so far.
+        """
+        vendor_set_optimizer: VendorSetOptimizer = self
+
+        # Give up when out of time:
+        vendor_set_optimizer.nodes_count += 1
+        if vendor_set_optimizer.is_out_of_time():
+            return
+
+        # Prune when the lower bound is no better than the best solution so far.  The quick
+        # bound is tried before the more expensive dual ascent bound:
+        best_cost: float = vendor_set_optimizer.best_cost
+        if (vendor_set_optimizer.rows_cost + shipping_cost >= best_cost or
+           vendor_set_optimizer.dual_bound_get() + shipping_cost >= best_cost or
+           vendor_set_optimizer.is_timed_out):
+            return
+
+        columns: List[int] = vendor_set_optimizer.columns
+        if depth >= len(columns):
+            # Every column is decided, so the open columns are a complete solution:
+            opens: List[bool] = vendor_set_optimizer.opens
+            cost: float = vendor_set_optimizer.cost_get(opens)
+            if cost < vendor_set_optimizer.best_cost:
+                vendor_set_optimizer.best_cost = cost
+                vendor_set_optimizer.best_opens = list(opens)
+        else:
+            # Try closing *column* first.  When there are no minimum orders and closing
+            # *column* costs at least its shipping cost, opening *column* is never worse
+            # (the rows can only get more expensive as more columns are closed), so the
+            # closed branch is skipped:
+            column: int = columns[depth]
+            column_shipping_cost: float = vendor_set_optimizer.shipping_costs[column]
+            rows_cost: float = vendor_set_optimizer.rows_cost
+            changes: Optional[List[Tuple[int, int]]] = vendor_set_optimizer.column_close(column)
+            if changes is not None:
+                if (vendor_set_optimizer.has_minimums or
+                   vendor_set_optimizer.rows_cost - rows_cost < column_shipping_cost):
+                    vendor_set_optimizer.search(depth + 1, shipping_cost)
+                vendor_set_optimizer.column_reopen(column, changes)
+
+            # Now try opening *column*:
+            vendor_set_optimizer.opens[column] = True
+            vendor_set_optimizer.search(depth + 1, shipping_cost + column_shipping_cost)
+            vendor_set_optimizer.opens[column] = False
+
+    # VendorSetOptimizer.solve():
+    def solve(self) -> List[str]:
+        """ *VendorSetOptimizer*: Return the vendor names of the best vendor set found for
+            the *VendorSetOptimizer* object (i.e. *self*).  *best_cost* is the cost of the
+            vendor set and *is_exact* is *True* if the search finished within the time limit
+            and there are no vendor minimum orders (see *VendorSetOptimizer*.)
+        """
+        vendor_set_optimizer: VendorSetOptimizer = self
+        vendor_set_optimizer.greedy_solve()
+
+        # Search the most valuable columns (i.e. the ones that would cost the most to lose)
+        # first so that good solutions are found early and the pruning works well:
+        cost_matrix: CostMatrix = vendor_set_optimizer.cost_matrix
+        rows_columns: List[List[int]] = vendor_set_optimizer.rows_columns
+        row_costs_tables: List[Dict[int, float]] = vendor_set_optimizer.row_costs_tables
+        column_values: List[float] = [0.0] * len(cost_matrix.vendor_names)
+        row: int
+        row_columns: List[int]
+        for row, row_columns in enumerate(rows_columns):
+            column_values[row_columns[0]] += (
+              row_costs_tables[row][row_columns[1]] - row_costs_tables[row][row_columns[0]]
+              if len(row_columns) >= 2 else math.inf)
+        vendor_set_optimizer.columns.sort(key=lambda column: -column_values[column])
+        vendor_set_optimizer.search(0, 0.0)
+        vendor_set_optimizer.is_exact = (not vendor_set_optimizer.is_timed_out and
+                                         not vendor_set_optimizer.has_minimums)
+
+        # Return the vendor names of the *best_opens* columns:
+        vendor_names: List[str] = cost_matrix.vendor_names
+        return [vendor_names[column] for column, is_open
+                in enumerate(vendor_set_optimizer.best_opens) if is_open]
+
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,82 @@
+# # BOM Manager Offer Selection Benchmark
+#
+# This script times *VendorPart.offer_get*() and *ChoicePart.offers_get*() on the random
+# stand-in *ChoicePart*'s that the tests use (see *stand_ins.choice_parts_create*()).
+# It is not a test (pytest does not collect it); run it by hand before and after changing the
+# offer selection code:
+#
+#        python tests/benchmark_offers.py [--parts N] [--repeat N]
+#
+# The "cold" timings include building the per *VendorPart* price breaks index (or the
+# *ChoicePart* offers list) and the "warm" timings reuse the cached values.
+
+from argparse import ArgumentParser
+from bom_manager.bom import ChoicePart, VendorPart
+from stand_ins import choice_parts_create
+import timeit
+from typing import Callable, List
+
+
+# timing_print():
+def timing_print(label: str, function: Callable[[], None], calls: int, repeat: int) -> None:
+    """ Print the best time per call of *function* (which makes *calls* calls) over *repeat*
+        runs.
+    """
+    best: float = min(timeit.repeat(function, number=1, repeat=repeat))
+    print(f"{label:<40} {best / calls * 1e6:8.3f} usec/call")
+
+
+# main():
+def main() -> None:
+    # Parse the command line:
+    parser: ArgumentParser = ArgumentParser(description="Time the offer selection code.")
+    parser.add_argument("--parts", type=int, default=500, help="Number of ChoiceParts")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timing runs")
+    parsed_arguments = parser.parse_args()
+    parts_count: int = parsed_arguments.parts
+    repeat: int = parsed_arguments.repeat
+
+    # Build the parts and grab all of their *VendorPart*'s:
+    choice_parts: List[ChoicePart] = choice_parts_create(parts_count)
+    vendor_parts: List[VendorPart] = [vendor_part
+                                      for choice_part in choice_parts
+                                      for actual_part in choice_part.actual_parts
+                                      for vendor_part in actual_part.vendor_parts]
+    required_quantities: List[int] = [1, 7, 30, 120, 999]
+
+    # VendorPart.offer_get() with the price breaks index rebuilt on every call:
+    def offer_get_cold() -> None:
+        for vendor_part in vendor_parts:
+            vendor_part.price_breaks_index = None
+            vendor_part.offer_get(30)
+
+    # VendorPart.offer_get() with the price breaks index already built:
+    def offer_get_warm() -> None:
+        for required_quantity in required_quantities:
+            for vendor_part in vendor_parts:
+                vendor_part.offer_get(required_quantity)
+
+    # ChoicePart.offers_get() with a different quantity each time (so nothing is cached):
+    def offers_get_cold() -> None:
+        for required_quantity in required_quantities:
+            for choice_part in choice_parts:
+                choice_part.offers_get(required_quantity)
+
+    # ChoicePart.offers_get() with the same quantity each time (so the offers are cached):
+    def offers_get_warm() -> None:
+        for choice_part in choice_parts:
+            choice_part.offers_get(30)
+
+    print(f"{parts_count} ChoiceParts, {len(vendor_parts)} VendorParts")
+    offers_get_warm()
+    timing_print("VendorPart.offer_get() cold index", offer_get_cold, len(vendor_parts), repeat)
+    timing_print("VendorPart.offer_get() warm index", offer_get_warm,
+                 len(vendor_parts) * len(required_quantities), repeat)
+    timing_print("ChoicePart.offers_get() uncached", offers_get_cold,
+                 len(choice_parts) * len(required_quantities), repeat)
+    offers_get_warm()
+    timing_print("ChoicePart.offers_get() cached", offers_get_warm, len(choice_parts), repeat)
+
+
+if __name__ == "__main__":
+    main()
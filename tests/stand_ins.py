@@ -0,0 +1,72 @@
+# # BOM Manager Test Stand-Ins
+#
+# These helpers build stand-in *Order*'s, *Project*'s, and *ChoicePart*'s for the tests (and
+# the benchmarks) without reading any CAD files or doing any vendor lookups.  They are imported
+# by the tests directly (pytest does not collect this module.)
+
+from bom_manager.bom import (ActualPart, ChoicePart, Order, PosePart, PriceBreak, Project,
+                             VendorPart)
+import random
+from typing import List
+
+VENDOR_NAMES: List[str] = ["Arrow", "Digi-Key", "LCSC", "Mouser", "Newark"]
+
+
+# choice_parts_create():
+def choice_parts_create(parts_count: int, seed: int = 3,
+                        vendor_names: List[str] = VENDOR_NAMES) -> List[ChoicePart]:
+    """ Return *parts_count* *ChoicePart*'s with random (but repeatable for *seed*) counts,
+        stock, and prices.  Each *ChoicePart* is on its own stand-in *Project* with 1 to 20
+        boards and has 1 to 3 *ActualPart*'s that are each sold by 0 to 4 of *vendor_names*.
+        The prices are powers of 2 (so the cost sums are exact) and equal offers from different
+        vendors are common.
+    """
+    randomizer: random.Random = random.Random(seed)
+    choice_parts: List[ChoicePart] = []
+    part_index: int
+    for part_index in range(parts_count):
+        # Give each *choice_part* a count of 1 to 40 by placing it on a stand-in *Project*:
+        choice_part: ChoicePart = ChoicePart(f"C{part_index};0603", [], [])
+        project: Project = project_create(f"P{part_index}", randomizer.randint(1, 20))
+        reference: str
+        for reference in ("C1", "C2")[:randomizer.randint(1, 2)]:
+            choice_part.pose_part_append(PosePart(project, choice_part, reference, ""))
+
+        # Each *actual_part* is sold by a random subset of the vendors:
+        actual_part_index: int
+        for actual_part_index in range(randomizer.randint(1, 3)):
+            actual_part: ActualPart = ActualPart("Maker", f"MPN{part_index}-{actual_part_index}")
+            vendor_name: str
+            for vendor_name in randomizer.sample(vendor_names, randomizer.randint(0, 4)):
+                price: float = randomizer.choice([0.125, 0.25, 0.5])
+                price_breaks: List[PriceBreak] = [PriceBreak(1, price), PriceBreak(25, price / 2),
+                                                  PriceBreak(100, price / 4)]
+                VendorPart(actual_part, vendor_name, f"{vendor_name}-{actual_part.key[1]}",
+                           randomizer.choice([0, 10, 30, 1000]), price_breaks)
+            choice_part.actual_parts.append(actual_part)
+        choice_parts.append(choice_part)
+    return choice_parts
+
+
+# order_create():
+def order_create() -> Order:
+    """ Return a stand-in *Order* that only supports selecting vendors (i.e.
+        *Order.cost_matrix_get*() and the vendor reductions.)
+    """
+    order: Order = Order.__new__(Order)
+    order.cost_matrix = None
+    return order
+
+
+# project_create():
+def project_create(name: str, count: int) -> Project:
+    """ Return a stand-in *Project* named *name* with *count* boards (no CAD file is read.) """
+    project: Project = Project.__new__(Project)
+    project.name = name
+    project.count = count
+    project.all_pose_parts = []
+    project.installed_pose_parts = []
+    project.uninstalled_pose_parts = []
+    project.pose_part_pairs = {True: [], False: []}
+    project.pose_parts_table = {}
+    return project
@@ -0,0 +1,27 @@
+# # BOM Manager *ChoicePart* Tests
+#
+# These tests check that the count cached by *ChoicePart.count_get*() is recomputed when
+# anything that it depends on changes.
+
+from bom_manager.bom import ChoicePart, FractionalPart, PosePart, Project
+from stand_ins import project_create
+
+
+# test_count_fraction_change():
+def test_count_fraction_change() -> None:
+    # Each board needs 1 pin from a 4 pin header strip, so 8 boards need 2 strips:
+    project: Project = project_create("Board", 8)
+    choice_part: ChoicePart = ChoicePart("STRIP;1x4", [], [])
+    fractional_part: FractionalPart = FractionalPart("HEADER;1x1", [project], "1x1",
+                                                     choice_part, 1, 4, "Header")
+    fractional_part.choice_parts()
+    choice_part.pose_part_append(PosePart(project, fractional_part, "J1", ""))
+    assert choice_part.count_get() == 2
+
+    # Needing 2 of the 4 pins per board doubles the count:
+    fractional_part.numerator = 2
+    assert choice_part.count_get() == choice_part.count_compute() == 4
+
+    # And strips of 8 pins halve it again:
+    fractional_part.denominator = 8
+    assert choice_part.count_get() == choice_part.count_compute() == 2
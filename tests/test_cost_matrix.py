@@ -0,0 +1,83 @@
+# # BOM Manager *CostMatrix* Tests
+#
+# These tests check that the selections made by a *CostMatrix* (as returned by
+# *Order.cost_matrix_get*()) are exactly the ones that *ChoicePart.select*() makes, for every
+# set of excluded vendors, including ties between equal offers and parts that no allowed vendor
+# can supply.
+
+from bom_manager.bom import ChoicePart, CostMatrix, Order, VendorPart
+import itertools
+import math
+from stand_ins import choice_parts_create, order_create, VENDOR_NAMES
+from typing import Dict, List, Optional, Tuple
+
+
+# choice_parts_selections_get():
+def choice_parts_selections_get(choice_parts: List[ChoicePart]
+                                ) -> List[Tuple[Optional[VendorPart], int, float, int]]:
+    """ Return the selection stored in each of *choice_parts* and then clear it. """
+    selections: List[Tuple[Optional[VendorPart], int, float, int]] = []
+    choice_part: ChoicePart
+    for choice_part in choice_parts:
+        selections.append((choice_part.selected_vendor_part, choice_part.selected_order_quantity,
+                           choice_part.selected_total_cost, choice_part.selected_price_break_index))
+        choice_part.selected_vendor_part = None
+        choice_part.selected_order_quantity = -1
+        choice_part.selected_total_cost = 0.0
+        choice_part.selected_price_break_index = -1
+    return selections
+
+
+# test_selections_match():
+def test_selections_match() -> None:
+    # Compare the *CostMatrix* selections with *ChoicePart.select*() for every vendor subset:
+    choice_parts: List[ChoicePart] = choice_parts_create(60)
+    cost_matrix: CostMatrix = order_create().cost_matrix_get(choice_parts)
+    excluded_count: int
+    for excluded_count in range(len(VENDOR_NAMES) + 1):
+        excluded_names: Tuple[str, ...]
+        for excluded_names in itertools.combinations(VENDOR_NAMES, excluded_count):
+            excluded_vendor_names: Dict[str, None] = {vendor_name: None
+                                                      for vendor_name in excluded_names}
+            missing_parts: int = sum([choice_part.select(excluded_vendor_names)
+                                      for choice_part in choice_parts])
+            select_selections: List[Tuple[Optional[VendorPart], int, float, int]] = \
+                choice_parts_selections_get(choice_parts)
+
+            selections: List[int] = cost_matrix.selections_get(
+              cost_matrix.mask_get(excluded_vendor_names))
+            cost_matrix.selections_apply(selections)
+            matrix_selections: List[Tuple[Optional[VendorPart], int, float, int]] = \
+                choice_parts_selections_get(choice_parts)
+
+            assert matrix_selections == select_selections, excluded_names
+            assert selections.count(-1) == missing_parts
+
+    # Make sure that the random parts really include ties between vendors:
+    finite_costs_lists: List[List[float]] = [[cost for cost in row_costs if cost < math.inf]
+                                             for row_costs in cost_matrix.costs]
+    assert any([len(set(finite_costs)) < len(finite_costs)
+                for finite_costs in finite_costs_lists])
+
+
+# test_cost_matrix_get():
+def test_cost_matrix_get() -> None:
+    # *Order.cost_matrix_get*() reuses its *CostMatrix* until an offer changes:
+    choice_parts: List[ChoicePart] = choice_parts_create(10)
+    order: Order = order_create()
+    cost_matrix: CostMatrix = order.cost_matrix_get(choice_parts)
+    assert order.cost_matrix_get(choice_parts) is cost_matrix
+
+    # Doubling the boards of the first project changes the counts (and the offers):
+    choice_parts[0].pose_parts[0].project.count *= 2
+    new_cost_matrix: CostMatrix = order.cost_matrix_get(choice_parts)
+    assert new_cost_matrix is not cost_matrix
+
+    # The rebuilt *CostMatrix* still matches *ChoicePart.select*():
+    missing_parts: int = sum([choice_part.select(dict()) for choice_part in choice_parts])
+    select_selections: List[Tuple[Optional[VendorPart], int, float, int]] = \
+        choice_parts_selections_get(choice_parts)
+    selections: List[int] = new_cost_matrix.selections_get(new_cost_matrix.mask_get(dict()))
+    new_cost_matrix.selections_apply(selections)
+    assert choice_parts_selections_get(choice_parts) == select_selections
+    assert selections.count(-1) == missing_parts
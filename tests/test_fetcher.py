@@ -0,0 +1,211 @@
+# # BOM Manager *Fetcher* Tests
+#
+# These tests run a *Fetcher* against a small stand-in web server on 127.0.0.1 to check the
+# keep-alive connection reuse, the disk cache, the coalescing of identical in-flight requests,
+# redirects, gzip decoding, and that a connection that fails mid response is not reused.
+
+from bom_manager.bom import Fetcher
+import concurrent.futures
+import gzip
+import http.client
+import http.server
+import threading
+import time
+import urllib.parse
+from typing import Dict, Iterator, List, Set, Tuple
+import pytest  # type: ignore
+
+
+# StandInHandler:
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    # A *StandInHandler* answers a few fixed paths and records each request path and the client
+    # port that it arrived on (one client port per connection.)
+
+    protocol_version: str = "HTTP/1.1"
+
+    # StandInHandler.do_GET():
+    def do_GET(self) -> None:
+        stand_in_handler: StandInHandler = self
+        stand_in_server: StandInServer = stand_in_handler.server  # type: ignore
+        path: str = stand_in_handler.path
+        with stand_in_server.lock:
+            stand_in_server.paths.append(path)
+            stand_in_server.client_ports.add(stand_in_handler.client_address[1])
+        if path == "/page":
+            stand_in_handler.body_send(200, b"page body", dict())
+        elif path == "/gzip":
+            stand_in_handler.body_send(200, gzip.compress(b"gzip body"),
+                                       {"Content-Encoding": "gzip"})
+        elif path == "/redirect":
+            stand_in_handler.body_send(302, b"", {"Location": "/page"})
+        elif path == "/slow":
+            time.sleep(0.3)
+            stand_in_handler.body_send(200, b"slow body", dict())
+        elif path == "/truncated":
+            # Promise more bytes than are sent and then hang up:
+            stand_in_handler.send_response(200)
+            stand_in_handler.send_header("Content-Length", "100")
+            stand_in_handler.end_headers()
+            stand_in_handler.wfile.write(b"short")
+            stand_in_handler.close_connection = True
+        else:
+            stand_in_handler.body_send(404, b"not found", dict())
+
+    # StandInHandler.body_send():
+    def body_send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        stand_in_handler: StandInHandler = self
+        stand_in_handler.send_response(status)
+        stand_in_handler.send_header("Content-Length", str(len(body)))
+        header_name: str
+        header_value: str
+        for header_name, header_value in headers.items():
+            stand_in_handler.send_header(header_name, header_value)
+        stand_in_handler.end_headers()
+        stand_in_handler.wfile.write(body)
+
+    # StandInHandler.log_message():
+    def log_message(self, format: str, *arguments) -> None:
+        pass  # Keep the test output quiet.
+
+
+# StandInServer:
+class StandInServer(http.server.ThreadingHTTPServer):
+    # A *StandInServer* serves *StandInHandler* on a free port of 127.0.0.1.
+
+    daemon_threads: bool = True
+
+    # StandInServer.__init__():
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.client_ports: Set[int] = set()
+        self.lock: threading.Lock = threading.Lock()
+        self.paths: List[str] = []
+
+    # StandInServer.url_get():
+    def url_get(self, path: str) -> str:
+        stand_in_server: StandInServer = self
+        host: str
+        port: int
+        host, port = stand_in_server.server_address[:2]  # type: ignore
+        return f"http://{host}:{port}{path}"
+
+
+# RecordingFetcher:
+class RecordingFetcher(Fetcher):
+    # A *RecordingFetcher* remembers every connection that it hands out.
+
+    # RecordingFetcher.__init__():
+    def __init__(self, cache_root: str) -> None:
+        super().__init__(cache_root)
+        self.connections: List[http.client.HTTPConnection] = []
+
+    # RecordingFetcher.connection_get():
+    def connection_get(self, scheme: str, host: str) -> Tuple[http.client.HTTPConnection, bool]:
+        recording_fetcher: RecordingFetcher = self
+        connection: http.client.HTTPConnection
+        reused: bool
+        connection, reused = super().connection_get(scheme, host)
+        recording_fetcher.connections.append(connection)
+        return connection, reused
+
+
+# stand_in_server():
+@pytest.fixture
+def stand_in_server() -> Iterator[StandInServer]:
+    stand_in_server: StandInServer = StandInServer()
+    thread: threading.Thread = threading.Thread(target=stand_in_server.serve_forever, daemon=True)
+    thread.start()
+    yield stand_in_server
+    stand_in_server.shutdown()
+    stand_in_server.server_close()
+
+
+# test_cache():
+def test_cache(stand_in_server, tmp_path) -> None:
+    # The second fetch is answered from the disk cache and a *ttl* of 0 skips the cache:
+    fetcher: Fetcher = Fetcher(str(tmp_path / "cache"))
+    url: str = stand_in_server.url_get("/page")
+    assert fetcher.fetch(url) == (200, b"page body")
+    assert fetcher.fetch(url) == (200, b"page body")
+    assert stand_in_server.paths == ["/page"]
+    assert fetcher.metrics_table[urllib.parse.urlsplit(url).netloc]["cache_hits"] == 1.0
+    assert fetcher.fetch(url, ttl=0.0) == (200, b"page body")
+    assert stand_in_server.paths == ["/page", "/page"]
+
+    # A new *Fetcher* with the same cache root also uses the cache, but not when it is stale:
+    assert Fetcher(str(tmp_path / "cache")).fetch(url) == (200, b"page body")
+    assert len(stand_in_server.paths) == 2
+    assert Fetcher(str(tmp_path / "cache"), ttl=1e-6).fetch(url) == (200, b"page body")
+    assert len(stand_in_server.paths) == 3
+
+    # Failed responses are not cached:
+    missing_url: str = stand_in_server.url_get("/missing")
+    assert fetcher.fetch(missing_url)[0] == 404
+    assert fetcher.fetch(missing_url)[0] == 404
+    assert stand_in_server.paths[-2:] == ["/missing", "/missing"]
+
+
+# test_coalescing():
+def test_coalescing(stand_in_server, tmp_path) -> None:
+    # Four identical requests that are in flight together share one server request:
+    fetcher: Fetcher = Fetcher(str(tmp_path / "cache"))
+    url: str = stand_in_server.url_get("/slow")
+    executor: concurrent.futures.ThreadPoolExecutor
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        responses: List[Tuple[int, bytes]] = list(
+          executor.map(lambda index: fetcher.fetch(url, ttl=0.0), range(4)))
+    assert responses == [(200, b"slow body")] * 4
+    assert stand_in_server.paths == ["/slow"]
+    assert sum([metrics.get("coalesced", 0.0)
+                for metrics in fetcher.metrics_table.values()]) == 3.0
+
+
+# test_gzip():
+def test_gzip(stand_in_server, tmp_path) -> None:
+    # A gzip encoded body is decoded:
+    fetcher: Fetcher = Fetcher(str(tmp_path / "cache"))
+    assert fetcher.fetch(stand_in_server.url_get("/gzip"), ttl=0.0) == (200, b"gzip body")
+
+
+# test_keep_alive():
+def test_keep_alive(stand_in_server, tmp_path) -> None:
+    # Sequential requests to the same host reuse a single keep-alive connection:
+    fetcher: Fetcher = Fetcher(str(tmp_path / "cache"))
+    path: str
+    for path in ("/page", "/gzip", "/page", "/missing"):
+        fetcher.fetch(stand_in_server.url_get(path), ttl=0.0)
+    assert len(stand_in_server.paths) == 4
+    assert len(stand_in_server.client_ports) == 1
+    connections: List[http.client.HTTPConnection] = [
+      connection
+      for connections in fetcher.connections_table.values() for connection in connections]
+    assert len(connections) == 1
+
+
+# test_redirect():
+def test_redirect(stand_in_server, tmp_path) -> None:
+    # A redirect is followed (over the same connection) and the final body is cached under
+    # the original URL:
+    fetcher: Fetcher = Fetcher(str(tmp_path / "cache"))
+    url: str = stand_in_server.url_get("/redirect")
+    assert fetcher.fetch(url) == (200, b"page body")
+    assert stand_in_server.paths == ["/redirect", "/page"]
+    assert len(stand_in_server.client_ports) == 1
+    assert fetcher.fetch(url) == (200, b"page body")
+    assert len(stand_in_server.paths) == 2
+
+
+# test_truncated():
+def test_truncated(stand_in_server, tmp_path) -> None:
+    # A response that is cut short raises and its connection is closed rather than pooled:
+    fetcher: RecordingFetcher = RecordingFetcher(str(tmp_path / "cache"))
+    with pytest.raises(http.client.IncompleteRead):
+        fetcher.fetch(stand_in_server.url_get("/truncated"), ttl=0.0)
+    assert len(fetcher.connections) == 1
+    assert fetcher.connections[0].sock is None
+    assert all([not connections for connections in fetcher.connections_table.values()])
+    assert fetcher.in_flight_table == dict()
+
+    # The next request opens a fresh connection and succeeds:
+    assert fetcher.fetch(stand_in_server.url_get("/page"), ttl=0.0) == (200, b"page body")
+    assert len(stand_in_server.client_ports) == 2
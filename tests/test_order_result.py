@@ -0,0 +1,31 @@
+# # BOM Manager *OrderResult* Tests
+#
+# These tests check that creating an *OrderResult* prints nothing (an *Order* can create more
+# than one of them per run) and that *Order.summary_print*() announces each part without a
+# vendor exactly once.
+
+from bom_manager.bom import ChoicePart, Order, OrderResult
+from stand_ins import choice_parts_create, order_create
+from typing import Dict, List
+
+
+# test_missing_parts_announced_once():
+def test_missing_parts_announced_once(capsys) -> None:
+    # Build two *OrderResult*'s from the same parts (just like `--revalidate` does):
+    choice_parts: List[ChoicePart] = choice_parts_create(30)
+    order: Order = order_create()
+    excluded_vendor_names: Dict[str, None] = {}
+    order_result: OrderResult = OrderResult(order, choice_parts, excluded_vendor_names)
+    order_result = OrderResult(order, choice_parts, excluded_vendor_names)
+    assert capsys.readouterr().out == ""
+
+    # Only the summary announces the missing parts, once each:
+    missing_part_names: List[str] = [selection[0].name for selection in order_result.selections
+                                     if selection[2] is None]
+    assert 0 < len(missing_part_names) == order_result.missing_parts
+    order.summary_print(order_result)
+    output: str = capsys.readouterr().out
+    missing_part_name: str
+    for missing_part_name in missing_part_names:
+        assert output.count(f"No vendor parts found for Part '{missing_part_name}'\n") == 1
+    assert output.count("No vendor parts found") == len(missing_part_names)
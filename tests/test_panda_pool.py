@@ -0,0 +1,356 @@
+# # BOM Manager *PandaPool* Tests
+#
+# These tests drive the *PandaPool* with fake *Panda*'s (no web traffic) to check the result
+# ordering, the per *Panda* concurrency limits, the request rate interval, the timeouts, and
+# the *Cassette* replays.
+
+from bom_manager.bom import (ActualPart, Cassette, CassettePanda, Panda, PandaPool, PriceBreak,
+                             VendorPart)
+import pytest
+import threading
+import time
+from typing import IO, List, Tuple
+
+
+# FakePanda:
+class FakePanda(Panda):
+    # A *FakePanda* answers each lookup with a single *VendorPart* from *vendor_name* after
+    # sleeping for *delay* seconds.  It records the number of lookups that are active at the
+    # same time and the time that each lookup starts.
+
+    # FakePanda.__init__():
+    def __init__(self, name: str, vendor_name: str, delay: float = 0.0) -> None:
+        super().__init__(name)
+        self.active: int = 0
+        self.active_maximum: int = 0
+        self.delay: float = delay
+        self.lock: threading.Lock = threading.Lock()
+        self.start_times: List[float] = []
+        self.vendor_name: str = vendor_name
+
+    # FakePanda.vendor_parts_lookup():
+    def vendor_parts_lookup(self, actual_part, part_name) -> List[VendorPart]:
+        fake_panda: FakePanda = self
+        with fake_panda.lock:
+            fake_panda.start_times.append(time.monotonic())
+            fake_panda.active += 1
+            fake_panda.active_maximum = max(fake_panda.active_maximum, fake_panda.active)
+        time.sleep(fake_panda.delay)
+        with fake_panda.lock:
+            fake_panda.active -= 1
+        vendor_part: VendorPart = VendorPart(actual_part, fake_panda.vendor_name,
+                                             f"{fake_panda.vendor_name}-{part_name}", 100,
+                                             [PriceBreak(1, 1.00)])
+        return [vendor_part]
+
+
+# BatchPanda:
+class BatchPanda(Panda):
+    # A *BatchPanda* prices up to *batch_size* parts per request.  When *is_short* is *True*,
+    # it leaves the last part out of its answer (which breaks the batch contract.)
+
+    # BatchPanda.__init__():
+    def __init__(self, name: str, batch_size: int, is_short: bool = False) -> None:
+        super().__init__(name)
+        self.batch_size: int = batch_size
+        self.batch_sizes: List[int] = []
+        self.failures_maximum: int = 100
+        self.is_short: bool = is_short
+
+    # BatchPanda.vendor_parts_lookup():
+    def vendor_parts_lookup(self, actual_part, part_name) -> List[VendorPart]:
+        batch_panda: BatchPanda = self
+        return batch_panda.vendor_parts_lookup_batch([actual_part], [part_name])[0]
+
+    # BatchPanda.vendor_parts_lookup_batch():
+    def vendor_parts_lookup_batch(self, actual_parts: List[ActualPart],
+                                  part_names: List[str]) -> List[List[VendorPart]]:
+        batch_panda: BatchPanda = self
+        batch_panda.batch_sizes.append(len(actual_parts))
+        vendor_parts_lists: List[List[VendorPart]] = [
+          [VendorPart(actual_part, "Batch Vendor", f"B-{part_name}", 10, [PriceBreak(1, 2.00)])]
+          for actual_part, part_name in zip(actual_parts, part_names)]
+        return vendor_parts_lists[:-1] if batch_panda.is_short else vendor_parts_lists
+
+
+# HungPanda:
+class HungPanda(Panda):
+    # A *HungPanda* never answers until *release_event* is set.
+
+    # HungPanda.__init__():
+    def __init__(self, name: str, timeout: float) -> None:
+        super().__init__(name)
+        self.release_event: threading.Event = threading.Event()
+        self.timeout: float = timeout
+        self.failures_maximum: int = 100
+
+    # HungPanda.vendor_parts_lookup():
+    def vendor_parts_lookup(self, actual_part, part_name) -> List[VendorPart]:
+        hung_panda: HungPanda = self
+        hung_panda.release_event.wait()
+        return []
+
+
+# StandInCollection:
+class StandInCollection:
+    # A *StandInCollection* has just enough of a *Collection* for a *Cassette* to record its
+    # `.csv` fetches.  Each fetch writes a `.csv` file that names *search_url*.
+
+    # StandInCollection.__init__():
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+
+    # StandInCollection.csv_fetch():
+    def csv_fetch(self, search_url: str, csv_file_name: str) -> None:
+        csv_file: IO[str]
+        with open(csv_file_name, "w") as csv_file:
+            csv_file.write(f"Manufacturer,Manufacturer Part Number\nMaker,{search_url}\n")
+
+
+# actual_parts_create():
+def actual_parts_create(size: int) -> Tuple[List[ActualPart], List[str]]:
+    actual_parts: List[ActualPart] = [ActualPart("Maker", f"MPN{index}")
+                                      for index in range(size)]
+    part_names: List[str] = [f"P{index}" for index in range(size)]
+    return actual_parts, part_names
+
+
+# test_batches():
+def test_batches() -> None:
+    # Seven parts are looked up in batches of 3, 3, and 1 and the returned lists are used:
+    batch_panda: BatchPanda = BatchPanda("Batch", 3)
+    panda_pool: PandaPool = PandaPool([batch_panda], 4)
+    actual_parts, part_names = actual_parts_create(7)
+    vendor_parts_lists, faileds = panda_pool.vendor_parts_lookup(
+      actual_parts, part_names, [[0]] * len(actual_parts))
+    assert sorted(batch_panda.batch_sizes) == [1, 3, 3]
+    assert [[vendor_part.vendor_part_name for vendor_part in vendor_parts]
+            for vendor_parts in vendor_parts_lists] == [[f"B-P{index}"] for index in range(7)]
+    assert faileds == [False] * 7
+
+
+# test_batches_short():
+def test_batches_short() -> None:
+    # A batch answer with the wrong number of lists is a failed lookup for the whole batch:
+    batch_panda: BatchPanda = BatchPanda("Short", 2, is_short=True)
+    panda_pool: PandaPool = PandaPool([batch_panda], 4)
+    actual_parts, part_names = actual_parts_create(4)
+    vendor_parts_lists, faileds = panda_pool.vendor_parts_lookup(
+      actual_parts, part_names, [[0]] * len(actual_parts))
+    assert vendor_parts_lists == [[], [], [], []]
+    assert faileds == [True] * 4
+    assert panda_pool.panda_failures == [2]
+
+
+# test_cassette_csv_replay():
+def test_cassette_csv_replay(tmp_path, capsys) -> None:
+    # Record one `.csv` fetch:
+    cassette_file_name: str = str(tmp_path / "cassette.xml.gz")
+    record_cassette: Cassette = Cassette(cassette_file_name, False)
+    collection: StandInCollection = StandInCollection("Parts")
+    record_cassette.csv_fetch(collection, "MPN1", str(tmp_path / "recorded.csv"))
+    record_cassette.save()
+
+    # Replaying it writes the recorded contents, but a `.csv` fetch that was never recorded
+    # fails (without writing anything) and is reported at the end:
+    replay_cassette: Cassette = Cassette(cassette_file_name, True)
+    replay_cassette.csv_fetch(collection, "MPN1", str(tmp_path / "replayed.csv"))
+    assert (tmp_path / "replayed.csv").read_text() == (tmp_path / "recorded.csv").read_text()
+    with pytest.raises(LookupError):
+        replay_cassette.csv_fetch(collection, "MPN2", str(tmp_path / "missing.csv"))
+    assert not (tmp_path / "missing.csv").exists()
+    assert replay_cassette.missing_csv_keys == [("Parts", "MPN2")]
+    capsys.readouterr()
+    replay_cassette.misses_print()
+    output: str = capsys.readouterr().out
+    assert "1 csv fetches were not recorded" in output
+    assert "  Parts: MPN2\n" in output
+
+
+# test_cassette_replay():
+def test_cassette_replay(tmp_path, capsys) -> None:
+    # Record the lookups of two parts:
+    cassette_file_name: str = str(tmp_path / "cassette.xml.gz")
+    record_cassette: Cassette = Cassette(cassette_file_name, False)
+    panda_pool: PandaPool = PandaPool(
+      [CassettePanda(FakePanda("Fake", "Fake Vendor"), record_cassette)], 4)
+    actual_parts, part_names = actual_parts_create(2)
+    panda_pool.vendor_parts_lookup(actual_parts, part_names, [[0]] * len(actual_parts))
+    record_cassette.save()
+
+    # Replaying a third part that was never recorded is just a failed lookup:
+    replay_cassette: Cassette = Cassette(cassette_file_name, True)
+    replay_panda: FakePanda = FakePanda("Fake", "Fake Vendor")
+    panda_pool = PandaPool([CassettePanda(replay_panda, replay_cassette)], 4)
+    actual_parts, part_names = actual_parts_create(3)
+    vendor_parts_lists, faileds = panda_pool.vendor_parts_lookup(
+      actual_parts, part_names, [[0]] * len(actual_parts))
+    assert replay_panda.start_times == []
+    assert faileds == [False, False, True]
+    assert [[vendor_part.vendor_part_name for vendor_part in vendor_parts]
+            for vendor_parts in vendor_parts_lists] == [["Fake Vendor-P0"], ["Fake Vendor-P1"], []]
+    assert replay_cassette.missing_keys == [("Fake", "Maker", "MPN2", "P2")]
+    replay_cassette.misses_print()
+    assert "Fake: Maker MPN2 ('P2')" in capsys.readouterr().out
+
+
+# test_concurrency_limit_default():
+def test_concurrency_limit_default() -> None:
+    # Plug-in *Panda*'s are not assumed to be thread-safe:
+    assert Panda.concurrency_limit == 1
+
+
+# test_concurrency_limits():
+def test_concurrency_limits() -> None:
+    # *serial_panda* keeps the default limit of 1 and *parallel_panda* allows 3:
+    serial_panda: FakePanda = FakePanda("Serial", "Serial Vendor", 0.02)
+    parallel_panda: FakePanda = FakePanda("Parallel", "Parallel Vendor", 0.02)
+    parallel_panda.concurrency_limit = 3
+    panda_pool: PandaPool = PandaPool([serial_panda, parallel_panda], 8)
+    actual_parts, part_names = actual_parts_create(12)
+    panda_pool.vendor_parts_lookup(actual_parts, part_names, [[0, 1]] * len(actual_parts))
+    assert serial_panda.active_maximum == 1
+    assert 1 < parallel_panda.active_maximum <= 3
+
+
+# test_ordering():
+def test_ordering() -> None:
+    # *slow_panda* finishes after *fast_panda*, but its results still come first:
+    slow_panda: FakePanda = FakePanda("Slow", "Slow Vendor", 0.05)
+    fast_panda: FakePanda = FakePanda("Fast", "Fast Vendor", 0.0)
+    panda_pool: PandaPool = PandaPool([slow_panda, fast_panda], 4)
+    actual_parts, part_names = actual_parts_create(5)
+    panda_indices_lists: List[List[int]] = [[1, 0], [0], [1], [0, 1], []]
+    vendor_parts_lists, faileds = panda_pool.vendor_parts_lookup(
+      actual_parts, part_names, panda_indices_lists)
+    assert [[vendor_part.vendor_name for vendor_part in vendor_parts]
+            for vendor_parts in vendor_parts_lists] == [
+              ["Slow Vendor", "Fast Vendor"], ["Slow Vendor"], ["Fast Vendor"],
+              ["Slow Vendor", "Fast Vendor"], []]
+    assert [[vendor_part.vendor_part_name for vendor_part in vendor_parts]
+            for vendor_parts in vendor_parts_lists][3] == ["Slow Vendor-P3", "Fast Vendor-P3"]
+    assert faileds == [False] * 5
+
+
+# test_rate_interval():
+def test_rate_interval() -> None:
+    # At 20 requests per second, the lookup request slots are 50 milliseconds apart, so the
+    # N-th lookup can not start until N slots after the first one.  (The gap between two
+    # consecutive start times can be shorter when one thread wakes up late, so the start times
+    # are checked against the beginning of the lookups instead.):
+    rated_panda: FakePanda = FakePanda("Rated", "Rated Vendor")
+    rated_panda.concurrency_limit = 4
+    rated_panda.requests_per_second = 20.0
+    panda_pool: PandaPool = PandaPool([rated_panda], 4)
+    actual_parts, part_names = actual_parts_create(6)
+    first_time: float = time.monotonic()
+    panda_pool.vendor_parts_lookup(actual_parts, part_names, [[0]] * len(actual_parts))
+    start_times: List[float] = sorted(rated_panda.start_times)
+    assert len(start_times) == 6
+    index: int
+    start_time: float
+    for index, start_time in enumerate(start_times):
+        assert start_time - first_time >= 0.050 * index - 0.001
+
+
+# test_timeout():
+def test_timeout() -> None:
+    # The lookups of *hung_panda* time out while those of *fast_panda* still succeed:
+    hung_panda: HungPanda = HungPanda("Hung", 0.2)
+    fast_panda: FakePanda = FakePanda("Fast", "Fast Vendor")
+    panda_pool: PandaPool = PandaPool([hung_panda, fast_panda], 4)
+    actual_parts, part_names = actual_parts_create(2)
+    start_time: float = time.monotonic()
+    try:
+        vendor_parts_lists, faileds = panda_pool.vendor_parts_lookup(
+          actual_parts, part_names, [[0, 1], [1]])
+    finally:
+        hung_panda.release_event.set()
+    assert time.monotonic() - start_time < 2.0
+    assert faileds == [True, False]
+    assert [[vendor_part.vendor_name for vendor_part in vendor_parts]
+            for vendor_parts in vendor_parts_lists] == [["Fast Vendor"], ["Fast Vendor"]]
+    assert panda_pool.panda_failures == [1, 0]
+
+
+# test_timeout_hung_workers():
+def test_timeout_hung_workers() -> None:
+    # Every worker of a pool of 2 can get stuck in *hung_panda* lookups, but the stuck workers
+    # are replaced so that the lookups of *healthy_panda* still complete:
+    hung_panda: HungPanda = HungPanda("Hung", 0.3)
+    hung_panda.failures_maximum = 3
+    healthy_panda: FakePanda = FakePanda("Healthy", "Healthy Vendor")
+    panda_pool: PandaPool = PandaPool([hung_panda, healthy_panda], 2)
+    actual_parts, part_names = actual_parts_create(6)
+    results: List[Tuple[List[List[VendorPart]], List[bool]]] = []
+    lookup_thread: threading.Thread = threading.Thread(
+      target=lambda: results.append(panda_pool.vendor_parts_lookup(
+        actual_parts, part_names, [[0, 1]] * len(actual_parts))), daemon=True)
+    try:
+        lookup_thread.start()
+        lookup_thread.join(5.0)
+    finally:
+        hung_panda.release_event.set()
+    assert not lookup_thread.is_alive()
+    vendor_parts_lists, faileds = results[0]
+    assert faileds == [True] * 6
+    assert [[vendor_part.vendor_name for vendor_part in vendor_parts]
+            for vendor_parts in vendor_parts_lists] == [["Healthy Vendor"]] * 6
+    assert panda_pool.panda_brokens == [True, False]
+
+
+# test_timeout_no_workers():
+def test_timeout_no_workers(monkeypatch) -> None:
+    # When the only worker is stuck and no replacement can be started, the queued batches are
+    # abandoned (as failed lookups) instead of waiting forever:
+    thread_start = threading.Thread.start
+    starts: List[threading.Thread] = []
+
+    # thread_start_limited():
+    def thread_start_limited(thread: threading.Thread) -> None:
+        starts.append(thread)
+        if len(starts) > 1:
+            raise RuntimeError("can't start new thread")
+        thread_start(thread)
+
+    hung_panda: HungPanda = HungPanda("Hung", 0.2)
+    healthy_panda: FakePanda = FakePanda("Healthy", "Healthy Vendor")
+    panda_pool: PandaPool = PandaPool([hung_panda, healthy_panda], 1)
+    actual_parts, part_names = actual_parts_create(2)
+    monkeypatch.setattr(threading.Thread, "start", thread_start_limited)
+    try:
+        vendor_parts_lists, faileds = panda_pool.vendor_parts_lookup(
+          actual_parts, part_names, [[0], [1]])
+    finally:
+        monkeypatch.undo()
+        hung_panda.release_event.set()
+    assert vendor_parts_lists == [[], []]
+    assert faileds == [True, True]
+    assert healthy_panda.start_times == []
+
+
+# test_unknown_currency():
+def test_unknown_currency(monkeypatch, capsys) -> None:
+    # A price break in a currency without an exchange rate is dropped (with one warning) and
+    # does not count as a failed lookup:
+    monkeypatch.setattr(ActualPart, "ACTUAL_PART_MISSING_CURRENCIES", dict())
+
+    # CurrencyPanda:
+    class CurrencyPanda(Panda):
+        # A *CurrencyPanda* prices each part in both US dollars and Zorkmids.
+
+        # CurrencyPanda.vendor_parts_lookup():
+        def vendor_parts_lookup(self, actual_part, part_name) -> List[VendorPart]:
+            return [VendorPart(actual_part, "Currency Vendor", f"C-{part_name}", 10,
+                               [PriceBreak(1, 3.00, "ZMD"), PriceBreak(10, 2.00)])]
+
+    panda_pool: PandaPool = PandaPool([CurrencyPanda("Currency")], 4)
+    actual_parts, part_names = actual_parts_create(3)
+    vendor_parts_lists, faileds = panda_pool.vendor_parts_lookup(
+      actual_parts, part_names, [[0]] * len(actual_parts))
+    assert faileds == [False] * 3
+    assert panda_pool.panda_failures == [0]
+    assert [[(price_break.quantity, price_break.currency)
+             for price_break in vendor_parts[0].price_breaks]
+            for vendor_parts in vendor_parts_lists] == [[(10, "USD")]] * 3
+    assert capsys.readouterr().out.count("No exchange rate for currency 'ZMD'") == 1
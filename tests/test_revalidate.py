@@ -0,0 +1,104 @@
+# # BOM Manager Stale-While-Revalidate Tests
+#
+# These tests run *Order.revalidate_start*() and *Order.revalidate_finish*() with a stub
+# *Panda* (no web traffic) to check that the refreshed *VendorPart*'s are swapped into the
+# *ActualPart*'s used for selection, that they are saved into the vendor parts cache, and that
+# only the parts whose cost moved by more than *Order.revalidate_threshold* are reported.
+
+from bom_manager.bom import (ActualPart, ChoicePart, Order, OrderResult, Panda, PandaPool,
+                             PosePart, PriceBreak, Project, Refresh, VendorPart,
+                             VendorPartsCache)
+from stand_ins import order_create, project_create
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+# RepricePanda:
+class RepricePanda(Panda):
+    # A *RepricePanda* answers for *vendor_name* only, with the price in *prices* for each part
+    # name.  It records the thread that performs each lookup.
+
+    # RepricePanda.__init__():
+    def __init__(self, name: str, vendor_name: str, prices: Dict[str, float]) -> None:
+        super().__init__(name)
+        self.prices: Dict[str, float] = prices
+        self.threads: List[threading.Thread] = []
+        self.vendor_name: str = vendor_name
+
+    # RepricePanda.vendor_parts_lookup():
+    def vendor_parts_lookup(self, actual_part, part_name) -> List[VendorPart]:
+        reprice_panda: RepricePanda = self
+        reprice_panda.threads.append(threading.current_thread())
+        vendor_name: str = reprice_panda.vendor_name
+        return [VendorPart(actual_part, vendor_name, f"{vendor_name}-{part_name}", 1000,
+                           [PriceBreak(1, reprice_panda.prices[part_name])])]
+
+
+# test_revalidate_report():
+def test_revalidate_report(tmp_path) -> None:
+    # Each of 3 parts is needed 10 times and is priced at $1.00 each from the cache:
+    project: Project = project_create("Board", 10)
+    choice_parts: List[ChoicePart] = []
+    actual_parts_table: Dict[Tuple[str, str], ActualPart] = {}
+    refreshes: List[Refresh] = []
+    part_name: str
+    for part_name in ("A;0603", "B;0603", "C;0603"):
+        choice_part: ChoicePart = ChoicePart(part_name, [], [])
+        choice_part.pose_part_append(PosePart(project, choice_part, "R1", ""))
+        actual_part: ActualPart = ActualPart("Maker", f"MPN-{part_name}")
+        VendorPart(actual_part, "Stub Vendor", f"Stub Vendor-{part_name}", 1000,
+                   [PriceBreak(1, 1.00)])
+        VendorPart(actual_part, "Other Vendor", f"Other Vendor-{part_name}", 1000,
+                   [PriceBreak(1, 1.25)])
+        choice_part.actual_parts.append(actual_part)
+        choice_parts.append(choice_part)
+        actual_parts_table[actual_part.key] = actual_part
+        refreshes.append((actual_part, actual_part, part_name, ["Stub Vendor"]))
+
+    # Only the stale "Stub Vendor" prices are refreshed.  Part A goes up by 10% (more than the
+    # 5% threshold), part B goes up by 2% (less than the threshold), and part C goes up by
+    # 50% (so "Other Vendor" is selected instead):
+    reprice_panda: RepricePanda = RepricePanda("Reprice", "Stub Vendor",
+                                               {"A;0603": 1.10, "B;0603": 1.02, "C;0603": 1.50})
+    order: Order = order_create()
+    order.actual_parts_table = actual_parts_table
+    order.manifest = None
+    order.order_root = str(tmp_path)
+    order.panda_pool = PandaPool([reprice_panda], 2)
+    order.pandas = [reprice_panda]
+    order.revalidate_threshold = 0.05
+    order.vendor_parts_cache = VendorPartsCache(str(tmp_path / "vendor_parts.db"))
+
+    # Start the refresh in the background and select from the cached prices in the meantime:
+    order.revalidate_start(refreshes)
+    excluded_vendor_names: Dict[str, None] = {}
+    previous_order_result: OrderResult = OrderResult(order, choice_parts, excluded_vendor_names)
+    order.order_result = previous_order_result
+    assert previous_order_result.total_cost == 30.0
+    order.revalidate_finish(choice_parts, excluded_vendor_names)
+    assert threading.current_thread() not in reprice_panda.threads
+
+    # The refreshed prices are swapped in, saved, and used by the new *order_result*:
+    assert [actual_part.vendor_parts[-1].price_breaks[0].price
+            for actual_part in actual_parts_table.values()] == [1.10, 1.02, 1.50]
+    order_result: Optional[OrderResult] = order.order_result
+    assert isinstance(order_result, OrderResult) and order_result is not previous_order_result
+    assert [(selection[3], selection[6])
+            for selection in order_result.selections] == [("Stub Vendor", 11.0),
+                                                          ("Stub Vendor", 10.2),
+                                                          ("Other Vendor", 12.5)]
+    saved_actual_part: Optional[ActualPart] = order.vendor_parts_cache.actual_part_load(
+      ("Maker", "MPN-A;0603"))
+    assert saved_actual_part is not None
+    assert sorted([(vendor_part.vendor_name, vendor_part.price_breaks[0].price)
+                   for vendor_part in saved_actual_part.vendor_parts]) == [
+                     ("Other Vendor", 1.25), ("Stub Vendor", 1.10)]
+
+    # Only parts A and C are in the delta report:
+    revalidate_report_file_name: str = str(tmp_path / "revalidate_report.txt")
+    with open(revalidate_report_file_name) as revalidate_report_file:
+        assert revalidate_report_file.read() == (
+          "Refreshed 3 stale actual parts after the reports were written from cached data.\n"
+          "2 parts changed vendor or changed cost by more than 5%:\n"
+          "A;0603: Stub Vendor $10.00 => Stub Vendor $11.00\n"
+          "C;0603: Stub Vendor $10.00 => Other Vendor $12.50\n")
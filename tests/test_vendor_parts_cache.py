@@ -0,0 +1,75 @@
+# # BOM Manager *VendorPartsCache* Tests
+#
+# These tests check that a *VendorPartsCache* round trips an *ActualPart* and that a
+# database written by an older version of the BOM manager is upgraded in place.
+
+from bom_manager.bom import ActualPart, PriceBreak, VendorPart, VendorPartsCache
+import sqlite3
+from typing import List, Optional, Tuple
+
+
+# test_round_trip():
+def test_round_trip(tmp_path) -> None:
+    # Save an *ActualPart* and load it back into a new *ActualPart*:
+    vendor_parts_cache: VendorPartsCache = VendorPartsCache(str(tmp_path / "vendor_parts.db"))
+    actual_part: ActualPart = ActualPart("Maker", "MPN1")
+    VendorPart(actual_part, "Digi-Key", "DK-1", 25, [PriceBreak(1, 0.50), PriceBreak(10, 0.40)],
+               1000, 900)
+    vendor_parts_cache.actual_part_save(actual_part)
+    loaded_actual_part: Optional[ActualPart] = vendor_parts_cache.actual_part_load(
+      ("Maker", "MPN1"))
+    assert loaded_actual_part is not None
+    assert len(loaded_actual_part.vendor_parts) == 1
+    vendor_part: VendorPart = loaded_actual_part.vendor_parts[0]
+    assert vendor_part.vendor_key == ("Digi-Key", "DK-1")
+    assert (vendor_part.timestamp, vendor_part.price_breaks_timestamp) == (1000, 900)
+    assert [(price_break.quantity, price_break.price)
+            for price_break in vendor_part.price_breaks] == [(1, 0.50), (10, 0.40)]
+
+
+# test_schema_upgrade():
+def test_schema_upgrade(tmp_path) -> None:
+    # Create a database with the original (unversioned) tables and one cached part:
+    database_file_name: str = str(tmp_path / "vendor_parts.db")
+    connection: sqlite3.Connection = sqlite3.connect(database_file_name)
+    with connection:
+        connection.execute("CREATE TABLE actual_parts (id INTEGER PRIMARY KEY, "
+                           "manufacturer_name TEXT NOT NULL, "
+                           "manufacturer_part_name TEXT NOT NULL, "
+                           "timestamp INTEGER NOT NULL, "
+                           "UNIQUE (manufacturer_name, manufacturer_part_name))")
+        connection.execute("CREATE TABLE vendor_parts (id INTEGER PRIMARY KEY, "
+                           "actual_part_id INTEGER NOT NULL, vendor_name TEXT NOT NULL, "
+                           "vendor_part_name TEXT NOT NULL, "
+                           "quantity_available INTEGER NOT NULL, timestamp INTEGER NOT NULL, "
+                           "UNIQUE (actual_part_id, vendor_name, vendor_part_name))")
+        connection.execute("CREATE TABLE price_breaks (vendor_part_id INTEGER NOT NULL, "
+                           "quantity INTEGER NOT NULL, price REAL NOT NULL)")
+        connection.execute("INSERT INTO actual_parts VALUES (1, 'Maker', 'MPN2', 500)")
+        connection.execute("INSERT INTO vendor_parts VALUES (1, 1, 'Mouser', 'MO-2', 7, 400)")
+        connection.execute("INSERT INTO price_breaks VALUES (1, 1, 1.25)")
+    connection.close()
+
+    # Opening the database upgrades it, and the old rows are still usable:
+    vendor_parts_cache: VendorPartsCache = VendorPartsCache(database_file_name)
+    connection = vendor_parts_cache.connection
+    assert (connection.execute("PRAGMA user_version").fetchone()[0] ==
+            VendorPartsCache.VENDOR_PARTS_CACHE_SCHEMA_VERSION)
+    actual_part: Optional[ActualPart] = vendor_parts_cache.actual_part_load(("Maker", "MPN2"))
+    assert actual_part is not None
+    vendor_part: VendorPart = actual_part.vendor_parts[0]
+    assert (vendor_part.timestamp, vendor_part.price_breaks_timestamp) == (400, 400)
+    assert [(price_break.quantity, price_break.price, price_break.currency)
+            for price_break in vendor_part.price_breaks] == [(1, 1.25, "USD")]
+
+    # The upgraded database can be written to and reopened:
+    VendorPart(actual_part, "Digi-Key", "DK-2", 3, [PriceBreak(1, 2.00)], 600)
+    vendor_parts_cache.actual_part_save(actual_part)
+    vendor_parts_cache.connection.close()
+    reopened_vendor_parts_cache: VendorPartsCache = VendorPartsCache(database_file_name)
+    reloaded_actual_part: Optional[ActualPart] = reopened_vendor_parts_cache.actual_part_load(
+      ("Maker", "MPN2"))
+    assert reloaded_actual_part is not None
+    vendor_keys: List[Tuple[str, str]] = sorted(
+      [vendor_part.vendor_key for vendor_part in reloaded_actual_part.vendor_parts])
+    assert vendor_keys == [("Digi-Key", "DK-2"), ("Mouser", "MO-2")]
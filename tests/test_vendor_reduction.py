@@ -0,0 +1,161 @@
+# # BOM Manager Vendor Reduction Tests
+#
+# These tests check that *Order.exclude_vendors_to_reduce_shipping_costs*() (which prices each
+# trial exclusion with a *SelectionTracker* and only reprices the vendors that it has to) excludes
+# the same vendors in the same order with the same `vendor_reduction_report.txt` lines as
+# re-selecting every *ChoicePart* with *ChoicePart.select*() for every trial exclusion, and as
+# eagerly repricing every vendor with the *SelectionTracker* in every round.
+
+from bom_manager.bom import ChoicePart, CostMatrix, Order, SelectionTracker
+from stand_ins import choice_parts_create, order_create
+from typing import Dict, List, Tuple
+
+
+# brute_force_exclude():
+def brute_force_exclude(order: Order, choice_parts: List[ChoicePart],
+                        excluded_vendor_names: Dict[str, None],
+                        reduced_vendor_messages: List[str]) -> None:
+    """ Exclude vendors from *choice_parts* to reduce shipping costs the slow way, by calling
+        *ChoicePart.select*() on every *ChoicePart* for every trial exclusion.
+    """
+    # quad_get():
+    def quad_get(trial_excluded_vendor_names: Dict[str, None],
+                 vendor_name: str) -> Tuple[int, float, str]:
+        missing_parts: int = 0
+        total_cost: float = 0.0
+        choice_part: ChoicePart
+        for choice_part in choice_parts:
+            missing_parts += choice_part.select(trial_excluded_vendor_names)
+            total_cost += choice_part.selected_total_cost
+        return (missing_parts, total_cost, vendor_name)
+
+    missing_parts: int = quad_get(excluded_vendor_names, "")[0]
+    while True:
+        # Stop when the order becomes incomplete or there is only one vendor left:
+        base_missing_parts: int
+        base_cost: float
+        base_missing_parts, base_cost, _ = quad_get(excluded_vendor_names, "")
+        base_vendor_names: List[str] = order.vendor_names_get(choice_parts,
+                                                              excluded_vendor_names)
+        if base_missing_parts > missing_parts or len(base_vendor_names) <= 1:
+            break
+
+        # Price every trial exclusion and sort the most interesting one to the front:
+        trial_quads: List[Tuple[int, float, str]] = [
+          quad_get(dict(excluded_vendor_names, **{vendor_name: None}), vendor_name)
+          for vendor_name in base_vendor_names]
+        trial_quads.sort(key=lambda quad: (quad[0], quad[1]))
+
+        # Exclude the vendors that save nothing and then the vendor that saves the least
+        # (if it does not save more than the shipping cost):
+        while len(trial_quads) >= 2 and trial_quads[0][1] == base_cost:
+            reduced_vendor_messages.append(f"Excluding '{trial_quads[0][2]}': saves nothing\n")
+            excluded_vendor_names[trial_quads[0][2]] = None
+            del trial_quads[0]
+        savings: float = trial_quads[0][1] - base_cost
+        lowest_vendor_name: str = trial_quads[0][2]
+        if savings < 15.0 and len(trial_quads) >= 2 and lowest_vendor_name != "Digi-Key":
+            reduced_vendor_messages.append(
+              f"Excluding '{lowest_vendor_name}': only saves {savings:.2f}\n")
+            excluded_vendor_names[lowest_vendor_name] = None
+        else:
+            break
+
+
+# eager_exclude():
+def eager_exclude(order: Order, choice_parts: List[ChoicePart],
+                  excluded_vendor_names: Dict[str, None],
+                  reduced_vendor_messages: List[str]) -> None:
+    """ Exclude vendors from *choice_parts* to reduce shipping costs by repricing every
+        remaining vendor with a *SelectionTracker* in every round (i.e. without the lazy
+        *penalty_heap*.)  Each vendor that saves nothing is excluded as soon as it is found.
+    """
+    cost_matrix: CostMatrix = order.cost_matrix_get(choice_parts)
+    selection_tracker: SelectionTracker = SelectionTracker(cost_matrix, excluded_vendor_names)
+    missing_parts: int = selection_tracker.missing_parts
+    while True:
+        # Stop when the order becomes incomplete or there is only one vendor left:
+        base_cost: float = selection_tracker.total_cost
+        base_vendor_names: List[str] = order.vendor_names_get(choice_parts,
+                                                              excluded_vendor_names)
+        if selection_tracker.missing_parts > missing_parts or len(base_vendor_names) <= 1:
+            break
+
+        # Price every trial exclusion and sort the most interesting one to the front:
+        trial_quads: List[Tuple[int, float, str]] = [
+          selection_tracker.trial_get(vendor_name) + (vendor_name,)
+          for vendor_name in base_vendor_names]
+        trial_quads.sort(key=lambda quad: (quad[0], quad[1]))
+
+        # Exclude the vendors that save nothing and then the vendor that saves the least
+        # (if it does not save more than the shipping cost):
+        while len(trial_quads) >= 2 and trial_quads[0][1] == base_cost:
+            reduced_vendor_messages.append(f"Excluding '{trial_quads[0][2]}': saves nothing\n")
+            selection_tracker.vendor_exclude(trial_quads[0][2])
+            del trial_quads[0]
+        savings: float = trial_quads[0][1] - base_cost
+        lowest_vendor_name: str = trial_quads[0][2]
+        if savings < 15.0 and len(trial_quads) >= 2 and lowest_vendor_name != "Digi-Key":
+            reduced_vendor_messages.append(
+              f"Excluding '{lowest_vendor_name}': only saves {savings:.2f}\n")
+            selection_tracker.vendor_exclude(lowest_vendor_name)
+        else:
+            break
+
+
+# test_brute_force():
+def test_brute_force() -> None:
+    # Compare the exclusions and the report lines with the brute force version for a variety
+    # of order sizes:
+    all_messages: List[str] = []
+    parts_count: int
+    seed: int
+    for parts_count, seed in [(3, 1), (10, 2), (25, 3), (60, 4), (120, 5), (200, 6)]:
+        brute_force_vendor_names: Dict[str, None] = {}
+        brute_force_messages: List[str] = []
+        brute_force_exclude(order_create(), choice_parts_create(parts_count, seed),
+                            brute_force_vendor_names, brute_force_messages)
+
+        excluded_vendor_names: Dict[str, None] = {}
+        reduced_vendor_messages: List[str] = []
+        order_create().exclude_vendors_to_reduce_shipping_costs(
+          choice_parts_create(parts_count, seed), excluded_vendor_names, reduced_vendor_messages)
+
+        assert list(excluded_vendor_names) == list(brute_force_vendor_names), parts_count
+        assert reduced_vendor_messages == brute_force_messages, parts_count
+        all_messages.extend(brute_force_messages)
+
+    # Make sure that the random orders really exclude vendors for both reasons:
+    assert any([message.endswith(": saves nothing\n") for message in all_messages])
+    assert any([": only saves " in message for message in all_messages])
+
+
+# test_eager():
+def test_eager() -> None:
+    # With a dozen vendors there are many rounds, so many of the penalties in the lazy
+    # *penalty_heap* are stale.  The vendors must still be excluded in exactly the same order:
+    vendor_names: List[str] = ["Arrow", "Digi-Key", "LCSC", "Mouser", "Newark", "Farnell",
+                               "Future", "Rochester", "RS", "TME", "Verical", "Avnet"]
+    rounds_maximum: int = 0
+    parts_count: int
+    for parts_count in (5, 20, 40, 80, 160):
+        seed: int
+        for seed in range(8):
+            eager_vendor_names: Dict[str, None] = {}
+            eager_messages: List[str] = []
+            eager_exclude(order_create(), choice_parts_create(parts_count, seed, vendor_names),
+                          eager_vendor_names, eager_messages)
+
+            excluded_vendor_names: Dict[str, None] = {}
+            reduced_vendor_messages: List[str] = []
+            order_create().exclude_vendors_to_reduce_shipping_costs(
+              choice_parts_create(parts_count, seed, vendor_names), excluded_vendor_names,
+              reduced_vendor_messages)
+
+            assert list(excluded_vendor_names) == list(eager_vendor_names), (parts_count, seed)
+            assert reduced_vendor_messages == eager_messages, (parts_count, seed)
+            rounds_maximum = max(rounds_maximum, len([message for message in eager_messages
+                                                      if ": only saves " in message]))
+
+    # Make sure that some order really took many rounds:
+    assert rounds_maximum >= 4
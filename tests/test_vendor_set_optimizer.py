@@ -0,0 +1,97 @@
+# # BOM Manager *VendorSetOptimizer* Tests
+#
+# These tests check the *VendorSetOptimizer* against a brute force search over every vendor
+# set, that vendor minimum orders make the result a heuristic, and that the time limit is
+# honored.
+
+from bom_manager.bom import CostMatrix, VendorSetOptimizer
+import itertools
+import math
+import random
+import time
+from typing import List
+
+
+# cost_matrix_create():
+def cost_matrix_create(costs: List[List[float]]) -> CostMatrix:
+    """ Return a *CostMatrix* with *costs* (where *math.inf* means that a vendor can not supply
+        a part) without building any *ChoicePart*'s.
+    """
+    cost_matrix: CostMatrix = CostMatrix.__new__(CostMatrix)
+    cost_matrix.costs = costs
+    cost_matrix.rows_columns = [
+      sorted([column for column, cost in enumerate(row_costs) if cost < math.inf],
+             key=lambda column: (row_costs[column], column))
+      for row_costs in costs]
+    cost_matrix.vendor_names = [f"V{column}" for column in range(len(costs[0]))]
+    return cost_matrix
+
+
+# costs_create():
+def costs_create(randomizer: random.Random, rows_size: int,
+                 columns_size: int) -> List[List[float]]:
+    """ Return a random *rows_size* by *columns_size* cost table. """
+    costs: List[List[float]] = []
+    row: int
+    for row in range(rows_size):
+        row_costs: List[float] = [math.inf if randomizer.random() < 0.3
+                                  else float(randomizer.randint(1, 30))
+                                  for column in range(columns_size)]
+        row_costs[randomizer.randrange(columns_size)] = float(randomizer.randint(1, 30))
+        costs.append(row_costs)
+    return costs
+
+
+# test_brute_force():
+def test_brute_force() -> None:
+    # Without minimum orders the search finds the best of every vendor set:
+    randomizer: random.Random = random.Random(5)
+    trial: int
+    for trial in range(30):
+        columns_size: int = randomizer.randint(2, 6)
+        cost_matrix: CostMatrix = cost_matrix_create(
+          costs_create(randomizer, randomizer.randint(1, 12), columns_size))
+        shipping_costs: List[float] = [float(randomizer.randint(0, 20))
+                                       for column in range(columns_size)]
+        vendor_set_optimizer: VendorSetOptimizer = VendorSetOptimizer(
+          cost_matrix, dict(), shipping_costs, [0.0] * columns_size, 10.0)
+        vendor_set_optimizer.solve()
+        brute_force_cost: float = min([
+          vendor_set_optimizer.cost_get(list(opens))
+          for opens in itertools.product([False, True], repeat=columns_size)])
+        assert vendor_set_optimizer.is_exact
+        assert abs(vendor_set_optimizer.best_cost - brute_force_cost) < 1e-9
+
+
+# test_minimums_heuristic():
+def test_minimums_heuristic() -> None:
+    # Any vendor minimum order makes the result a heuristic, even when the search finishes:
+    cost_matrix: CostMatrix = cost_matrix_create([[1.0, 2.0], [3.0, 1.0]])
+    vendor_set_optimizer: VendorSetOptimizer = VendorSetOptimizer(
+      cost_matrix, dict(), [5.0, 5.0], [0.0, 10.0], 10.0)
+    vendor_set_optimizer.solve()
+    assert not vendor_set_optimizer.is_timed_out
+    assert not vendor_set_optimizer.is_exact
+
+
+# test_time_limit():
+def test_time_limit() -> None:
+    # A search that runs out of time returns promptly with a complete (if not best) solution:
+    randomizer: random.Random = random.Random(7)
+    columns_size: int = 40
+    cost_matrix: CostMatrix = cost_matrix_create(costs_create(randomizer, 400, columns_size))
+    vendor_set_optimizer: VendorSetOptimizer = VendorSetOptimizer(
+      cost_matrix, dict(), [30.0] * columns_size, [0.0] * columns_size, 0.2)
+    start_time: float = time.monotonic()
+    vendor_names: List[str] = vendor_set_optimizer.solve()
+    assert time.monotonic() - start_time < 1.0
+    assert vendor_set_optimizer.is_timed_out
+    assert not vendor_set_optimizer.is_exact
+    assert vendor_names
+    assert vendor_set_optimizer.best_cost < math.inf
+
+    # With no time at all, even the greedy solution stops (with every vendor still open):
+    vendor_set_optimizer = VendorSetOptimizer(
+      cost_matrix, dict(), [30.0] * columns_size, [0.0] * columns_size, 0.0)
+    assert len(vendor_set_optimizer.solve()) == columns_size
+    assert vendor_set_optimizer.is_timed_out